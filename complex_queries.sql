@@ -1,3 +1,7 @@
+-- NOTE: The app runs a parameterized version of this query (any student_id, paged,
+-- index-backed) from core/eligibility_query.py, exposed at /api/eligibility/.
+-- Benchmark it with: python manage.py benchmark_eligibility_query
+
 -- This query finds all government jobs and scholarships a specific student is eligible for
 -- based on their verified academic and income documents.
 
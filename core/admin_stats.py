@@ -0,0 +1,119 @@
+# core/admin_stats.py
+# Platform-wide statistics for the admin homepage and chat: document counts
+# by status and type, verified-student counts, and the distributions of
+# annual income and highest percentage. Everything is computed by GROUP BY /
+# aggregate queries in the database (no rows reach Python) and cached; saves
+# and deletes of Documents and StudentProfiles drop the cached copy (see the
+# receivers in core/models.py), so a read is normally one cache lookup.
+
+import time
+
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.core.cache import cache
+from django.db.models import Aggregate, Count, FloatField, Q
+from django.utils import timezone
+
+from .models import Document, Student, StudentProfile
+
+STATS_CACHE_KEY = 'admin_stats'
+# Safety net for changes the signals do not see (queryset .update(), other
+# processes when CACHES is the default per-process memory cache).
+STATS_CACHE_SECONDS = getattr(settings, 'ADMIN_STATS_CACHE_SECONDS', 600)
+# Fields whose changes affect the statistics; saves touching only others keep the cache
+DOCUMENT_STATS_FIELDS = {'document_type', 'verification_status', 'student'}
+PROFILE_STATS_FIELDS = {'annual_income', 'highest_percentage'}
+
+# Bucket lower bounds; the last bucket is open-ended
+INCOME_BUCKETS = [0, 100_000, 250_000, 500_000, 800_000, 1_000_000, 2_500_000]
+PERCENTAGE_BUCKETS = [0, 40, 50, 60, 75, 90]
+PERCENTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL percentile_cont over an array of fractions; returns one value per fraction."""
+    function = 'percentile_cont'
+    template = '%(function)s(%(fractions)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fractions, **extra):
+        fractions = 'ARRAY[%s]::double precision[]' % ', '.join(str(float(f)) for f in fractions)
+        super().__init__(expression, fractions=fractions, output_field=ArrayField(FloatField()), **extra)
+
+
+def _distribution(field, bounds):
+    """Count (non-null), percentiles and bucket counts of one StudentProfile column, in one query."""
+    aggregates = {
+        'count': Count(field),
+        'percentiles': PercentileCont(field, PERCENTILES),
+    }
+    edges = bounds + [None]
+    for i, low in enumerate(bounds):
+        condition = Q(**{f'{field}__gte': low})
+        if edges[i + 1] is not None:
+            condition &= Q(**{f'{field}__lt': edges[i + 1]})
+        aggregates[f'bucket_{i}'] = Count(field, filter=condition)
+    row = StudentProfile.objects.aggregate(**aggregates)
+
+    return {
+        'count': row['count'],
+        'percentiles': {
+            f'p{round(p * 100)}': (round(value, 2) if value is not None else None)
+            for p, value in zip(PERCENTILES, row['percentiles'] or [None] * len(PERCENTILES))
+        },
+        'buckets': [
+            {'min': low, 'max': edges[i + 1], 'students': row[f'bucket_{i}']}
+            for i, low in enumerate(bounds)
+        ],
+    }
+
+
+def compute_admin_stats():
+    """Runs the aggregate queries. Use get_admin_stats() to go through the cache."""
+    started = time.perf_counter()
+    by_type_and_status = {}
+    for document_type, verification_status, n in (
+        Document.objects.values_list('document_type', 'verification_status')
+        .annotate(n=Count('document_id')).order_by()
+    ):
+        by_type_and_status.setdefault(document_type, {})[verification_status] = n
+
+    by_status = {}
+    for statuses in by_type_and_status.values():
+        for verification_status, n in statuses.items():
+            by_status[verification_status] = by_status.get(verification_status, 0) + n
+
+    return {
+        'documents': {
+            'total': sum(by_status.values()),
+            'by_status': by_status,
+            'by_type': {t: sum(statuses.values()) for t, statuses in by_type_and_status.items()},
+            'by_type_and_status': by_type_and_status,
+        },
+        'students': {
+            'total': Student.objects.count(),
+            'with_verified_document': (
+                Document.objects.filter(verification_status='Verified')
+                .aggregate(n=Count('student', distinct=True))['n']
+            ),
+        },
+        'annual_income': _distribution('annual_income', INCOME_BUCKETS),
+        'highest_percentage': _distribution('highest_percentage', PERCENTAGE_BUCKETS),
+        'computed_at': timezone.now().isoformat(),
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def get_admin_stats(refresh=False):
+    """Returns the cached statistics, computing them if needed."""
+    stats = None if refresh else cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_admin_stats()
+        cache.set(STATS_CACHE_KEY, stats, STATS_CACHE_SECONDS)
+    return stats
+
+
+def invalidate_admin_stats(update_fields=None, relevant_fields=None):
+    """Drops the cached statistics, unless the save only touched `update_fields` they do not use."""
+    if update_fields and relevant_fields and not set(update_fields) & relevant_fields:
+        return
+    cache.delete(STATS_CACHE_KEY)
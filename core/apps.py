@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Import modules that register background tasks (see core/tasks.py)
+        from . import recommendations, document_processing, export_jobs, batch_matching  # noqa: F401
@@ -1,7 +1,68 @@
+import copy
+import threading
+import time
+
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
 from core.models import Student
 
+# Authenticated students are kept per process for this long. Saves / deletes
+# drop the entry in the process that made them; other processes see the
+# change once it expires.
+STUDENT_CACHE_TTL_SECONDS = getattr(settings, 'AUTH_STUDENT_CACHE_TTL', 60)
+STUDENT_CACHE_MAX_ENTRIES = getattr(settings, 'AUTH_STUDENT_CACHE_MAX_ENTRIES', 10000)
+# Build request.user from the token claims alone (no query at all). Claims
+# can lag behind the row by up to ACCESS_TOKEN_LIFETIME, so this is opt-in.
+AUTH_STATELESS = getattr(settings, 'AUTH_STATELESS', False)
+# Student fields copied into the tokens, in model field order
+TOKEN_STUDENT_FIELDS = ['student_id', 'full_name', 'email']
+
+_students = {} # str(student_id) -> (loaded_at, Student); token claims carry the id as a string
+_students_lock = threading.Lock()
+
+
+def tokens_for_student(student):
+    """A refresh token (and, via .access_token, an access token) carrying the stateless-mode claims."""
+    refresh = RefreshToken.for_user(student)
+    refresh['full_name'] = student.full_name
+    refresh['email'] = student.email
+    return refresh
+
+
+def invalidate_cached_student(student_id):
+    with _students_lock:
+        _students.pop(str(student_id), None)
+
+
+def _cached_student(student_id):
+    with _students_lock:
+        entry = _students.get(str(student_id))
+        if entry is not None and time.monotonic() - entry[0] <= STUDENT_CACHE_TTL_SECONDS:
+            # A copy, so a view changing request.user never touches the shared instance
+            return copy.copy(entry[1])
+    student = Student.objects.get(student_id=student_id)
+    with _students_lock:
+        if len(_students) >= STUDENT_CACHE_MAX_ENTRIES:
+            _students.clear()
+        _students[str(student_id)] = (time.monotonic(), student)
+    return copy.copy(student)
+
+
+def _student_from_claims(validated_token):
+    """
+    A Student built from the token, as if loaded with .only(*TOKEN_STUDENT_FIELDS):
+    any other field is fetched on first access. None for tokens without the claims.
+    """
+    try:
+        values = [Student._meta.pk.to_python(validated_token[settings.SIMPLE_JWT['USER_ID_CLAIM']])]
+        values += [validated_token[field] for field in TOKEN_STUDENT_FIELDS[1:]]
+    except KeyError:
+        return None
+    return Student.from_db(DEFAULT_DB_ALIAS, TOKEN_STUDENT_FIELDS, values)
+
+
 class CustomJWTAuthentication(JWTAuthentication):
     """
     Custom authentication class to tell simplejwt to use our
@@ -19,8 +80,13 @@ class CustomJWTAuthentication(JWTAuthentication):
             from rest_framework_simplejwt.exceptions import InvalidToken
             raise InvalidToken("Token contained no recognizable user identification")
 
+        if AUTH_STATELESS:
+            student = _student_from_claims(validated_token)
+            if student is not None:
+                return student
+
         try:
-            student = Student.objects.get(student_id=user_id)
+            student = _cached_student(user_id)
         except Student.DoesNotExist:
             from django.contrib.auth.models import AnonymousUser
             print(f"Authentication Failed: Student with id {user_id} not found.")
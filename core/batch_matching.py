@@ -0,0 +1,312 @@
+# core/batch_matching.py
+# All-students x all-jobs matching for admin analytics. Students and jobs are
+# encoded as sparse binary skill matrices; the overlap matrix is computed as
+# a sparse product in memory-bounded chunks of students, spread over a
+# process pool, and only aggregates are kept. The matcher runs as the
+# 'build_match_report' background task; requests read the stored report.
+
+import os
+import time
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BatchMatchReport, GovtJob, StudentProfile
+from .recommendations import normalize_skill, parse_job_skills
+from .tasks import enqueue, register
+
+DEFAULT_MIN_COVERAGE = getattr(settings, 'BATCH_MATCH_MIN_COVERAGE', 0.5)
+# Upper bound on non-zeros produced by one chunk's sparse product (~12 bytes each).
+MAX_CHUNK_NNZ = getattr(settings, 'BATCH_MATCH_MAX_CHUNK_NNZ', 20_000_000)
+WORKERS = getattr(settings, 'BATCH_MATCH_WORKERS', os.cpu_count() or 1)
+# Reports older than this are rebuilt in the background (the old one is served meanwhile).
+REPORT_CACHE_SECONDS = getattr(settings, 'BATCH_MATCH_CACHE_SECONDS', 600)
+# The min_coverage values reports are built for; each one is a full match.
+MIN_COVERAGE_CHOICES = tuple(getattr(settings, 'BATCH_MATCH_COVERAGE_CHOICES', (0.25, 0.5, 0.75, 1.0)))
+if DEFAULT_MIN_COVERAGE not in MIN_COVERAGE_CHOICES:
+    MIN_COVERAGE_CHOICES += (DEFAULT_MIN_COVERAGE,)
+
+# ==============================================================================
+# 1. ENCODING
+# ==============================================================================
+
+def _to_csr(rows, vocabulary):
+    """Encodes a list of skill sets as a binary CSR matrix over `vocabulary`."""
+    indptr = [0]
+    indices = []
+    for skills in rows:
+        indices.extend(sorted(vocabulary[s] for s in skills if s in vocabulary))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.int32)
+    return sp.csr_matrix(
+        (data, np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(rows), len(vocabulary)),
+    )
+
+
+def load_matrices():
+    """
+    Reads every student's verified skills and every job's required skills
+    and returns (student_ids, job_ids, skills, S, J) where S is students x
+    skills and J is jobs x skills. Student skills no job asks for are dropped.
+    """
+    job_ids, job_skills = [], []
+    for job_id, criteria in GovtJob.objects.order_by('job_id').values_list('job_id', 'eligibility_criteria'):
+        skills = parse_job_skills(criteria)
+        if skills:
+            job_ids.append(job_id)
+            job_skills.append(skills)
+
+    skills = sorted(set().union(*job_skills)) if job_skills else []
+    vocabulary = {skill: i for i, skill in enumerate(skills)}
+
+    student_ids, student_skills = [], []
+    for student_id, verified in StudentProfile.objects.order_by('student_id').values_list('student_id', 'verified_skills'):
+        student_ids.append(student_id)
+        student_skills.append({normalize_skill(s) for s in verified or []})
+
+    return (
+        np.array(student_ids, dtype=np.int64),
+        np.array(job_ids, dtype=np.int64),
+        skills,
+        _to_csr(student_skills, vocabulary),
+        _to_csr(job_skills, vocabulary),
+    )
+
+
+# ==============================================================================
+# 2. CHUNKED SPARSE PRODUCT
+# ==============================================================================
+
+# Set in each worker process by _init_worker (and in-process for workers=1).
+_S = _JT = _J = _REQUIRED = _SINGLE = _SINGLE_PER_SKILL = None
+
+
+def _init_worker(S, J, required):
+    global _S, _JT, _J, _REQUIRED, _SINGLE, _SINGLE_PER_SKILL
+    _S, _J, _REQUIRED = S, J, required
+    _JT = J.T.tocsr()
+    # Jobs one shared skill qualifies for, and how many of them ask for each skill
+    _SINGLE = required == 1
+    _SINGLE_PER_SKILL = np.asarray(J[_SINGLE].sum(axis=0)).ravel()
+
+
+def _match_chunk(bounds):
+    """
+    Computes overlap = S[chunk] @ J.T and reduces it to:
+      - qualifying job count per student in the chunk,
+      - qualifying student count per job,
+      - per skill, how many students it blocks (the skill is missing from a
+        job the student is exactly one skill short of), and near-miss pairs.
+    The product only holds pairs sharing a skill, so the near misses of jobs
+    needing a single skill (students sharing none of its skills, who miss
+    all of them) are counted from the complement of the overlap.
+    """
+    start, stop = bounds
+    S = _S[start:stop]
+    overlap = (S @ _JT).tocoo() # students x jobs, only pairs sharing >= 1 skill
+    rows, cols, shared = overlap.row, overlap.col, overlap.data
+
+    needed = _REQUIRED[cols]
+    qualifies = shared >= needed
+    per_student = np.bincount(rows[qualifies], minlength=stop - start)
+    per_job = np.bincount(cols[qualifies], minlength=_J.shape[0])
+
+    near = shared == needed - 1
+    near_miss = sp.csr_matrix(
+        (np.ones(near.sum(), dtype=np.int32), (rows[near], cols[near])),
+        shape=(stop - start, _J.shape[0]),
+    )
+    # Skills asked for by each student's near-miss jobs, minus the ones they have.
+    wanted = near_miss @ _J
+    missing = wanted - wanted.multiply(S)
+    missing.eliminate_zeros()
+    near_miss_pairs = np.asarray(missing.sum(axis=0)).ravel()
+    missing = (missing > 0).astype(np.int32)
+    blocked_students = np.asarray(missing.sum(axis=0)).ravel()
+
+    # hits[s, k] = single-skill jobs asking for skill k that student s shares a skill with
+    single = _SINGLE[cols]
+    hits = sp.csr_matrix(
+        (np.ones(single.sum(), dtype=np.int32), (rows[single], cols[single])),
+        shape=(stop - start, _J.shape[0]),
+    ) @ _J
+    near_miss_pairs += (stop - start) * _SINGLE_PER_SKILL - np.asarray(hits.sum(axis=0)).ravel()
+    # A student lacking k is blocked by a single-skill job unless they share a skill with all of k's
+    hits = hits.tocoo()
+    covered = hits.data == _SINGLE_PER_SKILL[hits.col]
+    covered = sp.csr_matrix(
+        (np.ones(covered.sum(), dtype=np.int32), (hits.row[covered], hits.col[covered])),
+        shape=(stop - start, _J.shape[1]),
+    )
+    covered_lacking = np.asarray((covered - covered.multiply(S)).sum(axis=0)).ravel()
+    holders = np.asarray(S.sum(axis=0)).ravel()
+    has_single = _SINGLE_PER_SKILL > 0
+    blocked_by_single = np.where(has_single, stop - start - holders - covered_lacking, 0)
+    # ... minus the students already blocked on k by another near miss
+    already_blocked = np.where(has_single, blocked_students, 0) - np.asarray(missing.multiply(covered).sum(axis=0)).ravel()
+    blocked_students = blocked_students + blocked_by_single - already_blocked
+
+    return start, per_student, per_job, blocked_students, near_miss_pairs
+
+
+def _chunk_bounds(S, J, max_nnz):
+    """
+    Splits the students into row ranges whose product is estimated to stay
+    under `max_nnz` non-zeros: a student's row can produce at most the sum of
+    the job frequencies of their skills.
+    """
+    job_frequency = np.asarray(J.sum(axis=0)).ravel()
+    row_cost = np.minimum(S @ job_frequency, J.shape[0])
+    bounds, start, running = [], 0, 0
+    for i, cost in enumerate(row_cost):
+        if running and running + cost > max_nnz:
+            bounds.append((start, i))
+            start, running = i, 0
+        running += cost
+    if start < S.shape[0]:
+        bounds.append((start, S.shape[0]))
+    return bounds
+
+
+def run_batch_match(min_coverage=DEFAULT_MIN_COVERAGE, workers=WORKERS, max_chunk_nnz=MAX_CHUNK_NNZ):
+    """Matches every student in the database against every job."""
+    return match_matrices(*load_matrices(), min_coverage=min_coverage, workers=workers, max_chunk_nnz=max_chunk_nnz)
+
+
+def match_matrices(student_ids, job_ids, skills, S, J,
+                   min_coverage=DEFAULT_MIN_COVERAGE, workers=WORKERS, max_chunk_nnz=MAX_CHUNK_NNZ):
+    """
+    A student qualifies for a job when they hold at least
+    ceil(min_coverage * required skills) of its skills.
+    Returns a JSON-serializable report of the aggregates.
+    """
+    started = time.perf_counter()
+    job_sizes = np.asarray(J.sum(axis=1)).ravel()
+    required = np.maximum(np.ceil(job_sizes * min_coverage - 1e-9), 1).astype(np.int32)
+
+    per_student = np.zeros(len(student_ids), dtype=np.int64)
+    per_job = np.zeros(len(job_ids), dtype=np.int64)
+    blocked = np.zeros(len(skills), dtype=np.int64)
+    near_miss = np.zeros(len(skills), dtype=np.int64)
+
+    def _accumulate(results):
+        # Fold each chunk in as it arrives so only one chunk's output is alive.
+        for start, chunk_students, chunk_jobs, chunk_blocked, chunk_near in results:
+            per_student[start:start + len(chunk_students)] = chunk_students
+            per_job[:] += chunk_jobs
+            blocked[:] += chunk_blocked
+            near_miss[:] += chunk_near
+
+    bounds = _chunk_bounds(S, J, max_chunk_nnz) if len(job_ids) else []
+    if workers > 1 and len(bounds) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(S, J, required)) as pool:
+            _accumulate(pool.map(_match_chunk, bounds))
+    else:
+        _init_worker(S, J, required)
+        _accumulate(_match_chunk(b) for b in bounds)
+
+    top_jobs = np.argsort(-per_job, kind='stable')[:20]
+    top_gaps = np.argsort(-blocked, kind='stable')[:50]
+    return {
+        'students': len(student_ids),
+        'jobs': len(job_ids),
+        'skills': len(skills),
+        'min_coverage': min_coverage,
+        'chunks': len(bounds),
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+        # qualifying_jobs_histogram[k] = number of students qualifying for exactly k jobs
+        'qualifying_jobs_histogram': np.bincount(per_student).tolist() if len(per_student) else [],
+        'students_with_no_job': int((per_student == 0).sum()),
+        'top_jobs': [
+            {'job_id': int(job_ids[i]), 'qualified_students': int(per_job[i])}
+            for i in top_jobs if per_job[i]
+        ],
+        'skill_gaps': [
+            {'skill': skills[i], 'students_blocked': int(blocked[i]), 'near_miss_pairs': int(near_miss[i])}
+            for i in top_gaps if blocked[i]
+        ],
+    }
+
+
+def synthetic_matrices(n_students, n_jobs, n_skills=2000, skills_per_student=6, skills_per_job=8, seed=0):
+    """
+    Random skill matrices for load testing, with a Zipf-like skill
+    popularity so a few skills are very common (like real job boards).
+    """
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, n_skills + 1)
+    popularity /= popularity.sum()
+
+    def _random_rows(n_rows, per_row):
+        cols = rng.choice(n_skills, size=(n_rows, per_row), p=popularity)
+        M = sp.csr_matrix(
+            (np.ones(cols.size, dtype=np.int32), (np.repeat(np.arange(n_rows), per_row), cols.ravel())),
+            shape=(n_rows, n_skills),
+        )
+        M.data[:] = 1 # duplicates were summed
+        return M
+
+    return (
+        np.arange(n_students, dtype=np.int64),
+        np.arange(n_jobs, dtype=np.int64),
+        [f'skill_{i}' for i in range(n_skills)],
+        _random_rows(n_students, skills_per_student),
+        _random_rows(n_jobs, skills_per_job),
+    )
+
+
+# ==============================================================================
+# 3. CACHED REPORT + QUERIES
+# ==============================================================================
+
+@register('build_match_report')
+def build_match_report(min_coverage=DEFAULT_MIN_COVERAGE):
+    """Runs the matcher and stores the report for this min_coverage."""
+    report = run_batch_match(min_coverage=min_coverage)
+    BatchMatchReport.objects.update_or_create(min_coverage=min_coverage, defaults={'report': report})
+    return report
+
+
+def get_match_report(min_coverage=DEFAULT_MIN_COVERAGE, refresh=False):
+    """
+    Returns (report, computed_at) from the last stored match, or (None, None)
+    if there is none yet. A missing or stale report (or refresh=True) queues
+    a 'build_match_report' task; the matcher never runs in the caller.
+    """
+    if min_coverage not in MIN_COVERAGE_CHOICES:
+        raise ValueError(f"min_coverage must be one of {', '.join(map(str, MIN_COVERAGE_CHOICES))}.")
+    stored = BatchMatchReport.objects.filter(min_coverage=min_coverage).first()
+    stale = stored is None or stored.computed_at < timezone.now() - timedelta(seconds=REPORT_CACHE_SECONDS)
+    if refresh or stale:
+        transaction.on_commit(lambda: enqueue('build_match_report', {'min_coverage': min_coverage}, unique=True))
+    if stored is None:
+        return None, None
+    return stored.report, stored.computed_at
+
+
+def students_with_at_least(report, min_jobs):
+    """How many students qualify for at least `min_jobs` (>= 0) jobs."""
+    if min_jobs < 0:
+        raise ValueError("min_jobs must be at least 0.")
+    return int(sum(report['qualifying_jobs_histogram'][min_jobs:]))
+
+
+def summarize_report(report, thresholds=(1, 5, 10, 20, 50, 100)):
+    """A compact view of the report for the chat synthesizer."""
+    return {
+        'students': report['students'],
+        'jobs': report['jobs'],
+        'min_coverage': report['min_coverage'],
+        'students_qualifying_for_at_least': {
+            str(k): students_with_at_least(report, k) for k in thresholds
+        },
+        'students_with_no_job': report['students_with_no_job'],
+        'top_jobs': report['top_jobs'][:10],
+        'top_skill_gaps': report['skill_gaps'][:10],
+    }
@@ -0,0 +1,89 @@
+# core/content_cache.py
+# Content-addressed cache of extraction results. Uploads are hashed
+# (SHA-256, streamed in chunks) and the hash maps to the extracted text and
+# the parsed profile fields, so an identical re-upload skips OCR and Gemini.
+
+import hashlib
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import DocumentContentCache
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def sha256_of_file(file):
+    """
+    Streams a Django File / UploadedFile through SHA-256 without reading it
+    whole. A file that was closed (e.g. a model's FieldFile, which chunks()
+    opens from storage) is closed again; an open one is rewound.
+    """
+    was_closed = file.closed
+    digest = hashlib.sha256()
+    try:
+        for chunk in file.chunks(chunk_size=HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    finally:
+        if was_closed:
+            file.close()
+        else:
+            file.seek(0)
+    return digest.hexdigest()
+
+
+def cached_text(content_hash):
+    """Returns the cached extracted text for this content, or None."""
+    if not content_hash:
+        return None
+    text = (
+        DocumentContentCache.objects
+        .filter(content_hash=content_hash, extracted_text__isnull=False)
+        .values_list('extracted_text', flat=True)
+        .first()
+    )
+    if text is not None:
+        DocumentContentCache.objects.filter(content_hash=content_hash).update(hits=F('hits') + 1)
+    return text
+
+
+def store_text(content_hash, text):
+    if content_hash:
+        DocumentContentCache.objects.update_or_create(
+            content_hash=content_hash, defaults={'extracted_text': text}
+        )
+
+
+def cached_fields(content_hash, kind):
+    """Returns the cached parsed fields for this content and extraction kind, or None."""
+    if not content_hash or not kind:
+        return None
+    parsed = (
+        DocumentContentCache.objects
+        .filter(content_hash=content_hash)
+        .values_list('parsed_fields', flat=True)
+        .first()
+    )
+    return (parsed or {}).get(kind)
+
+
+def store_fields(content_hash, kind, fields):
+    if not content_hash or not kind:
+        return
+    with transaction.atomic():
+        entry, _ = DocumentContentCache.objects.select_for_update().get_or_create(content_hash=content_hash)
+        entry.parsed_fields = {**(entry.parsed_fields or {}), kind: fields}
+        entry.save(update_fields=['parsed_fields'])
+
+
+def is_fully_cached(content_hash, kind):
+    """True if both the text and (for parsed kinds) the fields are cached."""
+    if not content_hash:
+        return False
+    entry = (
+        DocumentContentCache.objects
+        .filter(content_hash=content_hash, extracted_text__isnull=False)
+        .values('parsed_fields')
+        .first()
+    )
+    return entry is not None and (kind is None or kind in (entry['parsed_fields'] or {}))
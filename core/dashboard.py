@@ -0,0 +1,161 @@
+# core/dashboard.py
+# Admin dashboard reads: keyset ("cursor") pages of students and documents
+# with server-side filters and field projection. A page is one range scan of
+# the ordering index (students_name_keyset_idx / documents_issue_keyset_idx),
+# so it costs the same at any table size; totals come from the separate
+# dashboard_counts() call instead of being recomputed for every page.
+
+import base64
+import json
+from datetime import date
+
+from django.db.models import F, Q
+
+from .models import Document, Student
+from .serializers import DOCUMENT_VALUES, STUDENT_VALUES
+
+# What StudentSerializer / DocumentSerializer return, in the same order
+STUDENT_FIELDS = STUDENT_VALUES.fields
+DOCUMENT_FIELDS = DOCUMENT_VALUES.fields
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+# Largest value of an integer primary key column
+MAX_ID = 2 ** 31 - 1
+
+
+def parse_id(value):
+    """An id from a query parameter or cursor; ValueError unless it is an integer in the key range."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError
+    value = int(value)
+    if not 0 < value <= MAX_ID:
+        raise ValueError
+    return value
+
+
+def _parse_text(value):
+    if not isinstance(value, str):
+        raise ValueError
+    return value
+
+
+def _parse_optional_date(value):
+    return None if value is None else date.fromisoformat(_parse_text(value))
+
+
+def decode_cursor(cursor, parsers):
+    """
+    Decodes a cursor made by encode_cursor(), converting each value with its
+    parser. Anything malformed raises ValueError (a 400 in the views).
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except ValueError:
+        raise ValueError("Invalid cursor.")
+
+
+def parse_fields(raw):
+    """
+    Splits ?fields=a,b,c into (student fields, document fields); each
+    resource keeps the names it has. No ?fields= means every field.
+    """
+    if not raw:
+        return STUDENT_FIELDS, DOCUMENT_FIELDS
+    requested = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = set(requested) - set(STUDENT_FIELDS) - set(DOCUMENT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}.")
+    return ([f for f in STUDENT_FIELDS if f in requested] or ['student_id'],
+            [f for f in DOCUMENT_FIELDS if f in requested] or ['document_id'])
+
+
+def filter_students(params):
+    students = Student.objects.all()
+    if params.get('search'):
+        students = students.filter(full_name__icontains=params['search'])
+    return students
+
+
+def filter_documents(params):
+    """?status= and ?document_type= take comma-separated values; ?search= matches the student's name."""
+    documents = Document.objects.all()
+    if params.get('status'):
+        documents = documents.filter(verification_status__in=params['status'].split(','))
+    if params.get('document_type'):
+        documents = documents.filter(document_type__in=params['document_type'].split(','))
+    if params.get('student_id'):
+        try:
+            documents = documents.filter(student_id=parse_id(params['student_id']))
+        except ValueError:
+            raise ValueError("Invalid student_id.")
+    if params.get('search'):
+        documents = documents.filter(student__full_name__icontains=params['search'])
+    return documents
+
+
+def _page(rows, serializer, fields, limit):
+    """
+    Splits value tuples of serializer.columns(fields) followed by the keyset
+    columns into (page of dicts, next cursor or None).
+    """
+    n = len(fields)
+    data = serializer.from_rows((row[:n] for row in rows[:limit]), fields)
+    if len(rows) <= limit:
+        return data, None
+    keys = rows[limit - 1][n:]
+    return data, encode_cursor([key.isoformat() if isinstance(key, date) else key for key in keys])
+
+
+def student_page(params, fields, limit):
+    """Students by name (then id), after ?students_cursor=. Returns (rows, next cursor or None)."""
+    students = filter_students(params).order_by('full_name', 'student_id')
+    if params.get('students_cursor'):
+        name, student_id = decode_cursor(params['students_cursor'], [_parse_text, parse_id])
+        # The redundant full_name >= bound is what lets the index scan start at the cursor
+        students = students.filter(Q(full_name__gte=name), Q(full_name__gt=name) | Q(student_id__gt=student_id))
+    rows = list(students.values_list(*STUDENT_VALUES.columns(fields), 'full_name', 'student_id')[:limit + 1])
+    return _page(rows, STUDENT_VALUES, fields, limit)
+
+
+def document_page(params, fields, limit):
+    """
+    Documents by issue date, newest first and undated last (then id), after
+    ?documents_cursor=. Returns (rows, next cursor or None).
+    """
+    columns = DOCUMENT_VALUES.columns(fields) + ['issue_date', 'document_id']
+    documents = filter_documents(params).order_by(F('issue_date').desc(nulls_last=True), '-document_id')
+    if not params.get('documents_cursor'):
+        return _page(list(documents.values_list(*columns)[:limit + 1]), DOCUMENT_VALUES, fields, limit)
+
+    issue_date, document_id = decode_cursor(params['documents_cursor'], [_parse_optional_date, parse_id])
+    rows = []
+    if issue_date is not None:
+        # Dated rows after the cursor; issue_date <= bound for the index range scan
+        rows = list(documents.filter(
+            Q(issue_date__lte=issue_date), Q(issue_date__lt=issue_date) | Q(document_id__lt=document_id)
+        ).values_list(*columns)[:limit + 1])
+        document_id = None
+    if len(rows) <= limit:
+        # ...then the undated tail (a second range of the same index)
+        undated = documents.filter(issue_date__isnull=True)
+        if document_id is not None:
+            undated = undated.filter(document_id__lt=document_id)
+        rows += list(undated.values_list(*columns)[:limit + 1 - len(rows)])
+    return _page(rows, DOCUMENT_VALUES, fields, limit)
+
+
+def dashboard_counts(params):
+    """Totals for the same filters as the pages."""
+    return {
+        'students': filter_students(params).count(),
+        'documents': filter_documents(params).count(),
+    }
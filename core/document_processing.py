@@ -0,0 +1,235 @@
+# core/document_processing.py
+# Background pipeline for uploaded documents: text extraction (PDF / OCR)
+# followed by the LLM profile ETL. Uploads only save the file and queue a
+# 'process_document' task, so the request returns immediately and clients
+# poll Document.processing_status. Content seen before (same SHA-256) is
+# served from the content cache and processed inline instead.
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .content_cache import cached_text, is_fully_cached, sha256_of_file, store_text
+from .models import Document
+from .tasks import PermanentTaskError, enqueue, register
+from .utils import extract_text_from_file
+
+# Document types worth extracting text from (the rest, e.g. Aadhar, are skipped)
+HIGH_VALUE_DOCS = [
+    'Resume', '10th Marksheet', '12th Marksheet',
+    'B.Tech Marksheet', 'Income Certificate'
+]
+
+# Allowed processing_status transitions. 'processing' -> 'queued' is a retry,
+# 'failed' / 'processed' -> 'queued' is a manual re-run.
+PROCESSING_TRANSITIONS = {
+    'uploaded': {'queued', 'skipped'},
+    'queued': {'processing'},
+    'processing': {'processed', 'failed', 'queued'},
+    'failed': {'queued'},
+    'processed': {'queued'},
+    'skipped': set(),
+}
+
+PROCESS_DOCUMENT_MAX_ATTEMPTS = 3
+# Documents of one bulk upload extracted / parsed concurrently (threads: the
+# work is OCR subprocesses and LLM HTTP calls).
+BULK_PROCESSING_WORKERS = getattr(settings, 'BULK_PROCESSING_WORKERS', 4)
+
+
+def transition(document_id, new_status, error=None):
+    """
+    Moves a document to `new_status` if that is allowed from its current
+    status. Uses a conditional UPDATE so two workers can never both win the
+    same transition. Returns True if the row was updated.
+    """
+    allowed_from = [old for old, targets in PROCESSING_TRANSITIONS.items() if new_status in targets]
+    updated = Document.objects.filter(
+        document_id=document_id, processing_status__in=allowed_from
+    ).update(processing_status=new_status, processing_error=error)
+    return updated == 1
+
+
+def _has_text(extracted_text):
+    return bool(extracted_text) and not extracted_text.startswith("Error") and extracted_text != "No text found."
+
+
+def queue_document(document):
+    """
+    Marks a freshly saved document as queued (or skipped for low-value types)
+    and enqueues its processing once the surrounding transaction commits.
+    """
+    if not document.uploaded_file or document.document_type not in HIGH_VALUE_DOCS:
+        print(f"Low-value document '{document.document_type}'. Skipping text extraction.")
+        document.extracted_text = "Text extraction not required for this document type."
+        document.processing_status = 'skipped'
+        document.save(update_fields=['extracted_text', 'processing_status'])
+        return document
+
+    if not transition(document.document_id, 'queued'):
+        return document
+    document.processing_status = 'queued'
+    document.processing_error = None
+
+    # Identical content was extracted and parsed before: finish in-request.
+    from query_analyzer import extraction_kind
+    if is_fully_cached(document.content_hash, extraction_kind(document.document_type)):
+        try:
+            # Own savepoint, so a DB error here leaves the caller's transaction usable
+            with transaction.atomic():
+                process_document(document.document_id)
+            document.refresh_from_db(fields=['extracted_text', 'processing_status', 'processing_error'])
+            return document
+        except Exception as e:
+            print(f"Inline processing of cached document {document.document_id} failed: {e}. Queueing it.")
+            _on_process_document_failure({'document_id': document.document_id}, e, will_retry=True)
+
+    transaction.on_commit(lambda: enqueue(
+        'process_document', {'document_id': document.document_id},
+        max_attempts=PROCESS_DOCUMENT_MAX_ATTEMPTS,
+    ))
+    return document
+
+
+def _on_process_document_failure(payload, error, will_retry):
+    new_status = 'queued' if will_retry else 'failed'
+    transition(payload['document_id'], new_status, error=str(error)[:1000])
+
+
+def _extract_text(document):
+    """
+    Step 1 of processing: fills document.extracted_text. Text kept from an
+    earlier attempt, or cached for these exact bytes, is reused; otherwise
+    the file is extracted (PDF text layer / OCR).
+    """
+    if not document.content_hash:
+        # Uploaded before content hashing existed
+        document.content_hash = sha256_of_file(document.uploaded_file)
+        document.save(update_fields=['content_hash'])
+
+    if not _has_text(document.extracted_text):
+        document.extracted_text = cached_text(document.content_hash)
+    if not _has_text(document.extracted_text):
+        extracted_text = extract_text_from_file(document.uploaded_file.name)
+        if extracted_text and extracted_text.startswith("Error extracting text: Unsupported"):
+            document.extracted_text = extracted_text
+            document.save(update_fields=['extracted_text'])
+            raise PermanentTaskError(extracted_text)
+        document.extracted_text = extracted_text or "No text found."
+        document.save(update_fields=['extracted_text'])
+        if not _has_text(extracted_text):
+            raise RuntimeError(document.extracted_text)
+        store_text(document.content_hash, extracted_text)
+    else:
+        document.save(update_fields=['extracted_text'])
+
+
+@register('process_document', on_failure=_on_process_document_failure)
+def process_document(document_id):
+    """Extracts a document's text and merges the parsed fields into the profile."""
+    if not transition(document_id, 'processing'):
+        print(f"Document {document_id} is not queued for processing. Skipping.")
+        return
+    document = Document.objects.select_related('student').get(document_id=document_id)
+    print(f"High-value document '{document.document_type}' detected. Running extraction...")
+
+    # 1. Extract raw text
+    _extract_text(document)
+
+    # 2. Parse text AND update the profile (ETL)
+    from query_analyzer import update_profile_from_text
+    method = update_profile_from_text(document.student, document.document_type, document.extracted_text,
+                                      raise_errors=True, content_hash=document.content_hash)
+    if method:
+        Document.objects.filter(document_id=document_id).update(extraction_method=method)
+
+    transition(document_id, 'processed')
+
+
+# ==============================================================================
+# BULK UPLOADS: one task per upload request
+# ==============================================================================
+
+def queue_documents(documents):
+    """
+    Bulk variant of queue_document(): low-value documents are skipped, the
+    high-value ones are processed together by one 'process_document_batch'
+    task. Returns the documents with their new processing_status.
+    """
+    batch = []
+    for document in documents:
+        if not document.uploaded_file or document.document_type not in HIGH_VALUE_DOCS:
+            queue_document(document) # marks it skipped
+        elif transition(document.document_id, 'queued'):
+            document.processing_status = 'queued'
+            batch.append(document.document_id)
+    if batch:
+        transaction.on_commit(lambda: enqueue('process_document_batch', {'document_ids': batch}, max_attempts=1))
+    return documents
+
+
+def _extract_and_parse(document):
+    """Worker-thread body: returns (parsed_data, method) for one document."""
+    from query_analyzer import parse_profile_fields
+    try:
+        _extract_text(document)
+        return parse_profile_fields(document.document_type, document.extracted_text,
+                                    content_hash=document.content_hash)
+    finally:
+        # Each worker thread opens its own DB connection; don't leak it.
+        connection.close()
+
+
+def _requeue_individually(payload, error, will_retry):
+    # The batch as a whole is not retried: documents it left in 'processing'
+    # fall back to single-document tasks, which have their own retries.
+    for document_id in payload['document_ids']:
+        requeued = Document.objects.filter(document_id=document_id, processing_status='processing').update(
+            processing_status='queued', processing_error=str(error)[:1000]
+        )
+        if requeued:
+            enqueue('process_document', {'document_id': document_id}, max_attempts=PROCESS_DOCUMENT_MAX_ATTEMPTS)
+
+
+@register('process_document_batch', on_failure=_requeue_individually)
+def process_document_batch(document_ids):
+    """
+    Extracts and parses several documents of one student in parallel, then
+    applies all parsed fields in a single StudentProfile merge. Documents that
+    fail are re-queued as single 'process_document' tasks.
+    """
+    claimed = [document_id for document_id in document_ids if transition(document_id, 'processing')]
+    documents = list(Document.objects.select_related('student').filter(document_id__in=claimed).order_by('document_id'))
+    if not documents:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(BULK_PROCESSING_WORKERS, len(documents)))) as pool:
+        futures = [pool.submit(_extract_and_parse, document) for document in documents]
+
+    parsed, succeeded, failed = [], [], []
+    for document, future in zip(documents, futures):
+        try:
+            parsed_data, method = future.result()
+        except PermanentTaskError as e:
+            transition(document.document_id, 'failed', error=str(e)[:1000])
+            continue
+        except Exception as e:
+            print(f"ERROR: Batch processing of document {document.document_id} failed: {e}")
+            failed.append((document.document_id, e))
+            continue
+        succeeded.append((document.document_id, method))
+        if parsed_data is not None:
+            parsed.append((document.student, parsed_data))
+
+    # One atomic profile merge for the whole batch
+    if parsed:
+        from query_analyzer import apply_parsed_fields_batch
+        apply_parsed_fields_batch(parsed)
+
+    for document_id, method in succeeded:
+        if method:
+            Document.objects.filter(document_id=document_id).update(extraction_method=method)
+        transition(document_id, 'processed')
+    for document_id, error in failed:
+        _requeue_individually({'document_ids': [document_id]}, error, will_retry=True)
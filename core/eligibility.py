@@ -0,0 +1,369 @@
+# core/eligibility.py
+# Typed scholarship eligibility: parses the loose eligibility strings that
+# come from the partner dataset into typed columns, and filters every
+# scholarship for a student profile with numpy boolean masks.
+
+import re
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .models import Scholarship
+
+# Signals only invalidate the snapshot in the process that made the change,
+# so other processes rebuild it after this many seconds.
+SNAPSHOT_TTL_SECONDS = getattr(settings, 'ELIGIBILITY_SNAPSHOT_TTL', 300)
+# Largest ?limit= the eligible-scholarships endpoint accepts
+MAX_ELIGIBLE_LIMIT = 500
+
+# ==============================================================================
+# 1. PARSERS (loose partner strings -> typed values)
+# ==============================================================================
+
+# Canonical values for the enumerated criteria. Keys are lower-cased spellings
+# seen in the partner data (including its typos).
+EDUCATION_LEVELS = {
+    'undergraduate': 'Undergraduate', 'ug': 'Undergraduate',
+    'postgraduate': 'Postgraduate', 'pg': 'Postgraduate',
+    'doctorate': 'Doctorate', 'doctrate': 'Doctorate', 'phd': 'Doctorate',
+}
+GENDERS = {'male': 'Male', 'm': 'Male', 'female': 'Female', 'f': 'Female'}
+COMMUNITIES = {
+    'general': 'General', 'gen': 'General', 'obc': 'OBC',
+    'sc/st': 'SC/ST', 'sc': 'SC/ST', 'st': 'SC/ST', 'minority': 'Minority',
+}
+RELIGIONS = {
+    'hindu': 'Hindu', 'muslim': 'Muslim', 'christian': 'Christian',
+    'chirstian': 'Christian', 'others': 'Others', 'other': 'Others',
+}
+
+# Values that mean "no restriction" for a criterion.
+ANY_VALUES = {'', 'any', 'all', 'none', 'nan', 'na', 'n/a', 'null'}
+
+_AMOUNT_RE = re.compile(r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(lakhs?|lacs?|l|k|cr|crores?)?\b', re.IGNORECASE)
+_UNIT_MULTIPLIERS = {'l': 100000, 'lakh': 100000, 'lakhs': 100000, 'lac': 100000, 'lacs': 100000,
+                     'k': 1000, 'cr': 10000000, 'crore': 10000000, 'crores': 10000000}
+
+
+def _clean(value):
+    """Returns a stripped string, or None for empty / 'any' values."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.lower() in ANY_VALUES:
+        return None
+    return value
+
+
+def parse_enum(value, mapping):
+    """Maps a loose string onto its canonical enum value (None = any)."""
+    value = _clean(value)
+    if value is None:
+        return None
+    return mapping.get(value.lower(), value)
+
+
+def parse_bool(value):
+    """'Yes'/'No' (and friends) -> True/False, anything else -> None."""
+    value = _clean(value)
+    if value is None:
+        return None
+    lowered = value.lower()
+    if lowered in ('yes', 'y', 'true', '1', 'in'):
+        return True
+    if lowered in ('no', 'n', 'false', '0', 'out'):
+        return False
+    return None
+
+
+def _parse_amounts(text):
+    amounts = []
+    for number, unit in _AMOUNT_RE.findall(text):
+        amount = float(number.replace(',', ''))
+        if unit:
+            amount *= _UNIT_MULTIPLIERS[unit.lower()]
+        amounts.append(int(amount))
+    return amounts
+
+
+def parse_income_range(value):
+    """
+    Parses an income bracket into (income_min, income_max) in rupees.
+    e.g. 'Upto 1.5L' -> (None, 150000), '1.5L to 3L' -> (150000, 300000),
+         'Above 6L' -> (600000, None), 'Rs. 2,50,000' -> (None, 250000)
+    """
+    value = _clean(value)
+    if value is None:
+        return None, None
+    amounts = _parse_amounts(value)
+    if not amounts:
+        return None, None
+    lowered = value.lower()
+    if len(amounts) >= 2:
+        return min(amounts[:2]), max(amounts[:2])
+    if any(word in lowered for word in ('above', 'more than', 'over', 'greater')):
+        return amounts[0], None
+    # A single figure ("Upto 1.5L", "below 2 lakh", "250000") is a cap.
+    return None, amounts[0]
+
+
+def parse_percentage_range(value):
+    """
+    Parses a percentage band into (percentage_min, percentage_max).
+    e.g. '90-100' -> (90.0, 100.0), '>= 60%' -> (60.0, None)
+    """
+    value = _clean(value)
+    if value is None:
+        return None, None
+    numbers = [float(n) for n in re.findall(r'\d+(?:\.\d+)?', value)]
+    if not numbers:
+        return None, None
+    if len(numbers) >= 2:
+        return min(numbers[:2]), max(numbers[:2])
+    if any(word in value.lower() for word in ('upto', 'up to', 'below', 'less', '<')):
+        return None, numbers[0]
+    return numbers[0], None
+
+
+def parse_eligibility_criteria(criteria):
+    """
+    Turns a partner eligibility_criteria dict into the typed column values
+    stored on the Scholarship model.
+    """
+    criteria = criteria or {}
+    income_min, income_max = parse_income_range(criteria.get('income'))
+    percentage_min, percentage_max = parse_percentage_range(criteria.get('annual_percentage'))
+    return {
+        'education_level': parse_enum(criteria.get('education_qualification'), EDUCATION_LEVELS),
+        'gender': parse_enum(criteria.get('gender'), GENDERS),
+        'community': parse_enum(criteria.get('community'), COMMUNITIES),
+        'religion': parse_enum(criteria.get('religion'), RELIGIONS),
+        'income_min': income_min,
+        'income_max': income_max,
+        'percentage_min': percentage_min,
+        'percentage_max': percentage_max,
+        'exservice_men': parse_bool(criteria.get('exservice_men')),
+        'disability': parse_bool(criteria.get('disability')),
+        'sports': parse_bool(criteria.get('sports')),
+        'india': parse_bool(criteria.get('india')),
+    }
+
+
+# ==============================================================================
+# 2. VECTORIZED ENGINE (all scholarships as numpy columns)
+# ==============================================================================
+
+ENUM_FIELDS = ['education_level', 'gender', 'community', 'religion']
+BOOL_FIELDS = ['exservice_men', 'disability', 'sports', 'india']
+
+
+class ScholarshipMatrix:
+    """
+    Column-oriented snapshot of every scholarship's typed criteria.
+    Enums are encoded as int codes (-1 = any), booleans as int8 (-1 = any)
+    and numeric bounds as float64 (NaN = unbounded).
+    """
+
+    def __init__(self, rows):
+        self.ids = np.array([r['scholarship_id'] for r in rows], dtype=np.int64)
+        self.names = [r['scholarship_name'] for r in rows]
+        self.amounts = [r['amount'] for r in rows]
+
+        self.codes = {}
+        self.enums = {}
+        for field in ENUM_FIELDS:
+            vocabulary = sorted({r[field] for r in rows if r[field] is not None})
+            self.codes[field] = {value: i for i, value in enumerate(vocabulary)}
+            self.enums[field] = np.array(
+                [self.codes[field][r[field]] if r[field] is not None else -1 for r in rows],
+                dtype=np.int32,
+            )
+
+        self.bools = {
+            field: np.array([-1 if r[field] is None else int(r[field]) for r in rows], dtype=np.int8)
+            for field in BOOL_FIELDS
+        }
+
+        def _bound(field):
+            return np.array([np.nan if r[field] is None else r[field] for r in rows], dtype=np.float64)
+
+        self.income_min = _bound('income_min')
+        self.income_max = _bound('income_max')
+        self.percentage_min = _bound('percentage_min')
+        self.percentage_max = _bound('percentage_max')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def mask_for(self, attributes):
+        """
+        Returns a boolean mask of the scholarships the given student
+        attributes satisfy. Attributes that are unknown (None) do not filter.
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        for field in ENUM_FIELDS:
+            value = attributes.get(field)
+            if value is None:
+                continue
+            code = self.codes[field].get(value, -2) # -2 only matches "any"
+            column = self.enums[field]
+            mask &= (column == -1) | (column == code)
+
+        for field in BOOL_FIELDS:
+            value = attributes.get(field)
+            if value is None:
+                continue
+            column = self.bools[field]
+            mask &= (column == -1) | (column == int(value))
+
+        income = attributes.get('income')
+        if income is not None:
+            mask &= np.isnan(self.income_min) | (self.income_min <= income)
+            mask &= np.isnan(self.income_max) | (income <= self.income_max)
+
+        percentage = attributes.get('percentage')
+        if percentage is not None:
+            mask &= np.isnan(self.percentage_min) | (self.percentage_min <= percentage)
+            mask &= np.isnan(self.percentage_max) | (percentage <= self.percentage_max)
+
+        return mask
+
+    def any_match(self, attribute_list):
+        """
+        Batched mask_for: one entry per attributes dict, True when it
+        satisfies at least one scholarship. The whole batch is evaluated as a
+        single (students x scholarships) mask.
+        """
+        mask = np.ones((len(attribute_list), len(self)), dtype=bool)
+
+        for field in ENUM_FIELDS:
+            values = [attributes.get(field) for attributes in attribute_list]
+            unknown = np.array([value is None for value in values], dtype=bool)[:, None]
+            codes = np.array([self.codes[field].get(value, -2) for value in values], dtype=np.int32)[:, None]
+            column = self.enums[field]
+            mask &= unknown | (column == -1) | (column == codes)
+
+        for field in BOOL_FIELDS:
+            values = np.array(
+                [-1 if attributes.get(field) is None else int(attributes[field]) for attributes in attribute_list],
+                dtype=np.int8,
+            )[:, None]
+            column = self.bools[field]
+            mask &= (values == -1) | (column == -1) | (column == values)
+
+        for key, lower, upper in (
+            ('income', self.income_min, self.income_max),
+            ('percentage', self.percentage_min, self.percentage_max),
+        ):
+            values = np.array(
+                [np.nan if attributes.get(key) is None else attributes[key] for attributes in attribute_list],
+                dtype=np.float64,
+            )[:, None]
+            unknown = np.isnan(values)
+            mask &= unknown | np.isnan(lower) | (lower <= values)
+            mask &= unknown | np.isnan(upper) | (values <= upper)
+
+        return mask.any(axis=1)
+
+
+_matrix = None
+_matrix_built_at = 0.0
+_matrix_lock = threading.Lock()
+
+
+def get_scholarship_matrix():
+    """Returns the cached ScholarshipMatrix, (re)building it when missing or expired."""
+    global _matrix, _matrix_built_at
+    with _matrix_lock:
+        if _matrix is None or time.monotonic() - _matrix_built_at > SNAPSHOT_TTL_SECONDS:
+            rows = list(Scholarship.objects.order_by('scholarship_id').values(
+                'scholarship_id', 'scholarship_name', 'amount',
+                'income_min', 'income_max', 'percentage_min', 'percentage_max',
+                *ENUM_FIELDS, *BOOL_FIELDS,
+            ))
+            _matrix = ScholarshipMatrix(rows)
+            _matrix_built_at = time.monotonic()
+        return _matrix
+
+
+def invalidate_scholarship_matrix():
+    """Drops this process's cached matrix. Other processes rebuild theirs after SNAPSHOT_TTL_SECONDS."""
+    global _matrix
+    with _matrix_lock:
+        _matrix = None
+
+
+def education_level_from_degrees(degrees):
+    """Best-effort guess of the level a student is currently studying at."""
+    lowered = ' '.join(degrees or []).lower()
+    if any(word in lowered for word in ('ph.d', 'phd', 'doctor')):
+        return 'Doctorate'
+    if any(word in lowered for word in ('m.tech', 'm.sc', 'msc', 'mba', 'master', 'mca')):
+        return 'Postgraduate'
+    if any(word in lowered for word in ('b.tech', 'b.sc', 'bsc', 'b.e', 'bca', 'bachelor', 'b.com', 'b.a', '12th')):
+        return 'Undergraduate'
+    return None
+
+
+def get_student_attributes(student, profile=None):
+    """
+    Builds the attribute dict the engine filters on from the student's
+    StudentProfile plus any self-declared details in Student.profile_details
+    (gender, community, religion, education_level, disability, ...).
+    """
+    if profile is None:
+        profile = getattr(student, 'studentprofile', None)
+    if profile is None:
+        return attributes_from_values(student.profile_details, None, None, [])
+    return attributes_from_values(
+        student.profile_details, profile.annual_income, profile.highest_percentage, profile.degrees,
+    )
+
+
+def attributes_from_values(profile_details, income, percentage, degrees):
+    """get_student_attributes for raw column values (e.g. from values_list())."""
+    details = profile_details or {}
+    attributes = {
+        'income': income,
+        'percentage': percentage,
+        'education_level': parse_enum(details.get('education_level'), EDUCATION_LEVELS)
+            or education_level_from_degrees(degrees),
+        'gender': parse_enum(details.get('gender'), GENDERS),
+        'community': parse_enum(details.get('community'), COMMUNITIES),
+        'religion': parse_enum(details.get('religion'), RELIGIONS),
+    }
+    for field in BOOL_FIELDS:
+        attributes[field] = parse_bool(details.get(field))
+    return attributes
+
+
+def find_eligible_scholarships(attributes, limit=None):
+    """
+    Filters all scholarships for the given attributes and returns one entry
+    per distinct scholarship name (the partner dataset stores one row per
+    criteria combination), ordered by how many criteria rows matched.
+    """
+    matrix = get_scholarship_matrix()
+    if not len(matrix):
+        return []
+    matched = np.flatnonzero(matrix.mask_for(attributes))
+
+    results = {}
+    for index in matched:
+        name = matrix.names[index]
+        entry = results.get(name)
+        if entry is None:
+            results[name] = {
+                'scholarship_id': int(matrix.ids[index]),
+                'scholarship_name': name,
+                'amount': matrix.amounts[index],
+                'matching_criteria_rows': 1,
+            }
+        else:
+            entry['matching_criteria_rows'] += 1
+
+    eligible = sorted(results.values(), key=lambda e: (-e['matching_criteria_rows'], e['scholarship_name']))
+    return eligible[:limit] if limit else eligible
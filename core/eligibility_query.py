@@ -0,0 +1,149 @@
+# core/eligibility_query.py
+# The supported, parameterized version of the hand-written CTE in
+# complex_queries.sql: matches a student's *verified* document data against
+# the JSON eligibility criteria of govt_jobs and scholarships.
+# Backed by the govt_jobs / scholarships expression indexes from migration
+# 0006 (PostgreSQL); 0018 dropped the ones no plan used.
+
+from django.db import connection
+
+# Step 1: the student's verified degree, percentage and income, taken from
+# their 'Verified' documents (uses documents_student_status_idx).
+VERIFIED_STUDENT_CTE = """
+    WITH verified_student AS (
+        SELECT
+            s.student_id,
+            s.full_name,
+            s.email,
+            MAX(d.verified_data ->> 'degree') AS verified_degree,
+            MAX(eduverify_to_numeric(d.verified_data ->> 'percentage')) AS verified_percentage,
+            MAX(eduverify_to_numeric(d.verified_data ->> 'income_pa')) AS verified_income
+        FROM students s
+        JOIN documents d ON s.student_id = d.student_id
+        WHERE s.student_id = %(student_id)s
+          AND d.verification_status = 'Verified'
+          AND d.verified_data IS NOT NULL
+        GROUP BY s.student_id, s.full_name, s.email
+    )
+"""
+
+VERIFIED_STUDENT_SQL = VERIFIED_STUDENT_CTE + """
+    SELECT student_id, full_name, email, verified_degree, verified_percentage, verified_income
+    FROM verified_student
+"""
+
+# Steps 2 + 3: eligible jobs and scholarships. The predicates are written in
+# exactly the form of the index expressions so the planner can use them:
+#   - govt_jobs_degree_min_pct_idx for (degree, min_cgpa * 10)
+#   - scholarships_max_income_pa_idx / scholarships_min_percentage_idx
+ELIGIBLE_ITEMS_SQL = VERIFIED_STUDENT_CTE + """
+    SELECT *
+    FROM (
+        SELECT
+            'job' AS kind,
+            gj.job_id AS item_id,
+            gj.job_title AS title,
+            gj.eligibility_criteria ->> 'degree' AS required_degree,
+            eduverify_to_numeric(gj.eligibility_criteria ->> 'min_cgpa') * 10 AS required_percentage,
+            NULL::numeric AS max_income
+        FROM verified_student v
+        JOIN govt_jobs gj
+          ON (gj.eligibility_criteria ->> 'degree') IN (v.verified_degree, 'Any Graduate')
+         AND (eduverify_to_numeric(gj.eligibility_criteria ->> 'min_cgpa') * 10) <= v.verified_percentage
+
+        UNION ALL
+
+        SELECT
+            'scholarship' AS kind,
+            sc.scholarship_id AS item_id,
+            sc.scholarship_name AS title,
+            NULL AS required_degree,
+            eduverify_to_numeric(sc.eligibility_criteria ->> 'min_percentage') AS required_percentage,
+            eduverify_to_numeric(sc.eligibility_criteria ->> 'max_income_pa') AS max_income
+        FROM verified_student v
+        JOIN scholarships sc
+          ON eduverify_to_numeric(sc.eligibility_criteria ->> 'max_income_pa') >= v.verified_income
+         AND eduverify_to_numeric(sc.eligibility_criteria ->> 'min_percentage') <= v.verified_percentage
+    ) AS eligible
+    ORDER BY kind, item_id
+    LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+def _fetch_dicts(cursor):
+    columns = [col[0] for col in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def get_verified_eligibility(student_id, limit=DEFAULT_LIMIT, offset=0):
+    """
+    Runs the eligibility query for one student. Returns None if the student
+    has no verified document data, otherwise their verified values plus the
+    eligible jobs and scholarships (one page of `limit` rows).
+    """
+    params = {'student_id': student_id, 'limit': min(limit, MAX_LIMIT), 'offset': offset}
+    with connection.cursor() as cursor:
+        cursor.execute(VERIFIED_STUDENT_SQL, params)
+        verified = _fetch_dicts(cursor)
+        if not verified:
+            return None
+        cursor.execute(ELIGIBLE_ITEMS_SQL, params)
+        items = _fetch_dicts(cursor)
+
+    student = verified[0]
+    return {
+        'student_id': student['student_id'],
+        'full_name': student['full_name'],
+        'email': student['email'],
+        'verified_degree': student['verified_degree'],
+        'verified_percentage': _float(student['verified_percentage']),
+        'verified_income': _float(student['verified_income']),
+        'eligible_jobs': [
+            {
+                'job_id': i['item_id'],
+                'job_title': i['title'],
+                'required_degree': i['required_degree'],
+                'required_percentage': _float(i['required_percentage']),
+            }
+            for i in items if i['kind'] == 'job'
+        ],
+        'eligible_scholarships': [
+            {
+                'scholarship_id': i['item_id'],
+                'scholarship_name': i['title'],
+                'min_percentage': _float(i['required_percentage']),
+                'max_income': _float(i['max_income']),
+            }
+            for i in items if i['kind'] == 'scholarship'
+        ],
+        'limit': params['limit'],
+        'offset': offset,
+    }
+
+
+def explain_eligibility_query(student_id, analyze=True):
+    """Returns the JSON EXPLAIN plan of the eligibility query for one student."""
+    options = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN ({options}) ' + ELIGIBLE_ITEMS_SQL,
+                       {'student_id': student_id, 'limit': MAX_LIMIT, 'offset': 0})
+        plan = cursor.fetchone()[0]
+    # psycopg2 already decodes json columns
+    return plan[0] if isinstance(plan, list) else plan
+
+
+def indexes_used(plan_node):
+    """Collects the names of every index a plan node (or its children) scans."""
+    names = set()
+    if 'Index Name' in plan_node:
+        names.add(plan_node['Index Name'])
+    for child in plan_node.get('Plans', []):
+        names |= indexes_used(child)
+    return names
@@ -0,0 +1,156 @@
+# core/export_jobs.py
+# Asynchronous document bundle exports. A request creates an ExportJob and
+# queues a 'build_export' task; the worker writes the PDF / ZIP to
+# EXPORT_JOB_DIR, updating documents_done as it goes so clients can poll
+# progress, then the file is downloadable until the job expires. A request
+# for the same documents, format and verification statuses reuses the
+# existing job instead of building the bundle again.
+
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .content_cache import sha256_of_file
+from .models import Document, ExportJob
+from .pdf_export import EXPORT_CACHE_DIR, build_document_bundle, prune_export_cache, stream_document_zip
+from .tasks import enqueue, register
+
+EXPORT_JOB_DIR = getattr(settings, 'EXPORT_JOB_DIR', os.path.join(EXPORT_CACHE_DIR, 'jobs'))
+EXPORT_JOB_TTL_SECONDS = getattr(settings, 'EXPORT_JOB_TTL_SECONDS', 24 * 60 * 60)
+EXPORT_JOB_MAX_ATTEMPTS = 2
+EXPORT_CONTENT_TYPES = {'pdf': 'application/pdf', 'zip': 'application/zip'}
+
+
+def _documents(student_id, document_ids):
+    return Document.objects.filter(student_id=student_id, document_id__in=document_ids).order_by('document_type')
+
+
+def export_fingerprint(documents, export_format):
+    """
+    Identifies the bundle `documents` would produce: same format, files and
+    verification statuses means the same bytes.
+    """
+    digest = hashlib.sha256(export_format.encode())
+    for doc in sorted(documents, key=lambda d: d.document_id):
+        if doc.uploaded_file and not doc.content_hash:
+            try:
+                doc.content_hash = sha256_of_file(doc.uploaded_file)
+                doc.save(update_fields=['content_hash'])
+            except OSError:
+                pass # Missing file: skipped by the export as well
+        digest.update(f"|{doc.document_id}:{doc.content_hash or ''}:{doc.verification_status}".encode())
+    return digest.hexdigest()
+
+
+def request_export(student, document_ids, export_format='pdf'):
+    """
+    Returns (job, reused). Reuses a pending or unexpired finished job with
+    the same fingerprint; otherwise creates one and queues its build once
+    the surrounding transaction commits. Returns (None, False) if none of
+    `document_ids` belong to the student.
+    """
+    documents = list(_documents(student.student_id, document_ids))
+    if not documents:
+        return None, False
+    fingerprint = export_fingerprint(documents, export_format)
+
+    existing = (
+        ExportJob.objects
+        .filter(student=student, fingerprint=fingerprint, status__in=['queued', 'running', 'done'])
+        .exclude(expires_at__lte=timezone.now())
+        .order_by('-created_at')
+        .first()
+    )
+    if existing is not None and (existing.status != 'done' or os.path.exists(existing.file_path or '')):
+        return existing, True
+
+    job = ExportJob.objects.create(
+        student=student,
+        document_ids=[doc.document_id for doc in documents],
+        export_format=export_format,
+        fingerprint=fingerprint,
+        documents_total=len(documents),
+    )
+    transaction.on_commit(lambda: enqueue('build_export', {'job_id': str(job.job_id)},
+                                          max_attempts=EXPORT_JOB_MAX_ATTEMPTS))
+    return job, False
+
+
+def _with_progress(job, documents):
+    """Yields `documents`, recording each one as done once the consumer asks for the next."""
+    for done, doc in enumerate(documents):
+        if done:
+            ExportJob.objects.filter(job_id=job.job_id).update(documents_done=done)
+        yield doc
+    ExportJob.objects.filter(job_id=job.job_id).update(documents_done=len(documents))
+
+
+def _on_build_export_failure(payload, error, will_retry):
+    ExportJob.objects.filter(job_id=payload['job_id']).update(
+        status='queued' if will_retry else 'failed', error=str(error)[:1000]
+    )
+
+
+@register('build_export', on_failure=_on_build_export_failure)
+def build_export(job_id):
+    """Writes the job's bundle to EXPORT_JOB_DIR and marks it downloadable."""
+    prune_expired_exports()
+    prune_export_cache()
+    # 'running' too: the task of a crashed worker is re-queued with its job still marked running
+    if not ExportJob.objects.filter(job_id=job_id, status__in=['queued', 'running']).update(
+        status='running', documents_done=0
+    ):
+        print(f"Export {job_id} is not queued. Skipping.")
+        return
+    job = ExportJob.objects.get(job_id=job_id)
+    documents = list(_documents(job.student_id, job.document_ids))
+    # Statuses may have changed since the request: describe what is actually built
+    fingerprint = export_fingerprint(documents, job.export_format)
+
+    os.makedirs(EXPORT_JOB_DIR, exist_ok=True)
+    final_path = os.path.join(EXPORT_JOB_DIR, f"{job.job_id}.{job.export_format}")
+    fd, tmp_path = tempfile.mkstemp(dir=EXPORT_JOB_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if job.export_format == 'zip':
+                for chunk in stream_document_zip(_with_progress(job, documents)):
+                    f.write(chunk)
+            else:
+                build_document_bundle(_with_progress(job, documents), f)
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    now = timezone.now()
+    ExportJob.objects.filter(job_id=job_id).update(
+        status='done', fingerprint=fingerprint, documents_total=len(documents), documents_done=len(documents),
+        file_path=final_path, error=None, finished_at=now,
+        expires_at=now + timedelta(seconds=EXPORT_JOB_TTL_SECONDS),
+    )
+
+
+def prune_expired_exports():
+    """Deletes expired export jobs; their files go with them (see models.delete_export_file)."""
+    deleted, _ = ExportJob.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def export_job_status(job):
+    """The JSON-able view of a job that clients poll."""
+    return {
+        'job_id': str(job.job_id),
+        'status': job.status,
+        'format': job.export_format,
+        'documents_done': job.documents_done,
+        'documents_total': job.documents_total,
+        'progress': round(job.documents_done / job.documents_total, 2) if job.documents_total else None,
+        'error': job.error,
+        'created_at': job.created_at,
+        'expires_at': job.expires_at,
+    }
@@ -0,0 +1,322 @@
+# core/field_extraction.py
+# Rule-based extraction of profile fields (percentage / CGPA, degrees,
+# income, skills) from document text. Runs before the LLM in
+# update_profile_from_text; Gemini is only called when the rules are not
+# confident enough.
+
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db.models import Count
+
+from .eligibility import SNAPSHOT_TTL_SECONDS
+from .models import Document, Skill
+
+# Results below this confidence are handed to the LLM instead.
+MIN_CONFIDENCE = getattr(settings, 'FIELD_EXTRACTION_MIN_CONFIDENCE', 0.8)
+# A resume needs at least this many dictionary skills to skip the LLM, since
+# the dictionary cannot know every skill a resume may list.
+MIN_RESUME_SKILLS = 5
+
+# ==============================================================================
+# 1. PERCENTAGE / CGPA / DEGREES (marksheets)
+# ==============================================================================
+
+_NUMBER = r'(\d{1,3}(?:\.\d{1,2})?)'
+
+# (pattern, confidence) in priority order; the first confident match wins.
+PERCENTAGE_PATTERNS = [
+    (re.compile(r'\b(?:percentage|aggregate|overall\s+%|total\s+%)\s*(?:of\s+marks)?\s*[:\-=]?\s*' + _NUMBER + r'\s*%?', re.I), 0.9),
+    (re.compile(r'\b(?:marks|score)\s+(?:obtained|secured)\s*[:\-=]?\s*' + _NUMBER + r'\s*%', re.I), 0.85),
+]
+CGPA_PATTERN = re.compile(r'\b(?:CGPA|CPI|GPA)\s*[:\-=]?\s*(\d{1,2}(?:\.\d{1,2})?)\s*(?:/\s*10(?:\.0+)?)?', re.I)
+MARKS_TOTAL_PATTERN = re.compile(
+    r'\b(?:grand\s+)?total\b[^\d\n]{0,30}(\d{2,4})\s*(?:/|out\s+of)\s*(\d{2,4})', re.I
+)
+LOOSE_PERCENT_PATTERN = re.compile(r'\b' + _NUMBER + r'\s*%')
+
+# Canonical degree name -> pattern (the names used across the app / LLM prompt)
+DEGREE_PATTERNS = {
+    'B.Tech': re.compile(r'\bB\.?\s?Tech\b|\bBachelor\s+of\s+Technology\b', re.I),
+    'B.E': re.compile(r'\bB\.E\.?(?=\W)|\bBachelor\s+of\s+Engineering\b', re.I),
+    'B.Sc': re.compile(r'\bB\.?\s?Sc\b|\bBachelor\s+of\s+Science\b', re.I),
+    'B.Com': re.compile(r'\bB\.?\s?Com\b|\bBachelor\s+of\s+Commerce\b', re.I),
+    'BCA': re.compile(r'\bBCA\b|\bBachelor\s+of\s+Computer\s+Applications?\b', re.I),
+    'M.Tech': re.compile(r'\bM\.?\s?Tech\b|\bMaster\s+of\s+Technology\b', re.I),
+    'M.Sc': re.compile(r'\bM\.?\s?Sc\b|\bMaster\s+of\s+Science\b', re.I),
+    'MBA': re.compile(r'\bMBA\b|\bMaster\s+of\s+Business\s+Administration\b', re.I),
+    'MCA': re.compile(r'\bMCA\b|\bMaster\s+of\s+Computer\s+Applications?\b', re.I),
+    '12th': re.compile(r'\b(?:Senior\s+(?:School|Secondary)|Higher\s+Secondary|Class\s*(?:XII|12)|12th|Intermediate)\b', re.I),
+    '10th': re.compile(r'\b(?:Secondary\s+School\s+(?:Examination|Certificate)|Matriculation|Class\s*(?:X|10)\b|10th|High\s+School)', re.I),
+}
+
+
+def _valid_percentage(value):
+    return 30.0 <= value <= 100.0
+
+
+def extract_percentage(text):
+    """Returns (percentage, confidence) or (None, 0.0)."""
+    for pattern, confidence in PERCENTAGE_PATTERNS:
+        for match in pattern.finditer(text):
+            value = float(match.group(1))
+            if _valid_percentage(value):
+                return value, confidence
+
+    # CGPA on a 10-point scale, converted the way the rest of the app does (x 10)
+    match = CGPA_PATTERN.search(text)
+    if match and 4.0 <= float(match.group(1)) <= 10.0:
+        return round(float(match.group(1)) * 10, 2), 0.85
+
+    match = MARKS_TOTAL_PATTERN.search(text)
+    if match:
+        obtained, maximum = int(match.group(1)), int(match.group(2))
+        if 0 < obtained <= maximum:
+            value = round(obtained * 100.0 / maximum, 2)
+            if _valid_percentage(value):
+                return value, 0.8
+
+    # Any "NN.N %" on the page: plausible, but not enough to skip the LLM.
+    values = [float(v) for v in LOOSE_PERCENT_PATTERN.findall(text) if _valid_percentage(float(v))]
+    if len(values) == 1:
+        return values[0], 0.6
+    return None, 0.0
+
+
+def extract_degrees(text):
+    return [name for name, pattern in DEGREE_PATTERNS.items() if pattern.search(text)]
+
+
+# ==============================================================================
+# 2. INCOME (income certificates)
+# ==============================================================================
+
+INCOME_LABEL_PATTERN = re.compile(
+    r'\b(?:annual\s+(?:family\s+)?income|income\s+(?:per\s+annum|p\.?\s?a\.?)|total\s+(?:annual\s+)?income'
+    r'|income\s+from\s+all\s+sources)', re.I
+)
+# How far past the label (on the same line) the amount may appear
+INCOME_LABEL_WINDOW = 120
+_CURRENCY = r'(?<![a-z])(?:rs\.?|inr|₹)'
+# An amount with its optional currency marker, year-range suffix ("2023-24") and lakh unit
+AMOUNT_PATTERN = re.compile(
+    r'(' + _CURRENCY + r')?\s*(\d[\d,]*(?:\.\d+)?)(\s*-\s*\d{2,4}\b)?\s*(?:/-)?\s*(lakhs?|lacs?)?', re.I
+)
+YEAR_PATTERN = re.compile(r'(?:19|20)\d{2}')
+PER_ANNUM_PATTERN = re.compile(
+    _CURRENCY + r'\s*([\d,]+(?:\.\d+)?)\s*(lakhs?|lacs?)?\s*(?:/-)?\s*(?:per\s+annum|p\.?\s?a\.?|annually)', re.I
+)
+LOOSE_AMOUNT_PATTERN = re.compile(_CURRENCY + r'\s*([\d,]{4,}(?:\.\d+)?)', re.I)
+
+
+def _to_rupees(amount, unit):
+    value = float(amount.replace(',', ''))
+    if unit:
+        value *= 100000
+    return int(value)
+
+
+def _labelled_income(text):
+    """
+    The amount following an income label, as (rupees, confidence). Years and
+    year ranges ("for 2022", "financial year 2023-24") are skipped; an amount
+    without a currency marker or lakh unit is not trusted enough to skip the LLM.
+    """
+    unmarked = None
+    for label in INCOME_LABEL_PATTERN.finditer(text):
+        window = text[label.end():label.end() + INCOME_LABEL_WINDOW].split('\n')[0]
+        for currency, amount, year_range, unit in AMOUNT_PATTERN.findall(window):
+            amount = amount.rstrip(',')
+            if year_range or not (currency or unit) and YEAR_PATTERN.fullmatch(amount):
+                continue
+            value = _to_rupees(amount, unit)
+            if value <= 0:
+                continue
+            if currency or unit:
+                return value, 0.9
+            if unmarked is None:
+                unmarked = value
+    if unmarked is not None:
+        return unmarked, 0.7
+    return None, 0.0
+
+
+def extract_income(text):
+    """Returns (annual income in rupees, confidence) or (None, 0.0)."""
+    value, confidence = _labelled_income(text)
+    if confidence >= 0.9:
+        return value, confidence
+
+    match = PER_ANNUM_PATTERN.search(text)
+    if match:
+        per_annum = _to_rupees(match.group(1), match.group(2))
+        if per_annum > 0:
+            return per_annum, 0.85
+    if value is not None:
+        return value, confidence
+
+    amounts = {_to_rupees(a, None) for a in LOOSE_AMOUNT_PATTERN.findall(text)}
+    if len(amounts) == 1:
+        return amounts.pop(), 0.6
+    return None, 0.0
+
+
+# ==============================================================================
+# 3. SKILLS (resumes): Aho-Corasick over a skill dictionary
+# ==============================================================================
+
+COMMON_SKILLS = [
+    'Python', 'Java', 'C++', 'C#', 'JavaScript', 'TypeScript', 'Rust', 'Kotlin', 'Swift', 'Golang',
+    'PHP', 'Ruby', 'MATLAB', 'Scala', 'SQL', 'PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'SQLite',
+    'HTML', 'CSS', 'React', 'Angular', 'Vue.js', 'Node.js', 'Express.js', 'Django', 'Flask', 'FastAPI',
+    'Spring Boot', 'REST APIs', 'GraphQL', 'Git', 'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP',
+    'Linux', 'Bash', 'CI/CD', 'Jenkins', 'Terraform', 'Machine Learning', 'Deep Learning',
+    'Data Analysis', 'Data Science', 'Data Structures', 'Algorithms', 'NLP', 'Computer Vision',
+    'TensorFlow', 'PyTorch', 'Keras', 'scikit-learn', 'Pandas', 'NumPy', 'Matplotlib', 'Tableau',
+    'Power BI', 'Excel', 'Statistics', 'Hadoop', 'Apache Spark', 'Android', 'iOS', 'Flutter',
+    'Networking', 'Cyber Security', 'DBMS', 'Operating Systems', 'OOP', 'Embedded Systems',
+    'AutoCAD', 'SolidWorks', 'Accounting', 'Tally', 'Communication', 'Leadership', 'Teamwork',
+    'Project Management', 'Agile', 'Figma', 'Photoshop',
+]
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: finds every dictionary term in one pass over the
+    text, however many terms there are. Matches are case-insensitive and
+    must sit on word boundaries.
+    """
+
+    def __init__(self, terms):
+        # terms: {normalized term: display value}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for term, value in terms.items():
+            node = 0
+            for ch in term:
+                if ch not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[node][ch] = len(self.goto) - 1
+                node = self.goto[node][ch]
+            self.output[node].append((len(term), value))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.output[child] += self.output[self.fail[child]]
+
+    def find(self, text):
+        """Returns the dictionary values found in `text`, in order of first appearance."""
+        text = text.casefold()
+        found = {}
+        node = 0
+        for end, ch in enumerate(text, start=1):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, value in self.output[node]:
+                start = end - length
+                before = text[start - 1] if start > 0 else ' '
+                after = text[end] if end < len(text) else ' '
+                if not before.isalnum() and not (after.isalnum() or after in '+#'):
+                    found.setdefault(value, start)
+        return sorted(found, key=found.get)
+
+
+_skill_matcher = None
+_skill_matcher_built_at = 0.0
+_skill_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """The skill automaton (built-in list + the skills table), rebuilt after the snapshot TTL."""
+    global _skill_matcher, _skill_matcher_built_at
+    with _skill_matcher_lock:
+        if _skill_matcher is None or time.monotonic() - _skill_matcher_built_at > SNAPSHOT_TTL_SECONDS:
+            terms = {}
+            for name in list(COMMON_SKILLS) + list(Skill.objects.values_list('skill_name', flat=True)):
+                key = ' '.join(name.split()).casefold()
+                # Single letters (e.g. "C", "R") are too ambiguous to match in free text
+                if len(key) > 1:
+                    terms.setdefault(key, name)
+            _skill_matcher = AhoCorasick(terms)
+            _skill_matcher_built_at = time.monotonic()
+        return _skill_matcher
+
+
+SKILLS_HEADER = re.compile(r'^\s*(?:technical\s+|key\s+)?skills\b', re.I | re.M)
+
+
+def extract_skills(text):
+    """Returns (skills, confidence)."""
+    skills = get_skill_matcher().find(text)
+    if len(skills) >= MIN_RESUME_SKILLS and SKILLS_HEADER.search(text):
+        return skills, 0.9
+    if len(skills) >= MIN_RESUME_SKILLS:
+        return skills, 0.8
+    return skills, 0.5 if skills else 0.0
+
+
+# ==============================================================================
+# 4. ENTRY POINT + BYPASS STATS
+# ==============================================================================
+
+def extract_fields(kind, text):
+    """
+    Runs the rules for one extraction kind ('marksheet' / 'income' / 'resume').
+    Returns (fields, confidence): fields in the same shape the LLM returns,
+    confidence the lowest confidence of the kind's required fields.
+    """
+    text = text or ''
+    if kind == 'marksheet':
+        percentage, confidence = extract_percentage(text)
+        fields = {}
+        if percentage is not None:
+            fields['percentage'] = percentage
+        degrees = extract_degrees(text)
+        if degrees:
+            fields['degrees'] = degrees
+        return fields, confidence
+    if kind == 'income':
+        income, confidence = extract_income(text)
+        return ({'income': income} if income is not None else {}), confidence
+    if kind == 'resume':
+        skills, confidence = extract_skills(text)
+        return ({'skills': skills} if skills else {}), confidence
+    return {}, 0.0
+
+
+def is_confident(confidence):
+    return confidence >= MIN_CONFIDENCE
+
+
+def extraction_bypass_stats():
+    """
+    How processed documents got their fields (Document.extraction_method):
+    'rules' and 'cache' skipped the LLM, 'llm' did not.
+    """
+    counts = dict(
+        Document.objects.filter(extraction_method__isnull=False)
+        .values_list('extraction_method')
+        .annotate(n=Count('document_id'))
+    )
+    total = sum(counts.values())
+    bypassed = counts.get('rules', 0) + counts.get('cache', 0)
+    return {
+        'by_method': counts,
+        'total': total,
+        'llm_bypass_rate': round(bypassed / total, 4) if total else None,
+        'min_confidence': MIN_CONFIDENCE,
+    }
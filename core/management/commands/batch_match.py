@@ -0,0 +1,42 @@
+import json
+import resource
+
+from django.core.management.base import BaseCommand
+
+from core.batch_matching import (
+    DEFAULT_MIN_COVERAGE, MAX_CHUNK_NNZ, WORKERS,
+    match_matrices, run_batch_match, summarize_report, synthetic_matrices,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the all-students x all-jobs batch matcher and prints a summary. "
+        "Use --synthetic to benchmark at scale without touching the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-coverage', type=float, default=DEFAULT_MIN_COVERAGE)
+        parser.add_argument('--workers', type=int, default=WORKERS)
+        parser.add_argument('--max-chunk-nnz', type=int, default=MAX_CHUNK_NNZ)
+        parser.add_argument('--synthetic', nargs=2, type=int, metavar=('STUDENTS', 'JOBS'),
+                            help="Match random skill matrices of this size instead of the database.")
+
+    def handle(self, *args, **options):
+        match_options = {
+            'min_coverage': options['min_coverage'],
+            'workers': options['workers'],
+            'max_chunk_nnz': options['max_chunk_nnz'],
+        }
+        if options['synthetic']:
+            n_students, n_jobs = options['synthetic']
+            report = match_matrices(*synthetic_matrices(n_students, n_jobs), **match_options)
+        else:
+            report = run_batch_match(**match_options)
+
+        summary = summarize_report(report)
+        summary['chunks'] = report['chunks']
+        summary['elapsed_seconds'] = report['elapsed_seconds']
+        # ru_maxrss is in KiB on Linux
+        summary['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        self.stdout.write(json.dumps(summary, indent=2))
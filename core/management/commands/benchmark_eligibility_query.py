@@ -0,0 +1,144 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.eligibility_query import explain_eligibility_query, get_verified_eligibility, indexes_used
+
+DEGREES = ['B.Tech', 'B.Sc', 'B.Com', 'B.A', 'BCA', 'M.Tech', 'M.Sc', 'MBA', 'MCA', 'Any Graduate']
+
+# Synthetic rows are generated in SQL so seeding 100k+ rows takes seconds.
+SEED_SQL = [
+    """
+    INSERT INTO govt_jobs (job_title, job_description, eligibility_criteria, source_url)
+    SELECT 'Bench Job ' || g, 'Synthetic job for the eligibility benchmark',
+           jsonb_build_object(
+               'degree', (%(degrees)s::text[])[1 + (g %% %(n_degrees)s)],
+               'min_cgpa', round((5 + random() * 4.5)::numeric, 1)
+           ),
+           NULL
+    FROM generate_series(1, %(rows)s) AS g
+    """,
+    """
+    INSERT INTO scholarships (scholarship_name, description, eligibility_criteria, amount)
+    SELECT 'Bench Scholarship ' || g, 'Synthetic scholarship for the eligibility benchmark',
+           jsonb_build_object(
+               'max_income_pa', (50000 + floor(random() * 20) * 50000)::int,
+               'min_percentage', (50 + floor(random() * 9) * 5)::int
+           ),
+           '10000'
+    FROM generate_series(1, %(rows)s) AS g
+    """,
+    """
+    INSERT INTO students (full_name, email, password, profile_details)
+    SELECT 'Bench Student ' || g, 'bench' || g || '@eduverify.bench', '!', NULL
+    FROM generate_series(1, %(students)s) AS g
+    """,
+    """
+    INSERT INTO documents (student_id, document_type, verification_status, processing_status, verified_data)
+    SELECT s.student_id, t.document_type,
+           CASE WHEN random() < 0.5 THEN 'Verified' ELSE 'Pending' END, 'skipped',
+           jsonb_build_object(
+               'degree', (%(degrees)s::text[])[1 + (s.student_id %% %(n_degrees)s)],
+               'percentage', round((55 + random() * 40)::numeric, 1),
+               'income_pa', (50000 + floor(random() * 20) * 50000)::int
+           )
+    FROM students s
+    CROSS JOIN (VALUES ('12th Marksheet'), ('B.Tech Marksheet'), ('Income Certificate')) AS t(document_type)
+    WHERE s.email LIKE '%%@eduverify.bench'
+    """,
+]
+
+TARGET_SQL = """
+    INSERT INTO students (full_name, email, password) VALUES ('Bench Target', 'target@eduverify.bench', '!')
+    RETURNING student_id
+"""
+
+TARGET_DOCUMENT_SQL = """
+    INSERT INTO documents (student_id, document_type, verification_status, processing_status, verified_data)
+    VALUES (%(student_id)s, 'B.Tech Marksheet', 'Verified', 'skipped',
+            jsonb_build_object('degree', %(degree)s, 'percentage', %(percentage)s, 'income_pa', %(income)s))
+"""
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds synthetic jobs/scholarships/documents inside a transaction, runs "
+        "EXPLAIN ANALYZE on the verified-eligibility query with and without "
+        "index scans, reports the plans' index usage and timings, then rolls back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000, help="Jobs and scholarships to seed (each).")
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--degree', default='M.Tech')
+        parser.add_argument('--percentage', type=float, default=62.0)
+        parser.add_argument('--income', type=int, default=900000)
+        parser.add_argument('--keep', action='store_true', help="Commit the seeded rows instead of rolling back.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("This benchmark needs PostgreSQL (JSONB expression indexes).")
+
+        try:
+            with transaction.atomic():
+                report = self.run_benchmark(options)
+                self.stdout.write(json.dumps(report, indent=2))
+                if not options['keep']:
+                    raise _Rollback()
+        except _Rollback:
+            self.stdout.write("Rolled back seeded rows.")
+
+    def run_benchmark(self, options):
+        params = {
+            'rows': options['rows'],
+            'students': options['students'],
+            'degrees': DEGREES,
+            'n_degrees': len(DEGREES),
+        }
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            for statement in SEED_SQL:
+                cursor.execute(statement, params)
+            cursor.execute(TARGET_SQL)
+            student_id = cursor.fetchone()[0]
+            cursor.execute(TARGET_DOCUMENT_SQL, {
+                'student_id': student_id,
+                'degree': options['degree'],
+                'percentage': options['percentage'],
+                'income': options['income'],
+            })
+            for table in ('govt_jobs', 'scholarships', 'students', 'documents'):
+                cursor.execute(f'ANALYZE {table}')
+        seed_seconds = time.perf_counter() - started
+
+        with_indexes = explain_eligibility_query(student_id)
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_indexscan = off')
+            cursor.execute('SET LOCAL enable_bitmapscan = off')
+            without_indexes = explain_eligibility_query(student_id)
+            cursor.execute('SET LOCAL enable_indexscan = on')
+            cursor.execute('SET LOCAL enable_bitmapscan = on')
+
+        result = get_verified_eligibility(student_id)
+        return {
+            'rows_per_table': options['rows'],
+            'students': options['students'],
+            'seed_seconds': round(seed_seconds, 2),
+            'target': {k: options[k] for k in ('degree', 'percentage', 'income')},
+            'eligible_jobs_in_first_page': len(result['eligible_jobs']),
+            'eligible_scholarships_in_first_page': len(result['eligible_scholarships']),
+            'with_indexes': {
+                'execution_ms': with_indexes['Execution Time'],
+                'indexes_used': sorted(indexes_used(with_indexes['Plan'])),
+            },
+            'without_index_scans': {
+                'execution_ms': without_indexes['Execution Time'],
+                'indexes_used': sorted(indexes_used(without_indexes['Plan'])),
+            },
+        }
@@ -0,0 +1,253 @@
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pytesseract
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pdf2image import convert_from_path
+from PIL import Image, ImageFilter
+from pypdf import PdfReader, PdfWriter
+
+from core import ocr
+from core.management.commands.benchmark_ocr_preprocessing import similarity
+from core.utils import extract_text_from_file
+
+CORPUS_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.tiff')
+SCAN_DPI = 150
+
+
+# ==============================================================================
+# 1. CORPUS
+# ==============================================================================
+
+def _page_texts(path):
+    with open(path, 'rb') as f:
+        return [page.extract_text() or "" for page in PdfReader(f).pages]
+
+
+def _degrade(image, rng):
+    """Makes a clean page render look like a flatbed scan."""
+    image = image.convert('L').rotate(rng.uniform(-1.5, 1.5), expand=True, fillcolor=255)
+    image = image.filter(ImageFilter.GaussianBlur(rng.uniform(0.4, 0.9)))
+    noise = Image.effect_noise(image.size, 12)
+    return Image.blend(image, noise, 0.08)
+
+
+def _scanned_pdf(source, target, rng, keep_first_page_digital=False):
+    """Writes an image-only (or, with keep_first_page_digital, mixed) copy of `source`."""
+    pages = convert_from_path(source, dpi=SCAN_DPI)
+    scanned = [_degrade(page, rng).convert('RGB') for page in pages]
+    if not keep_first_page_digital:
+        scanned[0].save(target, save_all=True, append_images=scanned[1:], resolution=SCAN_DPI)
+        return
+
+    # Mixed: the original (digital) first page followed by scanned pages. A
+    # one-page source gets a scanned copy of itself as page 2.
+    rest = scanned[1:] or scanned[:1]
+    buffer = io.BytesIO()
+    rest[0].save(buffer, 'PDF', save_all=True, append_images=rest[1:], resolution=SCAN_DPI)
+    writer = PdfWriter()
+    writer.add_page(PdfReader(source).pages[0])
+    for page in PdfReader(io.BytesIO(buffer.getvalue())).pages:
+        writer.add_page(page)
+    with open(target, 'wb') as f:
+        writer.write(f)
+
+
+def _photo(source, target, rng):
+    """A phone-photo-like JPEG of the first page: large, tilted, on a dark table."""
+    page = convert_from_path(source, dpi=300, first_page=1, last_page=1)[0].convert('L')
+    page = page.rotate(rng.uniform(-5, 5), expand=True, fillcolor=50)
+    photo = Image.new('L', (page.width + 400, page.height + 400), 50)
+    photo.paste(page, (200, 200))
+    photo.convert('RGB').save(target, 'JPEG', quality=88)
+
+
+def build_corpus(directory, truth_dir, synthetic, workdir, seed):
+    """
+    Returns [{name, path, variant, truth}] for every distinct file in
+    `directory` (duplicates by SHA-256 are skipped) plus synthetic scanned /
+    mixed / photo variants of the first `synthetic` digital PDFs, whose
+    ground truth is the original text layer.
+    """
+    rng = random.Random(seed)
+    corpus, seen = [], set()
+    for path in sorted(glob.glob(os.path.join(directory, '*'))):
+        if not path.lower().endswith(CORPUS_EXTENSIONS):
+            continue
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        name = os.path.basename(path)
+        truth = None
+        truth_file = os.path.join(truth_dir, os.path.splitext(name)[0] + '.txt') if truth_dir else None
+        if truth_file and os.path.exists(truth_file):
+            with open(truth_file, encoding='utf-8') as f:
+                truth = f.read()
+        corpus.append({'name': name, 'path': path, 'variant': 'original', 'truth': truth})
+
+    skipped = None
+    if synthetic and not shutil.which('pdftoppm'):
+        skipped = "poppler (pdftoppm) not found: synthetic variants need it to render pages"
+        synthetic = 0
+
+    sources = []
+    for entry in corpus:
+        if len(sources) >= synthetic:
+            break
+        if entry['path'].lower().endswith('.pdf'):
+            texts = _page_texts(entry['path'])
+            if texts and not any(ocr.page_needs_ocr(t) for t in texts):
+                sources.append((entry, texts))
+
+    for entry, texts in sources:
+        stem = os.path.splitext(entry['name'])[0]
+        scanned = os.path.join(workdir, f'{stem}__scanned.pdf')
+        _scanned_pdf(entry['path'], scanned, rng)
+        corpus.append({'name': os.path.basename(scanned), 'path': scanned, 'variant': 'scanned',
+                       'truth': "\n".join(texts)})
+
+        mixed = os.path.join(workdir, f'{stem}__mixed.pdf')
+        _scanned_pdf(entry['path'], mixed, rng, keep_first_page_digital=True)
+        corpus.append({'name': os.path.basename(mixed), 'path': mixed, 'variant': 'mixed',
+                       'truth': "\n".join([texts[0]] + (texts[1:] or texts[:1]))})
+
+        photo = os.path.join(workdir, f'{stem}__photo.jpg')
+        _photo(entry['path'], photo, rng)
+        corpus.append({'name': os.path.basename(photo), 'path': photo, 'variant': 'photo', 'truth': texts[0]})
+    return corpus, skipped
+
+
+# ==============================================================================
+# 2. MEASUREMENT (one fresh process per file, so peak RSS is per file)
+# ==============================================================================
+
+def _measure(path, queue):
+    report = {}
+    started = time.perf_counter()
+    text = extract_text_from_file(path, report=report)
+    queue.put({
+        'seconds': round(time.perf_counter() - started, 4),
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'peak_ocr_worker_rss_mb': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        'pages': report.get('pages', []),
+        'text': text,
+    })
+
+
+def measure_file(path):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure, args=(path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def _path_taken(result):
+    if result['text'].startswith("Error extracting text"):
+        return 'error'
+    paths = {page['path'] for page in result['pages']}
+    if paths == {'digital'}:
+        return 'digital'
+    if paths == {'ocr'}:
+        return 'ocr'
+    return 'mixed' if paths else 'empty'
+
+
+def _environment():
+    try:
+        tesseract = str(pytesseract.get_tesseract_version())
+    except Exception:
+        tesseract = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'tesseract': tesseract,
+        'poppler': bool(shutil.which('pdftoppm')),
+        'ocr_dpi': ocr.OCR_DPI,
+        'ocr_workers': ocr.OCR_WORKERS,
+        'ocr_preprocess': ocr.OCR_PREPROCESS,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs extract_text_from_file over a corpus (media/uploads plus synthetic "
+        "scanned / mixed / photo variants) and writes a JSON report with per-file "
+        "and per-page timing, peak memory, the digital-vs-OCR path taken and text "
+        "similarity against ground truth, for comparing runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=os.path.join(settings.MEDIA_ROOT, 'uploads'))
+        parser.add_argument('--truth-dir', help="Ground truth as <file stem>.txt for real (scanned) uploads.")
+        parser.add_argument('--synthetic', type=int, default=3,
+                            help="Digital PDFs to derive scanned / mixed / photo variants from.")
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as workdir:
+            corpus, skipped = build_corpus(options['dir'], options['truth_dir'], options['synthetic'],
+                                           workdir, options['seed'])
+            files = []
+            for entry in corpus:
+                result = measure_file(entry['path'])
+                record = {
+                    'file': entry['name'],
+                    'variant': entry['variant'],
+                    'path_taken': _path_taken(result),
+                    'seconds': result['seconds'],
+                    'peak_rss_mb': result['peak_rss_mb'],
+                    'peak_ocr_worker_rss_mb': result['peak_ocr_worker_rss_mb'],
+                    'characters': len(result['text']),
+                    'pages': result['pages'],
+                    'similarity': similarity(result['text'], entry['truth']) if entry['truth'] is not None else None,
+                    'error': result['text'] if result['text'].startswith("Error extracting text") else None,
+                }
+                files.append(record)
+                self.stderr.write(f"{record['file']}: {record['path_taken']} in {record['seconds']}s")
+
+        summary = {}
+        for record in files:
+            group = summary.setdefault(record['path_taken'], {'files': 0, 'pages': 0, 'seconds': 0.0, 'similarities': []})
+            group['files'] += 1
+            group['pages'] += len(record['pages'])
+            group['seconds'] += record['seconds']
+            if record['similarity'] is not None:
+                group['similarities'].append(record['similarity'])
+        for group in summary.values():
+            similarities = group.pop('similarities')
+            group['seconds'] = round(group['seconds'], 3)
+            group['seconds_per_page'] = round(group['seconds'] / group['pages'], 4) if group['pages'] else None
+            group['mean_similarity'] = round(sum(similarities) / len(similarities), 4) if similarities else None
+
+        report = {
+            'environment': _environment(),
+            'corpus': {'dir': options['dir'], 'files': len(files), 'synthetic_skipped': skipped},
+            'summary': summary,
+            'files': files,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+            self.stdout.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,105 @@
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import pytesseract
+from django.core.management.base import BaseCommand
+from pdf2image import convert_from_path
+from PIL import Image, ImageDraw, ImageFilter
+
+from core.ocr import OCR_DPI, OCR_WORKERS, ocr_pdf_pages
+
+SAMPLE_LINES = [
+    "CENTRAL BOARD OF SECONDARY EDUCATION",
+    "Statement of Marks - Senior School Certificate Examination",
+    "Name of Candidate: SAMPLE STUDENT    Roll No: 1234567",
+    "English Core 088   Mathematics 095   Physics 091",
+    "Chemistry 089   Computer Science 097",
+    "Result: PASS    Percentage: 92.0",
+]
+
+
+def make_scanned_pdf(path, pages, dpi=200):
+    """Writes an image-only (no text layer) multi-page PDF that looks like a scan."""
+    width, height = int(8.27 * dpi), int(11.69 * dpi)  # A4
+    images = []
+    for page in range(pages):
+        img = Image.new('L', (width, height), 255)
+        draw = ImageDraw.Draw(img)
+        y = dpi
+        for repeat in range(6):
+            for line in SAMPLE_LINES:
+                draw.text((dpi, y), f"{line}  (page {page + 1})", fill=0)
+                y += dpi // 4
+        images.append(img.filter(ImageFilter.GaussianBlur(0.6)).convert('RGB'))
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=dpi)
+
+
+def _serial_baseline(path, dpi):
+    # The previous implementation: render every page into memory, then OCR one by one.
+    images = convert_from_path(path, dpi=dpi)
+    return "".join(pytesseract.image_to_string(img) for img in images)
+
+
+def _parallel(path, dpi, workers):
+    page_texts = ocr_pdf_pages(path, dpi=dpi, workers=workers)
+    return "".join(page_texts[n] for n in sorted(page_texts))
+
+
+def _measure(target, args, queue):
+    started = time.perf_counter()
+    text = target(*args)
+    queue.put({
+        'wall_seconds': round(time.perf_counter() - started, 2),
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'peak_worker_rss_mb': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        'characters': len(text),
+    })
+
+
+def run_isolated(target, *args):
+    """Runs one variant in a fresh process so peak RSS figures do not mix."""
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure, args=(target, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks scanned-PDF OCR: the old render-everything-then-OCR-serially "
+        "path against the parallel per-page pool. Reports wall time and peak memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help="Benchmark this PDF instead of a synthetic scan.")
+        parser.add_argument('--pages', type=int, default=10, help="Pages in the synthetic scan.")
+        parser.add_argument('--dpi', type=int, default=OCR_DPI)
+        parser.add_argument('--workers', type=int, default=OCR_WORKERS)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = options['file']
+            if not path:
+                path = os.path.join(tmp, 'scan.pdf')
+                make_scanned_pdf(path, options['pages'])
+
+            serial = run_isolated(_serial_baseline, path, options['dpi'])
+            parallel = run_isolated(_parallel, path, options['dpi'], options['workers'])
+
+        report = {
+            'file': options['file'] or f"synthetic scan, {options['pages']} pages",
+            'dpi': options['dpi'],
+            'workers': options['workers'],
+            'cpu_count': os.cpu_count(),
+            'serial_render_all': serial,
+            'parallel_per_page': parallel,
+            'speedup': round(serial['wall_seconds'] / max(parallel['wall_seconds'], 1e-9), 2),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,126 @@
+import difflib
+import glob
+import io
+import json
+import os
+import random
+import time
+
+import pytesseract
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw, ImageFont
+
+from core.ocr import OCR_DPI, preprocess_for_ocr
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tiff')
+
+CERTIFICATE_LINES = [
+    "GOVERNMENT OF RAJASTHAN",
+    "INCOME CERTIFICATE",
+    "This is to certify that the annual family income",
+    "of Shri Ramesh Kumar from all sources is",
+    "Rs. 2,40,000 (Two Lakh Forty Thousand only)",
+    "Certificate No. RJ/2024/118273   Date 12/03/2024",
+    "Tehsildar, Jaipur",
+]
+
+
+def make_photo(angle, seed):
+    """
+    A phone-photo-like JPEG of a certificate: large, slightly rotated, on a
+    dark background with uneven lighting. Returns (jpeg bytes, ground truth).
+    """
+    rng = random.Random(seed)
+    font = ImageFont.load_default(size=56)
+    page = Image.new('L', (2480, 3508), 235)
+    draw = ImageDraw.Draw(page)
+    for i, line in enumerate(CERTIFICATE_LINES):
+        draw.text((220, 400 + i * 110), line, fill=25, font=font)
+    page = page.rotate(angle, expand=True, fillcolor=55)
+    scale = rng.uniform(1.2, 1.4)
+    page = page.resize((int(page.width * scale), int(page.height * scale)))
+    photo = Image.new('L', (page.width + 500, page.height + 500), 55)
+    photo.paste(page, (250, 250))
+    buffer = io.BytesIO()
+    photo.convert('RGB').save(buffer, 'JPEG', quality=88)
+    return buffer.getvalue(), "\n".join(CERTIFICATE_LINES)
+
+
+def similarity(a, b):
+    """Word-level similarity in [0, 1], insensitive to whitespace and case."""
+    return round(difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio(), 4)
+
+
+def _ocr(image_bytes, preprocess, dpi):
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        started = time.perf_counter()
+        prepared = preprocess_for_ocr(image, dpi=dpi) if preprocess else image
+        prepare_seconds = time.perf_counter() - started
+        text = pytesseract.image_to_string(prepared)
+        return {
+            'pixels': prepared.width * prepared.height,
+            'preprocess_seconds': round(prepare_seconds, 3),
+            'total_seconds': round(time.perf_counter() - started, 3),
+        }, text
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures OCR time and text accuracy with and without the image "
+        "pre-processing stage (downsample, grayscale, binarize, deskew, crop) "
+        "on the images in media/uploads plus synthetic certificate photos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=os.path.join(settings.MEDIA_ROOT, 'uploads'))
+        parser.add_argument('--synthetic', type=int, default=6, help="Synthetic photos to generate.")
+        parser.add_argument('--dpi', type=int, default=OCR_DPI)
+
+    def handle(self, *args, **options):
+        corpus = []
+        for path in sorted(glob.glob(os.path.join(options['dir'], '*'))):
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                with open(path, 'rb') as f:
+                    corpus.append((os.path.basename(path), f.read(), None))
+        for i in range(options['synthetic']):
+            angle = (-1) ** i * (1.5 + i)
+            image_bytes, truth = make_photo(angle, seed=i)
+            corpus.append((f"synthetic_photo_{i}_rot{angle:+.1f}", image_bytes, truth))
+
+        files = []
+        for name, image_bytes, truth in corpus:
+            raw_stats, raw_text = _ocr(image_bytes, False, options['dpi'])
+            pre_stats, pre_text = _ocr(image_bytes, True, options['dpi'])
+            entry = {
+                'file': name,
+                'raw': raw_stats,
+                'preprocessed': pre_stats,
+                'speedup': round(raw_stats['total_seconds'] / max(pre_stats['total_seconds'], 1e-9), 2),
+            }
+            if truth is not None:
+                entry['raw']['accuracy'] = similarity(raw_text, truth)
+                entry['preprocessed']['accuracy'] = similarity(pre_text, truth)
+                entry['accuracy_delta'] = round(entry['preprocessed']['accuracy'] - entry['raw']['accuracy'], 4)
+            else:
+                # No ground truth for real uploads: report agreement instead.
+                entry['raw_vs_preprocessed_similarity'] = similarity(raw_text, pre_text)
+            files.append(entry)
+
+        with_truth = [f for f in files if 'accuracy_delta' in f]
+        raw_total = sum(f['raw']['total_seconds'] for f in files)
+        pre_total = sum(f['preprocessed']['total_seconds'] for f in files)
+        report = {
+            'dpi': options['dpi'],
+            'files': files,
+            'summary': {
+                'files': len(files),
+                'raw_ocr_seconds': round(raw_total, 2),
+                'preprocessed_ocr_seconds': round(pre_total, 2),
+                'speedup': round(raw_total / max(pre_total, 1e-9), 2),
+                'mean_accuracy_delta': (
+                    round(sum(f['accuracy_delta'] for f in with_truth) / len(with_truth), 4) if with_truth else None
+                ),
+            },
+        }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,76 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Document, Student
+from core.renderers import ORJSONRenderer
+from core.serializers import DOCUMENT_VALUES, STUDENT_VALUES, DocumentSerializer, StudentSerializer
+
+RESOURCES = {
+    'documents': (Document, 'document_id', DocumentSerializer, DOCUMENT_VALUES),
+    'students': (Student, 'student_id', StudentSerializer, STUDENT_VALUES),
+}
+
+
+def _best_of(repeat, func):
+    """(best wall time in seconds, last result) over `repeat` runs."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = (
+        "Times list serialization + JSON rendering per --rows rows: ModelSerializer + "
+        "DRF's JSONRenderer (before) against ValuesSerializer + ORJSONRenderer (after). "
+        "Reads existing rows (see generate_synthetic_data) and checks both produce the same JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resource', choices=sorted(RESOURCES), default='documents')
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5, help="Best of this many runs is reported.")
+
+    def handle(self, *args, **options):
+        model, pk, serializer_class, values_serializer = RESOURCES[options['resource']]
+        queryset = model.objects.order_by(pk)[:options['rows']]
+        rows = queryset.count()
+        if rows < options['rows']:
+            raise CommandError(f"Only {rows} {options['resource']} in the database; generate more first.")
+        repeat = options['repeat']
+
+        # Fetch (query + row / instance construction) and serialize + render are timed separately
+        fetch_before, instances = _best_of(repeat, lambda: list(queryset.all()))
+        render_before, body_before = _best_of(repeat, lambda: JSONRenderer().render(
+            serializer_class(instances, many=True).data
+        ))
+        fetch_after, values = _best_of(repeat, lambda: list(queryset.values_list(*values_serializer.columns())))
+        render_after, body_after = _best_of(repeat, lambda: ORJSONRenderer().render(
+            values_serializer.from_rows(values)
+        ))
+        if json.loads(body_before) != json.loads(body_after):
+            raise CommandError("The fast path produced different JSON.")
+
+        per_10k = 10000 / rows * 1000
+        report = {
+            'resource': options['resource'],
+            'rows': rows,
+            'identical_output': True,
+            'before_ms_per_10k': {
+                'fetch': round(fetch_before * per_10k, 1),
+                'serialize_render': round(render_before * per_10k, 1),
+            },
+            'after_ms_per_10k': {
+                'fetch': round(fetch_after * per_10k, 1),
+                'serialize_render': round(render_after * per_10k, 1),
+            },
+            'serialize_render_speedup': round(render_before / render_after, 1),
+            'total_speedup': round((fetch_before + render_before) / (fetch_after + render_after), 1),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,225 @@
+import hashlib
+import math
+import multiprocessing
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from faker import Faker
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from core.document_processing import HIGH_VALUE_DOCS
+from core.models import Document, Student, StudentProfile
+from core.skills import replace_student_skills
+
+EMAIL_DOMAIN = 'loadtest.eduverify.com'
+PLACEHOLDER_DIR = 'uploads/loadtest'
+
+# Career tracks: (share of students, skills in rough order of popularity).
+# Skills are drawn from one track with Zipf-like weights, so a few skills are
+# very common and the long tail is rare, as in real resumes.
+SKILL_TRACKS = {
+    'web': (0.30, ['JavaScript', 'HTML', 'CSS', 'React', 'Git', 'Node.js', 'SQL', 'Python', 'TypeScript',
+                   'Express.js', 'MongoDB', 'REST APIs', 'Django', 'Angular', 'Vue.js', 'Docker', 'GraphQL', 'Figma']),
+    'data': (0.22, ['Python', 'SQL', 'Excel', 'Data Analysis', 'Pandas', 'NumPy', 'Machine Learning', 'Statistics',
+                    'Power BI', 'Tableau', 'Matplotlib', 'scikit-learn', 'Deep Learning', 'TensorFlow', 'PyTorch',
+                    'NLP', 'Computer Vision', 'Apache Spark', 'Hadoop']),
+    'systems': (0.15, ['C++', 'Java', 'Data Structures', 'Algorithms', 'OOP', 'DBMS', 'Operating Systems', 'Linux',
+                       'Git', 'Python', 'Networking', 'Embedded Systems', 'Golang', 'Rust']),
+    'cloud': (0.10, ['Linux', 'AWS', 'Docker', 'Kubernetes', 'Git', 'CI/CD', 'Bash', 'Python', 'Terraform',
+                     'Jenkins', 'Azure', 'GCP', 'Networking', 'Cyber Security']),
+    'mobile': (0.08, ['Java', 'Android', 'Kotlin', 'Flutter', 'Git', 'Swift', 'iOS', 'REST APIs', 'Figma']),
+    'core': (0.07, ['AutoCAD', 'MATLAB', 'SolidWorks', 'Excel', 'C++', 'Embedded Systems', 'Project Management']),
+    'business': (0.08, ['Excel', 'Communication', 'Accounting', 'Tally', 'Power BI', 'Project Management',
+                        'Leadership', 'Teamwork', 'Agile']),
+}
+SOFT_SKILLS = ['Communication', 'Teamwork', 'Leadership', 'Project Management', 'Agile']
+
+# (degrees, share of students)
+DEGREE_MIXES = [
+    (['10th'], 0.05), (['10th', '12th'], 0.20), (['10th', '12th', 'B.Tech'], 0.40),
+    (['10th', '12th', 'B.E'], 0.08), (['10th', '12th', 'B.Sc'], 0.08), (['10th', '12th', 'B.Com'], 0.06),
+    (['10th', '12th', 'BCA'], 0.05), (['10th', '12th', 'B.Tech', 'M.Tech'], 0.04),
+    (['10th', '12th', 'BCA', 'MCA'], 0.02), (['10th', '12th', 'B.Com', 'MBA'], 0.02),
+]
+DOCUMENT_TYPES = [
+    ('Resume', 0.20), ('10th Marksheet', 0.15), ('12th Marksheet', 0.15), ('B.Tech Marksheet', 0.12),
+    ('Income Certificate', 0.10), ('Aadhar Card', 0.18), ('PAN Card', 0.10),
+]
+VERIFICATION_STATUSES = [('Verified', 0.6), ('Pending', 0.3), ('Rejected', 0.1)]
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def pick_skills(rng):
+    """3 to about 20 skills (median 6-7), mostly from one track, plus some soft and cross-track skills."""
+    track = _weighted(rng, [(name, share) for name, (share, _) in SKILL_TRACKS.items()])
+    pool = SKILL_TRACKS[track][1]
+    count = min(len(pool), max(3, round(rng.lognormvariate(math.log(6), 0.45))))
+    weights = [1 / (rank + 1) ** 0.8 for rank in range(len(pool))]
+    skills = []
+    while len(skills) < count:
+        skill = rng.choices(pool, weights=weights)[0]
+        if skill not in skills:
+            skills.append(skill)
+    if rng.random() < 0.4:
+        skills += [s for s in rng.sample(SOFT_SKILLS, rng.randint(1, 2)) if s not in skills]
+    if rng.random() < 0.15:
+        other = SKILL_TRACKS[rng.choice([t for t in SKILL_TRACKS if t != track])][1]
+        skills += [s for s in other[:3] if s not in skills][:1]
+    return skills
+
+
+def _profile_fields(rng):
+    income = None
+    if rng.random() > 0.05: # a few students never uploaded an income certificate
+        income = int(min(5_000_000, max(20_000, rng.lognormvariate(math.log(300_000), 0.8))) // 1000 * 1000)
+    return {
+        'highest_percentage': round(min(99.5, max(35.0, rng.gauss(72, 11))), 2),
+        'degrees': _weighted(rng, DEGREE_MIXES),
+        'annual_income': income,
+        'verified_skills': pick_skills(rng),
+    }
+
+
+def make_placeholder_files(variants, seed):
+    """
+    Writes `variants` small PDFs per document type under MEDIA_ROOT and
+    returns {document_type: [(relative path, sha256), ...]}. Documents share
+    these files; a million real uploads would only measure the disk.
+    """
+    rng = random.Random(seed)
+    directory = os.path.join(settings.MEDIA_ROOT, PLACEHOLDER_DIR)
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for document_type, _ in DOCUMENT_TYPES:
+        for variant in range(variants):
+            name = f"{document_type.lower().replace(' ', '_').replace('.', '')}_{variant + 1}.pdf"
+            path = os.path.join(directory, name)
+            pdf = canvas.Canvas(path, pagesize=A4)
+            pdf.setFont("Helvetica-Bold", 16)
+            pdf.drawString(72, 770, f"{document_type} (synthetic sample {variant + 1})")
+            pdf.setFont("Helvetica", 11)
+            lines = ["Skills: " + ", ".join(pick_skills(rng))] if document_type == 'Resume' else [
+                f"Percentage: {round(rng.uniform(55, 98), 2)}%",
+                f"Annual family income: Rs. {rng.randrange(50, 900) * 1000:,}",
+            ]
+            for i, line in enumerate(lines):
+                pdf.drawString(72, 740 - i * 16, line)
+            pdf.save()
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            files.setdefault(document_type, []).append((f"{PLACEHOLDER_DIR}/{name}", digest))
+    return files
+
+
+def _generate_range(first, last, options, password_hash, files, worker):
+    """Creates students first..last-1 (with profiles and documents) in bulk batches."""
+    rng = random.Random(options['seed'] * 1000 + worker)
+    fake = Faker('en_IN')
+    fake.seed_instance(options['seed'] * 1000 + worker)
+    today = date.today()
+
+    for batch_start in range(first, last, options['batch_size']):
+        batch_end = min(batch_start + options['batch_size'], last)
+        with transaction.atomic():
+            # bulk_create skips Student.save() and the post_save handlers: the
+            # password is pre-hashed and profiles are created below.
+            students = Student.objects.bulk_create([
+                Student(full_name=fake.name(), email=f"student{n}@{EMAIL_DOMAIN}", password=password_hash)
+                for n in range(batch_start, batch_end)
+            ])
+            profiles = StudentProfile.objects.bulk_create([
+                StudentProfile(student=student, **_profile_fields(rng)) for student in students
+            ])
+            replace_student_skills({profile.student_id: profile.verified_skills for profile in profiles})
+
+            documents = []
+            for student in students:
+                types = set()
+                while len(types) < options['documents_per_student']:
+                    types.add(_weighted(rng, DOCUMENT_TYPES))
+                for document_type in sorted(types):
+                    document = Document(
+                        student=student,
+                        document_type=document_type,
+                        verification_status=_weighted(rng, VERIFICATION_STATUSES),
+                        issue_date=today - timedelta(days=rng.randrange(5 * 365)),
+                        processing_status='processed' if document_type in HIGH_VALUE_DOCS else 'skipped',
+                    )
+                    if files:
+                        document.uploaded_file.name, document.content_hash = rng.choice(files[document_type])
+                    documents.append(document)
+            Document.objects.bulk_create(documents)
+        print(f"[worker {worker}] students {batch_start}-{batch_end - 1} created.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates synthetic students (with profiles, skills and documents) for "
+        f"load testing, in bulk. Emails are student<n>@{EMAIL_DOMAIN}; --reset "
+        "removes the previously generated ones first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--start', type=int, default=1, help="First student number (for appending).")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=1, help="Processes generating disjoint ranges.")
+        parser.add_argument('--documents-per-student', type=int, default=3, choices=range(0, len(DOCUMENT_TYPES) + 1))
+        parser.add_argument('--password', default='123', help="Shared password, hashed once.")
+        parser.add_argument('--files', type=int, default=0, metavar='VARIANTS',
+                            help="Attach placeholder PDFs, this many distinct files per document type.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--reset', action='store_true', help="Delete previously generated students first.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['reset']:
+            generated = Student.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+            deleted = 0
+            # In batches: Student has delete signals, so Django loads the rows it deletes
+            while ids := list(generated.values_list('student_id', flat=True)[:options['batch_size']]):
+                Student.objects.filter(student_id__in=ids).delete()
+                deleted += len(ids)
+            self.stdout.write(f"Deleted {deleted} generated student(s).")
+
+        password_hash = make_password(options['password'])
+        files = make_placeholder_files(options['files'], options['seed']) if options['files'] else None
+
+        first, last = options['start'], options['start'] + options['students']
+        workers = max(1, min(options['workers'], options['students']))
+        if workers == 1:
+            _generate_range(first, last, options, password_hash, files, 0)
+        else:
+            # Forked children must not share the parent's DB connection.
+            connections.close_all()
+            step = math.ceil(options['students'] / workers)
+            processes = [
+                multiprocessing.Process(
+                    target=_generate_range,
+                    args=(begin, min(begin + step, last), options, password_hash, files, worker),
+                )
+                for worker, begin in enumerate(range(first, last, step))
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            if any(process.exitcode for process in processes):
+                self.stderr.write("A worker failed; see its output above.")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Generated {options['students']} students ({options['documents_per_student']} documents each) "
+            f"in {elapsed:.1f}s ({options['students'] / elapsed:.0f} students/s)."
+        )
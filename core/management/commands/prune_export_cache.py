@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.export_jobs import prune_expired_exports
+from core.pdf_export import EXPORT_CACHE_MAX_AGE_SECONDS, prune_export_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired export jobs and the stamped document copies in EXPORT_CACHE_DIR "
+        "not exported for --max-age seconds. Run it periodically (e.g. daily from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=EXPORT_CACHE_MAX_AGE_SECONDS)
+
+    def handle(self, *args, **options):
+        jobs = prune_expired_exports()
+        files = prune_export_cache(max_age_seconds=options['max_age'])
+        self.stdout.write(f"Deleted {jobs} expired export job(s) and {files} cached stamped file(s).")
@@ -0,0 +1,54 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tasks import requeue_stale_tasks, run_pending
+
+
+def _worker_loop(once, sleep):
+    # Each worker process opens its own DB connection on first use.
+    while True:
+        processed = run_pending()
+        if processed:
+            print(f"[worker {multiprocessing.current_process().name}] Processed {processed} task(s).")
+        if once:
+            break
+        if not processed:
+            time.sleep(sleep)
+
+
+class Command(BaseCommand):
+    help = "Runs the background task workers (document processing, recommendation refreshes, etc.)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--sleep', type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--workers', type=int, default=1, help="Number of worker processes.")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_tasks()
+        if requeued:
+            self.stdout.write(f"Recovered {requeued} task(s) left running by a crashed worker.")
+
+        workers = max(1, options['workers'])
+        self.stdout.write(f"Background worker started ({workers} process(es)).")
+        if workers == 1:
+            _worker_loop(options['once'], options['sleep'])
+            return
+
+        # Forked children must not share the parent's DB connection.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_worker_loop, args=(options['once'], options['sleep']), name=str(i))
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
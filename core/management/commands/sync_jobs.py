@@ -0,0 +1,93 @@
+import json
+import sqlite3
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import GovtJob
+from core.recommendations import parse_job_skills, invalidate_job_index, students_with_any_skill, mark_stale
+from core.utils import PARTNER_IP
+
+SYNCED_FIELDS = ['job_title', 'job_description', 'eligibility_criteria', 'source_url']
+
+
+class Command(BaseCommand):
+    help = (
+        "Ingests jobs from the partner dataset into the local govt_jobs table "
+        "and queues a recommendation refresh for the students they affect."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=f'http://{PARTNER_IP}:5000/api/jobs',
+                            help="Partner API endpoint to fetch jobs from.")
+        parser.add_argument('--sqlite', help="Read directly from the partner's federated_data.db instead.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def fetch_rows(self, options):
+        if options['sqlite']:
+            with sqlite3.connect(options['sqlite']) as conn:
+                conn.row_factory = sqlite3.Row
+                return [dict(r) for r in conn.execute('SELECT * FROM govt_jobs')]
+        try:
+            response = requests.get(options['url'], timeout=60)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise CommandError(f"Failed to fetch jobs from partner: {e}")
+
+    def handle(self, *args, **options):
+        rows = self.fetch_rows(options)
+        self.stdout.write(f"Fetched {len(rows)} job rows.")
+
+        incoming = {}
+        for row in rows:
+            criteria = row.get('eligibility_criteria') or {}
+            if isinstance(criteria, str):
+                # The partner stores the criteria as a JSON string
+                criteria = json.loads(criteria)
+            incoming[row['job_id']] = GovtJob(
+                job_id=row['job_id'],
+                job_title=(row.get('job_title') or '')[:100],
+                job_description=row.get('job_description') or '',
+                eligibility_criteria=criteria,
+                source_url=row.get('source_url'),
+            )
+
+        existing = {
+            job['job_id']: job
+            for job in GovtJob.objects.values('job_id', *SYNCED_FIELDS)
+        }
+
+        # Skills of every job that was added, removed or edited. Any student
+        # holding one of them may see their ranking change.
+        changed_skills = set()
+        changed = []
+        for job_id, job in incoming.items():
+            old = existing.get(job_id)
+            if old is None or any(old[f] != getattr(job, f) for f in SYNCED_FIELDS):
+                changed.append(job)
+                changed_skills |= parse_job_skills(job.eligibility_criteria)
+                if old is not None:
+                    changed_skills |= parse_job_skills(old['eligibility_criteria'])
+        removed = [job_id for job_id in existing if job_id not in incoming]
+        for job_id in removed:
+            changed_skills |= parse_job_skills(existing[job_id]['eligibility_criteria'])
+
+        with transaction.atomic():
+            GovtJob.objects.bulk_create(
+                changed,
+                batch_size=options['batch_size'],
+                update_conflicts=True,
+                unique_fields=['job_id'],
+                update_fields=SYNCED_FIELDS,
+            )
+            GovtJob.objects.filter(job_id__in=removed).delete()
+            invalidate_job_index()
+            affected = students_with_any_skill(changed_skills)
+            mark_stale(affected)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Synced jobs: {len(changed)} added/updated, {len(removed)} removed. "
+            f"Queued recommendation refresh for {len(affected)} student(s)."
+        ))
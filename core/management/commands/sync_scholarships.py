@@ -0,0 +1,100 @@
+import json
+import sqlite3
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.eligibility import parse_eligibility_criteria, invalidate_scholarship_matrix
+from core.models import Scholarship
+from core.recommendations import students_matching_scholarship_rows, mark_stale
+from core.utils import PARTNER_IP
+
+TYPED_FIELDS = [
+    'education_level', 'gender', 'community', 'religion',
+    'income_min', 'income_max', 'percentage_min', 'percentage_max',
+    'exservice_men', 'disability', 'sports', 'india',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Ingests scholarships from the partner dataset into the local "
+        "scholarships table, parsing eligibility_criteria into typed columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=f'http://{PARTNER_IP}:5000/api/scholarships',
+                            help="Partner API endpoint to fetch scholarships from.")
+        parser.add_argument('--sqlite', help="Read directly from the partner's federated_data.db instead.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def fetch_rows(self, options):
+        if options['sqlite']:
+            with sqlite3.connect(options['sqlite']) as conn:
+                conn.row_factory = sqlite3.Row
+                return [dict(r) for r in conn.execute('SELECT * FROM scholarships')]
+        try:
+            response = requests.get(options['url'], timeout=60)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise CommandError(f"Failed to fetch scholarships from partner: {e}")
+
+    def handle(self, *args, **options):
+        rows = self.fetch_rows(options)
+        self.stdout.write(f"Fetched {len(rows)} scholarship rows.")
+
+        scholarships = []
+        for row in rows:
+            criteria = row.get('eligibility_criteria') or {}
+            if isinstance(criteria, str):
+                # The partner stores the criteria as a JSON string
+                criteria = json.loads(criteria)
+            scholarships.append(Scholarship(
+                scholarship_id=row['scholarship_id'],
+                scholarship_name=row.get('scholarship_name') or '',
+                description=row.get('description') or '',
+                eligibility_criteria=criteria,
+                amount=row.get('amount') or '',
+                **parse_eligibility_criteria(criteria),
+            ))
+
+        compared_fields = ['scholarship_id', 'scholarship_name', 'description', 'eligibility_criteria', 'amount', *TYPED_FIELDS]
+        existing = {row['scholarship_id']: row for row in Scholarship.objects.values(*compared_fields)}
+        incoming_ids = {s.scholarship_id for s in scholarships}
+
+        # Old and new criteria of every added, edited or removed row. Only
+        # students matching one of them can see their scholarships change.
+        changed, changed_rows = [], []
+        for scholarship in scholarships:
+            new_row = {f: getattr(scholarship, f) for f in compared_fields}
+            old_row = existing.get(scholarship.scholarship_id)
+            if old_row != new_row:
+                changed.append(scholarship)
+                changed_rows.append(new_row)
+                if old_row is not None:
+                    changed_rows.append(old_row)
+        removed_ids = [sid for sid in existing if sid not in incoming_ids]
+        changed_rows.extend(existing[sid] for sid in removed_ids)
+
+        with transaction.atomic():
+            Scholarship.objects.bulk_create(
+                changed,
+                batch_size=options['batch_size'],
+                update_conflicts=True,
+                unique_fields=['scholarship_id'],
+                update_fields=['scholarship_name', 'description', 'eligibility_criteria', 'amount', *TYPED_FIELDS],
+            )
+            Scholarship.objects.filter(scholarship_id__in=removed_ids).delete()
+            affected = students_matching_scholarship_rows(changed_rows)
+            mark_stale(affected)
+
+        # bulk_create does not send post_save. This only drops this process's
+        # matrix; web workers pick the changes up once their snapshot is older
+        # than SNAPSHOT_TTL_SECONDS (ELIGIBILITY_SNAPSHOT_TTL).
+        invalidate_scholarship_matrix()
+        self.stdout.write(self.style.SUCCESS(
+            f"Synced scholarships: {len(changed)} added/updated, {len(removed_ids)} removed. "
+            f"Queued recommendation refresh for {len(affected)} student(s)."
+        ))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.skills import SYNC_BATCH_SIZE, sync_all_student_skills
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the normalized skills / student_skills tables from every "
+        "StudentProfile.verified_skills. Profile ETL keeps them in sync afterwards; "
+        "run this once after migrating, or after editing profiles outside the ETL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SYNC_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        students, rows = sync_all_student_skills(batch_size=options['batch_size'])
+        self.stdout.write(
+            f"Synced {rows} skill(s) for {students} student(s) in {time.perf_counter() - started:.1f}s."
+        )
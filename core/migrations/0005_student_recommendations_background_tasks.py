@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_scholarship_typed_eligibility'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentRecommendation',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendation', serialize=False, to='core.student')),
+                ('jobs', models.JSONField(blank=True, default=list)),
+                ('scholarships', models.JSONField(blank=True, default=list)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('stale_since', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                'db_table': 'student_recommendations',
+            },
+        ),
+        migrations.CreateModel(
+            name='BackgroundTask',
+            fields=[
+                ('task_id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(default='queued', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'background_tasks',
+                'indexes': [models.Index(fields=['status', 'task_id'], name='background__status_f2b579_idx')],
+            },
+        ),
+    ]
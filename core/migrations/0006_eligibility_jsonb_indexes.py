@@ -0,0 +1,78 @@
+# Indexes backing the parameterized eligibility query in core/eligibility_query.py.
+# PostgreSQL only: on other backends these operations are skipped.
+
+from django.db import migrations
+
+FORWARD_SQL = [
+    # A cast that returns NULL instead of raising on malformed numbers, so one
+    # bad verified_data value can neither break the query nor the index build.
+    """
+    CREATE OR REPLACE FUNCTION eduverify_to_numeric(value text) RETURNS numeric AS $$
+    BEGIN
+        RETURN value::numeric;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql IMMUTABLE;
+    """,
+
+    # documents: the verified-data lookup per student, plus expression indexes
+    # on the JSONB keys the query aggregates.
+    """
+    CREATE INDEX IF NOT EXISTS documents_verified_student_idx
+        ON documents (student_id)
+        WHERE verification_status = 'Verified' AND verified_data IS NOT NULL;
+    """,
+    "CREATE INDEX IF NOT EXISTS documents_vd_percentage_idx ON documents ((eduverify_to_numeric(verified_data ->> 'percentage')));",
+    "CREATE INDEX IF NOT EXISTS documents_vd_income_pa_idx ON documents ((eduverify_to_numeric(verified_data ->> 'income_pa')));",
+    "CREATE INDEX IF NOT EXISTS documents_vd_degree_idx ON documents ((verified_data ->> 'degree'));",
+    "CREATE INDEX IF NOT EXISTS documents_vd_gin_idx ON documents USING GIN (verified_data jsonb_path_ops);",
+
+    # govt_jobs: degree equality + percentage-equivalent range in one btree.
+    """
+    CREATE INDEX IF NOT EXISTS govt_jobs_degree_min_pct_idx ON govt_jobs (
+        (eligibility_criteria ->> 'degree'),
+        (eduverify_to_numeric(eligibility_criteria ->> 'min_cgpa') * 10)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS govt_jobs_criteria_gin_idx ON govt_jobs USING GIN (eligibility_criteria jsonb_path_ops);",
+
+    # scholarships: income cap and percentage floor ranges.
+    "CREATE INDEX IF NOT EXISTS scholarships_max_income_pa_idx ON scholarships ((eduverify_to_numeric(eligibility_criteria ->> 'max_income_pa')));",
+    "CREATE INDEX IF NOT EXISTS scholarships_min_percentage_idx ON scholarships ((eduverify_to_numeric(eligibility_criteria ->> 'min_percentage')));",
+    "CREATE INDEX IF NOT EXISTS scholarships_criteria_gin_idx ON scholarships USING GIN (eligibility_criteria jsonb_path_ops);",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS scholarships_criteria_gin_idx;",
+    "DROP INDEX IF EXISTS scholarships_min_percentage_idx;",
+    "DROP INDEX IF EXISTS scholarships_max_income_pa_idx;",
+    "DROP INDEX IF EXISTS govt_jobs_criteria_gin_idx;",
+    "DROP INDEX IF EXISTS govt_jobs_degree_min_pct_idx;",
+    "DROP INDEX IF EXISTS documents_vd_gin_idx;",
+    "DROP INDEX IF EXISTS documents_vd_degree_idx;",
+    "DROP INDEX IF EXISTS documents_vd_income_pa_idx;",
+    "DROP INDEX IF EXISTS documents_vd_percentage_idx;",
+    "DROP INDEX IF EXISTS documents_verified_student_idx;",
+    "DROP FUNCTION IF EXISTS eduverify_to_numeric(text);",
+]
+
+
+def _run_on_postgres(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_student_recommendations_background_tasks'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run_on_postgres(FORWARD_SQL), _run_on_postgres(REVERSE_SQL)),
+    ]
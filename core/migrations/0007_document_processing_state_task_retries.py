@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_eligibility_jsonb_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='backgroundtask',
+            name='background__status_f2b579_idx',
+        ),
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='max_attempts',
+            field=models.IntegerField(default=3),
+        ),
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='run_after',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='processing_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        # Documents uploaded before the background queue existed were
+        # processed inside the request, so backfill them as 'processed'.
+        migrations.AddField(
+            model_name='document',
+            name='processing_status',
+            field=models.CharField(default='processed', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='processing_status',
+            field=models.CharField(default='uploaded', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='backgroundtask',
+            index=models.Index(fields=['status', 'run_after'], name='background__status_bd6976_idx'),
+        ),
+    ]
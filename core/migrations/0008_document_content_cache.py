@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_document_processing_state_task_retries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentContentCache',
+            fields=[
+                ('content_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('extracted_text', models.TextField(blank=True, null=True)),
+                ('parsed_fields', models.JSONField(blank=True, default=dict)),
+                ('hits', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'document_content_cache',
+            },
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_document_content_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='extraction_method',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+    ]
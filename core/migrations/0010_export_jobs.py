@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:57
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_document_extraction_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document_ids', models.JSONField(default=list)),
+                ('export_format', models.CharField(default='pdf', max_length=10)),
+                ('fingerprint', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(default='queued', max_length=20)),
+                ('documents_done', models.IntegerField(default=0)),
+                ('documents_total', models.IntegerField(default=0)),
+                ('file_path', models.CharField(blank=True, max_length=255, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.student')),
+            ],
+            options={
+                'db_table': 'export_jobs',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_export_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(models.OrderBy(models.F('issue_date'), descending=True, nulls_last=True), models.OrderBy(models.F('document_id'), descending=True), name='documents_issue_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['full_name', 'student_id'], name='students_name_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_dashboard_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSummary',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='core.student')),
+                ('documents_total', models.IntegerField(default=0)),
+                ('documents_by_status', models.JSONField(blank=True, default=dict)),
+                ('documents_by_type', models.JSONField(blank=True, default=dict)),
+                ('latest_document_id', models.IntegerField(blank=True, null=True)),
+                ('latest_document_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('latest_document_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('highest_percentage', models.FloatField(blank=True, null=True)),
+                ('annual_income', models.IntegerField(blank=True, null=True)),
+                ('degrees', models.JSONField(blank=True, default=list)),
+                ('skills_count', models.IntegerField(default=0)),
+                ('top_skills', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'student_summaries',
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:17
+# Indexes for the hot query patterns: case-insensitive login, a student's
+# documents by status (replacing the plain student_id FK index, which is its
+# leading column), status / type filters and counts, and containment lookups
+# on the StudentProfile skill and degree arrays. The GIN indexes are
+# PostgreSQL only and skipped on other backends.
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+FORWARD_SQL = [
+    # jsonb_path_ops: smaller and faster than the default opclass, supports @> (__contains)
+    "CREATE INDEX IF NOT EXISTS studentprofile_skills_gin_idx ON core_studentprofile USING GIN (verified_skills jsonb_path_ops);",
+    "CREATE INDEX IF NOT EXISTS studentprofile_degrees_gin_idx ON core_studentprofile USING GIN (degrees jsonb_path_ops);",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS studentprofile_degrees_gin_idx;",
+    "DROP INDEX IF EXISTS studentprofile_skills_gin_idx;",
+]
+
+
+def _run_on_postgres(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_student_summaries'),
+    ]
+
+    operations = [
+        # The composite index first, so student_id lookups are never unindexed
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['student', 'verification_status'], name='documents_student_status_idx'),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.student'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['document_type', 'verification_status'], name='documents_type_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='students_email_lower_idx'),
+        ),
+        migrations.RunPython(_run_on_postgres(FORWARD_SQL), _run_on_postgres(REVERSE_SQL)),
+    ]
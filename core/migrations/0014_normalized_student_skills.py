@@ -0,0 +1,81 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:30
+# Skills are deduplicated by their case-folded name (Skill.normalized_name),
+# and a student holds each skill at most once. Existing rows are normalized
+# here, merging skills that differ only in case / spacing; student_skills is
+# filled from the profiles by migration 0017.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _normalize(name):
+    # Same as core.recommendations.normalize_skill
+    return ' '.join(str(name).split()).casefold()
+
+
+def normalize_existing_skills(apps, schema_editor):
+    Skill = apps.get_model('core', 'Skill')
+    StudentSkill = apps.get_model('core', 'StudentSkill')
+    kept = {}
+    for skill in Skill.objects.order_by('skill_id'):
+        key = _normalize(skill.skill_name)
+        if key in kept:
+            StudentSkill.objects.filter(skill_id=skill.skill_id).update(skill_id=kept[key])
+            skill.delete()
+        else:
+            kept[key] = skill.skill_id
+            Skill.objects.filter(skill_id=skill.skill_id).update(normalized_name=key)
+
+    # Duplicate (student, skill) pairs, including those the merge produced: keep the first
+    seen = set()
+    duplicates = []
+    for row_id, student_id, skill_id in StudentSkill.objects.order_by('student_skill_id').values_list(
+        'student_skill_id', 'student_id', 'skill_id'
+    ):
+        if (student_id, skill_id) in seen:
+            duplicates.append(row_id)
+        seen.add((student_id, skill_id))
+    StudentSkill.objects.filter(student_skill_id__in=duplicates).delete()
+    if schema_editor.connection.vendor == 'postgresql':
+        # Run the deferred FK checks now: ALTER TABLE refuses pending trigger events
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='normalized_name',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.RunPython(normalize_existing_skills, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='skill',
+            name='normalized_name',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+        # The new indexes first, so the foreign keys are never unindexed
+        migrations.AddConstraint(
+            model_name='studentskill',
+            constraint=models.UniqueConstraint(fields=('student', 'skill'), name='student_skills_student_skill_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='studentskill',
+            index=models.Index(fields=['skill', 'student'], name='student_skills_skill_idx'),
+        ),
+        migrations.AlterField(
+            model_name='studentskill',
+            name='skill',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.skill'),
+        ),
+        migrations.AlterField(
+            model_name='studentskill',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.student'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 21:05
+# The income rules used to take a year following the label ("for the
+# financial year 2023-24 ...") as the income, and the content cache kept
+# that result. Cached income fields are dropped so those certificates are
+# parsed again with the fixed rules (or the LLM) on their next upload.
+
+from django.db import migrations
+
+
+def drop_cached_income_fields(apps, schema_editor):
+    DocumentContentCache = apps.get_model('core', 'DocumentContentCache')
+    for entry in DocumentContentCache.objects.filter(parsed_fields__has_key='income'):
+        entry.parsed_fields.pop('income')
+        entry.save(update_fields=['parsed_fields'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_normalized_student_skills'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_cached_income_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_drop_cached_income_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchMatchReport',
+            fields=[
+                ('min_coverage', models.FloatField(primary_key=True, serialize=False)),
+                ('report', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'batch_match_reports',
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-19 21:40
+# Fills student_skills from every StudentProfile.verified_skills, so skill
+# search and the partner-data sync (core/skills.py) see existing students
+# without a manual `manage.py sync_student_skills`. Profile ETL keeps the
+# table in sync from here on. Same rules as core.skills.replace_student_skills.
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def _skill_names(skills, max_length):
+    # Same as core.skills.skill_names
+    names = {}
+    for skill in skills or []:
+        display = ' '.join(str(skill).split())
+        if display and len(display) <= max_length:
+            names.setdefault(display.casefold(), display)
+    return names
+
+
+def populate_student_skills(apps, schema_editor):
+    Skill = apps.get_model('core', 'Skill')
+    StudentProfile = apps.get_model('core', 'StudentProfile')
+    StudentSkill = apps.get_model('core', 'StudentSkill')
+    max_length = Skill._meta.get_field('skill_name').max_length
+
+    last_id = 0
+    while True:
+        batch = list(
+            StudentProfile.objects.filter(student_id__gt=last_id).order_by('student_id')
+            .values_list('student_id', 'verified_skills')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        per_student = [(student_id, _skill_names(skills, max_length)) for student_id, skills in batch]
+        names = {}
+        for _, skill_names in per_student:
+            for key, display in skill_names.items():
+                names.setdefault(key, display)
+        if not names:
+            continue
+        Skill.objects.bulk_create(
+            [Skill(skill_name=display, normalized_name=key) for key, display in names.items()],
+            ignore_conflicts=True,
+        )
+        skill_ids = dict(Skill.objects.filter(normalized_name__in=names).values_list('normalized_name', 'skill_id'))
+        StudentSkill.objects.bulk_create(
+            [StudentSkill(student_id=student_id, skill_id=skill_ids[key])
+             for student_id, skill_names in per_student for key in skill_names],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_batch_match_reports'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_student_skills, migrations.RunPython.noop),
+    ]
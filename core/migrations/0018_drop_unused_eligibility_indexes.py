@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-19 21:55
+# Drops indexes from migration 0006 that the eligibility query never scans
+# (see `manage.py benchmark_eligibility_query`). It has no @> predicates, so
+# the jsonb_path_ops GIN indexes are unusable; documents are looked up by
+# student_id (documents_student_status_idx, migration 0013), never by their
+# verified_data values. The indexes only added write cost.
+# PostgreSQL only: on other backends these operations are skipped.
+
+from django.db import migrations
+
+FORWARD_SQL = [
+    "DROP INDEX IF EXISTS documents_verified_student_idx;",
+    "DROP INDEX IF EXISTS documents_vd_percentage_idx;",
+    "DROP INDEX IF EXISTS documents_vd_income_pa_idx;",
+    "DROP INDEX IF EXISTS documents_vd_degree_idx;",
+    "DROP INDEX IF EXISTS documents_vd_gin_idx;",
+    "DROP INDEX IF EXISTS govt_jobs_criteria_gin_idx;",
+    "DROP INDEX IF EXISTS scholarships_criteria_gin_idx;",
+]
+
+REVERSE_SQL = [
+    "CREATE INDEX IF NOT EXISTS scholarships_criteria_gin_idx ON scholarships USING GIN (eligibility_criteria jsonb_path_ops);",
+    "CREATE INDEX IF NOT EXISTS govt_jobs_criteria_gin_idx ON govt_jobs USING GIN (eligibility_criteria jsonb_path_ops);",
+    "CREATE INDEX IF NOT EXISTS documents_vd_gin_idx ON documents USING GIN (verified_data jsonb_path_ops);",
+    "CREATE INDEX IF NOT EXISTS documents_vd_degree_idx ON documents ((verified_data ->> 'degree'));",
+    "CREATE INDEX IF NOT EXISTS documents_vd_income_pa_idx ON documents ((eduverify_to_numeric(verified_data ->> 'income_pa')));",
+    "CREATE INDEX IF NOT EXISTS documents_vd_percentage_idx ON documents ((eduverify_to_numeric(verified_data ->> 'percentage')));",
+    """
+    CREATE INDEX IF NOT EXISTS documents_verified_student_idx
+        ON documents (student_id)
+        WHERE verification_status = 'Verified' AND verified_data IS NOT NULL;
+    """,
+]
+
+
+def _run_on_postgres(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_populate_student_skills'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run_on_postgres(FORWARD_SQL), _run_on_postgres(REVERSE_SQL)),
+    ]
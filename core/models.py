@@ -1,8 +1,13 @@
-from django.db import models
+import os
+import uuid
+
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth.hashers import make_password, check_password
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
 # This file contains the "blueprint" for your database.
 # Each class represents a table, and each attribute represents a column.
@@ -48,6 +53,12 @@ class Student(models.Model):
 
     class Meta:
         db_table = 'students'
+        indexes = [
+            # Keyset order of the admin dashboard (core/dashboard.py)
+            models.Index(fields=['full_name', 'student_id'], name='students_name_keyset_idx'),
+            # Case-insensitive login (LoginView filters on Lower('email'))
+            models.Index(Lower('email'), name='students_email_lower_idx'),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -59,7 +70,8 @@ class Student(models.Model):
 
 class Document(models.Model):
     document_id = models.AutoField(primary_key=True)
-    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    # Indexed by documents_student_status_idx (student_id is its leading column)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, db_index=False)
     document_type = models.CharField(max_length=100)
     verification_status = models.CharField(max_length=20, default='Pending')
     issue_date = models.DateField(null=True, blank=True)
@@ -71,15 +83,34 @@ class Document(models.Model):
     # Stores the text extracted by OCR/PDF-parsing
     extracted_text = models.TextField(null=True, blank=True)
 
+    # --- Background processing state (see core/document_processing.py) ---
+    # uploaded -> queued -> processing -> processed / failed, or uploaded -> skipped
+    processing_status = models.CharField(max_length=20, default='uploaded')
+    processing_error = models.TextField(null=True, blank=True)
+    # SHA-256 of the uploaded bytes; key into DocumentContentCache
+    content_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+    # How the profile fields were obtained: rules / cache / llm (see core/field_extraction.py)
+    extraction_method = models.CharField(max_length=10, null=True, blank=True)
+
     class Meta:
         db_table = 'documents'
+        indexes = [
+            # Keyset order of the admin dashboard (core/dashboard.py)
+            models.Index(models.F('issue_date').desc(nulls_last=True), models.F('document_id').desc(),
+                         name='documents_issue_keyset_idx'),
+            # A student's documents by status, and the status / type filters and counts
+            models.Index(fields=['student', 'verification_status'], name='documents_student_status_idx'),
+            models.Index(fields=['document_type', 'verification_status'], name='documents_type_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.document_type} for {self.student.full_name}"
 
 class Skill(models.Model):
     skill_id = models.AutoField(primary_key=True)
-    skill_name = models.CharField(max_length=50, unique=True)
+    skill_name = models.CharField(max_length=50, unique=True) # First spelling seen, for display
+    # normalize_skill(skill_name): what skills are deduplicated and looked up by (see core/skills.py)
+    normalized_name = models.CharField(max_length=50, unique=True)
 
     class Meta:
         db_table = 'skills'
@@ -88,12 +119,19 @@ class Skill(models.Model):
         return self.skill_name
 
 class StudentSkill(models.Model):
+    """One of a student's verified skills; kept equal to StudentProfile.verified_skills by core/skills.py."""
     student_skill_id = models.AutoField(primary_key=True)
-    student = models.ForeignKey(Student, on_delete=models.CASCADE)
-    skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
+    # Indexed by the (student, skill) unique constraint
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, db_index=False)
+    # Indexed by student_skills_skill_idx, which also covers "students with skill X" joins
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, db_index=False)
 
     class Meta:
         db_table = 'student_skills'
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'skill'], name='student_skills_student_skill_uniq'),
+        ]
+        indexes = [models.Index(fields=['skill', 'student'], name='student_skills_skill_idx')]
 
 class GovtJob(models.Model):
     job_id = models.AutoField(primary_key=True)
@@ -115,6 +153,23 @@ class Scholarship(models.Model):
     eligibility_criteria = models.JSONField()
     amount = models.CharField(max_length=50)
 
+    # --- Typed eligibility columns ---
+    # Parsed from the loose strings in eligibility_criteria at ingest time
+    # (see core/eligibility.py) so filtering never has to go through the LLM.
+    # NULL means "no restriction" for that criterion.
+    education_level = models.CharField(max_length=20, null=True, blank=True)
+    gender = models.CharField(max_length=10, null=True, blank=True)
+    community = models.CharField(max_length=20, null=True, blank=True)
+    religion = models.CharField(max_length=20, null=True, blank=True)
+    income_min = models.IntegerField(null=True, blank=True)
+    income_max = models.IntegerField(null=True, blank=True) # Income cap in rupees per annum
+    percentage_min = models.FloatField(null=True, blank=True) # Percentage floor
+    percentage_max = models.FloatField(null=True, blank=True)
+    exservice_men = models.BooleanField(null=True, blank=True)
+    disability = models.BooleanField(null=True, blank=True)
+    sports = models.BooleanField(null=True, blank=True)
+    india = models.BooleanField(null=True, blank=True)
+
     class Meta:
         db_table = 'scholarships'
 
@@ -131,6 +186,136 @@ class StudentProfile(models.Model):
     def __str__(self):
         return f"Profile for {self.student.full_name}"
 
+class StudentRecommendation(models.Model):
+    """
+    Materialized recommendations for one student. Recomputed in the
+    background (core/recommendations.py) whenever the student's profile or
+    the partner datasets change, so reads are a single primary-key lookup.
+    """
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='recommendation')
+    # Ranked lists of {"job_id"/"scholarship_id", "score", ...display fields}
+    jobs = models.JSONField(default=list, blank=True)
+    scholarships = models.JSONField(default=list, blank=True)
+    computed_at = models.DateTimeField(null=True, blank=True)
+    # Set when an input changed; cleared by the recompute that covers it.
+    stale_since = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        db_table = 'student_recommendations'
+
+    def __str__(self):
+        return f"Recommendations for student {self.student_id}"
+
+class StudentSummary(models.Model):
+    """
+    Materialized per-student summary for StudentSummaryView (see
+    core/student_summary.py): document counts, the latest upload and profile
+    highlights. The Document / StudentProfile receivers below keep it
+    current, so a read is one query.
+    """
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    documents_total = models.IntegerField(default=0)
+    documents_by_status = models.JSONField(default=dict, blank=True) # {"Verified": 2, "Pending": 1}
+    documents_by_type = models.JSONField(default=dict, blank=True) # {"Resume": 1, "Aadhar Card": 1}
+    # Highest document_id, i.e. the most recent upload
+    latest_document_id = models.IntegerField(null=True, blank=True)
+    latest_document_type = models.CharField(max_length=100, null=True, blank=True)
+    latest_document_status = models.CharField(max_length=20, null=True, blank=True)
+    # Copied from StudentProfile
+    highest_percentage = models.FloatField(null=True, blank=True)
+    annual_income = models.IntegerField(null=True, blank=True)
+    degrees = models.JSONField(default=list, blank=True)
+    skills_count = models.IntegerField(default=0)
+    top_skills = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'student_summaries'
+
+    def __str__(self):
+        return f"Summary for student {self.student_id}"
+
+class BatchMatchReport(models.Model):
+    """
+    The latest students x jobs match report for one min_coverage (see
+    core/batch_matching.py), built by the 'build_match_report' task so
+    requests never run the matcher themselves.
+    """
+    min_coverage = models.FloatField(primary_key=True)
+    report = models.JSONField(default=dict)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'batch_match_reports'
+
+    def __str__(self):
+        return f"Match report (min_coverage={self.min_coverage})"
+
+class BackgroundTask(models.Model):
+    """A persistent queue entry, consumed by `manage.py run_tasks` (see core/tasks.py)."""
+    task_id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, default='queued') # queued / running / done / failed
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now) # Pushed back between retries
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'background_tasks'
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"{self.name} #{self.task_id} ({self.status})"
+
+class DocumentContentCache(models.Model):
+    """
+    Extraction results per distinct file content (see core/content_cache.py),
+    so re-uploading identical bytes skips OCR and the LLM call.
+    """
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    extracted_text = models.TextField(null=True, blank=True)
+    # Parsed profile fields per extraction kind, e.g. {"marksheet": {"percentage": 85.2}}
+    parsed_fields = models.JSONField(default=dict, blank=True)
+    hits = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'document_content_cache'
+
+    def __str__(self):
+        return f"Content cache {self.content_hash[:12]}"
+
+class ExportJob(models.Model):
+    """
+    An asynchronous document bundle export (see core/export_jobs.py). The
+    finished PDF / ZIP stays on disk until expires_at and is reused by
+    identical requests.
+    """
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    document_ids = models.JSONField(default=list)
+    export_format = models.CharField(max_length=10, default='pdf') # pdf / zip
+    # SHA-256 over the format and each document's id, content hash and verification status
+    fingerprint = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=20, default='queued') # queued / running / done / failed
+    documents_done = models.IntegerField(default=0)
+    documents_total = models.IntegerField(default=0)
+    file_path = models.CharField(max_length=255, null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        db_table = 'export_jobs'
+
+    def __str__(self):
+        return f"Export {self.job_id} ({self.status})"
+
 @receiver(post_save, sender=Student)
 def create_student_profile(sender, instance, created, **kwargs):
     if created:
@@ -139,7 +324,53 @@ def create_student_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=Student)
 def save_student_profile(sender, instance, **kwargs):
     instance.studentprofile.save()
-    
-
-
 
+@receiver([post_save, post_delete], sender=Student)
+def invalidate_cached_student_on_change(sender, instance, **kwargs):
+    from .authentication import invalidate_cached_student
+    invalidate_cached_student(instance.student_id)
+
+@receiver([post_save, post_delete], sender=Scholarship)
+def invalidate_scholarship_matrix_on_change(sender, instance, **kwargs):
+    from .eligibility import invalidate_scholarship_matrix
+    invalidate_scholarship_matrix()
+
+@receiver([post_save, post_delete], sender=Document)
+def invalidate_admin_stats_on_document_change(sender, instance, update_fields=None, **kwargs):
+    from .admin_stats import DOCUMENT_STATS_FIELDS, invalidate_admin_stats
+    invalidate_admin_stats(update_fields, DOCUMENT_STATS_FIELDS)
+
+@receiver([post_save, post_delete], sender=StudentProfile)
+def invalidate_admin_stats_on_profile_change(sender, instance, update_fields=None, **kwargs):
+    from .admin_stats import PROFILE_STATS_FIELDS, invalidate_admin_stats
+    invalidate_admin_stats(update_fields, PROFILE_STATS_FIELDS)
+
+@receiver([post_save, post_delete], sender=Document)
+def refresh_student_summary_on_document_change(sender, instance, update_fields=None, origin=None, **kwargs):
+    from .student_summary import SUMMARY_DOCUMENT_FIELDS, refresh_document_counts
+    # origin is the instance / queryset .delete() was called on
+    if origin is not None and getattr(origin, 'model', type(origin)) is not Document:
+        return # Cascade from a student delete: the summary goes too
+    if update_fields and not set(update_fields) & SUMMARY_DOCUMENT_FIELDS:
+        return
+    refresh_document_counts(instance.student_id)
+
+@receiver([post_save, post_delete], sender=Document)
+def delete_stamped_pages_on_document_change(sender, instance, update_fields=None, **kwargs):
+    # Stamped export copies of deleted documents (cascades included) and of old statuses
+    if not instance.content_hash or (update_fields and 'verification_status' not in update_fields):
+        return
+    from .pdf_export import delete_stamped_pages
+    content_hash = instance.content_hash
+    transaction.on_commit(lambda: delete_stamped_pages(content_hash))
+
+@receiver(post_save, sender=StudentProfile)
+def refresh_student_summary_on_profile_change(sender, instance, **kwargs):
+    from .student_summary import refresh_profile_highlights
+    refresh_profile_highlights(instance)
+
+@receiver(post_delete, sender=ExportJob)
+def delete_export_file(sender, instance, **kwargs):
+    # Also runs for jobs removed by a student's cascade delete
+    if instance.file_path and os.path.exists(instance.file_path):
+        os.remove(instance.file_path)
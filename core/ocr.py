@@ -0,0 +1,268 @@
+# core/ocr.py
+# Parallel OCR for scanned PDFs. Each worker process renders ONE page
+# (pdf2image first_page/last_page) and runs Tesseract on it, so rendering and
+# OCR both use every core and at most a bounded number of page images exist
+# at any time, instead of the whole document being rendered up front.
+# The worker processes are one pool per process, shared by every thread
+# (bulk uploads OCR several documents at once), so OCR never runs on more
+# than OCR_WORKERS cores however many documents are in flight.
+
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytesseract
+from scipy import ndimage
+from django.conf import settings
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image, ImageOps
+
+# Render resolution. 300 DPI is Tesseract's sweet spot; pdf2image defaults to 200.
+OCR_DPI = getattr(settings, 'OCR_DPI', 300)
+# Worker processes for page OCR, per process and shared by its threads (defaults to one per core).
+OCR_WORKERS = getattr(settings, 'OCR_WORKERS', None) or os.cpu_count() or 1
+# OpenMP threads per Tesseract call. 1 avoids oversubscribing the cores when
+# several pages are OCR'd in parallel.
+OCR_TESSERACT_THREADS = getattr(settings, 'OCR_TESSERACT_THREADS', 1)
+# Pages in flight per worker; bounds how many rendered pages can be held in memory.
+OCR_PAGES_IN_FLIGHT_PER_WORKER = 2
+# Downsample / grayscale / binarize / deskew / crop images before Tesseract.
+OCR_PREPROCESS = getattr(settings, 'OCR_PREPROCESS', True)
+
+# A page's text layer is only trusted if it has at least this many letters /
+# digits and most of its characters look like real text. Broken font
+# encodings produce '(cid:12)' runs, U+FFFD or private-use glyphs instead.
+MIN_PAGE_TEXT_CHARS = getattr(settings, 'OCR_MIN_PAGE_TEXT_CHARS', 20)
+MIN_PAGE_TEXT_QUALITY = 0.6
+_CID_RUN = re.compile(r'\(cid:\d+\)')
+
+
+def page_needs_ocr(page_text):
+    """True if a page's extracted text layer is empty or junk."""
+    text = _CID_RUN.sub('\ufffd', page_text or '')
+    visible = [c for c in text if not c.isspace()]
+    if sum(c.isalnum() for c in visible) < MIN_PAGE_TEXT_CHARS:
+        return True
+    readable = sum(
+        1 for c in visible
+        if c != '\ufffd' and not '\ue000' <= c <= '\uf8ff' and (c.isalnum() or c.isprintable())
+    )
+    return readable / len(visible) < MIN_PAGE_TEXT_QUALITY
+
+
+# ------------------------------------------------------------------------------
+# Pre-processing: Tesseract's run time grows with pixel count, and a 12 MP
+# phone photo has ~3x the pixels of an A4 page at 300 DPI. It also reads
+# clean black-on-white, upright text best.
+# ------------------------------------------------------------------------------
+
+# Photos have no trustworthy DPI, so their longest side is capped at the
+# long side of an A4 page rendered at the target DPI.
+A4_LONG_SIDE_INCHES = 11.69
+MAX_SKEW_DEGREES = 10
+# Long side of the thumbnail the skew angle is estimated on.
+SKEW_ESTIMATE_SIZE = 800
+CROP_MARGIN_PX = 10
+
+
+def _target_scale(size, dpi, source_dpi):
+    """Resize factor that brings an image to `dpi`."""
+    if source_dpi:
+        return dpi / source_dpi
+    return A4_LONG_SIDE_INCHES * dpi / max(size)
+
+
+def _otsu_threshold(gray):
+    """Grey level that best separates ink from paper (Otsu's method)."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    mean_bg = np.cumsum(hist * levels) / np.maximum(weight_bg, 1)
+    mean_fg = ((hist * levels).sum() - np.cumsum(hist * levels)) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between)) + 1
+
+
+def clear_border_ink(ink):
+    """
+    Drops ink regions connected to the image edge: the table or scanner lid
+    around a photographed page, shadows, punch holes. Text does not touch
+    the edge, so it survives.
+    """
+    labels, _ = ndimage.label(ink)
+    edge_labels = np.unique(np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]]))
+    edge_labels = edge_labels[edge_labels != 0]
+    if len(edge_labels):
+        ink = ink & ~np.isin(labels, edge_labels)
+    return ink
+
+
+def estimate_skew(ink):
+    """
+    Skew angle (degrees, counter-clockwise) that makes text lines horizontal:
+    the rotation whose row-ink profile has the sharpest peaks.
+    """
+    small = Image.fromarray((ink * 255).astype(np.uint8))
+    small.thumbnail((SKEW_ESTIMATE_SIZE, SKEW_ESTIMATE_SIZE))
+
+    def score(angle):
+        profile = np.asarray(small.rotate(angle, resample=Image.BILINEAR)).sum(axis=1, dtype=np.float64)
+        return profile.var()
+
+    coarse = max(np.arange(-MAX_SKEW_DEGREES, MAX_SKEW_DEGREES + 0.5, 1.0), key=score)
+    return float(max(np.arange(coarse - 1, coarse + 1.05, 0.1), key=score))
+
+
+def preprocess_for_ocr(image, dpi=OCR_DPI, source_dpi=None):
+    """
+    Returns a binarized, upright, cropped grayscale copy of `image` at about
+    `dpi` (never upsampled). `source_dpi` is the image's real resolution when
+    known (PDF renders); photos are sized against an A4 page instead.
+    """
+    target_long_side = max(image.size) * min(1.0, _target_scale(image.size, dpi, source_dpi))
+    if image.format == 'JPEG' and target_long_side < max(image.size):
+        # Let the JPEG decoder skip detail we would throw away anyway
+        # (decodes at 1/2, 1/4 or 1/8 scale, never below the requested size).
+        ratio = target_long_side / max(image.size)
+        image.draft('L', (int(image.width * ratio), int(image.height * ratio)))
+    image = ImageOps.exif_transpose(image).convert('L')
+    scale = target_long_side / max(image.size)
+    if scale < 1:
+        image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.LANCZOS)
+
+    gray = np.asarray(image)
+    ink = clear_border_ink(gray < _otsu_threshold(gray))
+    if not ink.any():
+        return Image.new('L', image.size, 255)
+
+    angle = estimate_skew(ink)
+    binary = Image.fromarray(np.where(ink, 0, 255).astype(np.uint8))
+    if abs(angle) >= 0.1:
+        binary = binary.rotate(angle, resample=Image.NEAREST, expand=True, fillcolor=255)
+
+    # Crop to the text block plus a small margin.
+    left, top, right, bottom = ImageOps.invert(binary).getbbox() or (0, 0, binary.width, binary.height)
+    return binary.crop((
+        max(0, left - CROP_MARGIN_PX), max(0, top - CROP_MARGIN_PX),
+        min(binary.width, right + CROP_MARGIN_PX), min(binary.height, bottom + CROP_MARGIN_PX),
+    ))
+
+
+def ocr_image(image, dpi=OCR_DPI, source_dpi=None, preprocess=OCR_PREPROCESS):
+    """Runs Tesseract on one image, pre-processed unless disabled."""
+    if preprocess:
+        image = preprocess_for_ocr(image, dpi=dpi, source_dpi=source_dpi)
+    return pytesseract.image_to_string(image)
+
+
+def _init_worker(tesseract_threads):
+    # Runs in each pool process only; the Tesseract subprocesses inherit it.
+    os.environ['OMP_THREAD_LIMIT'] = str(tesseract_threads)
+
+
+def ocr_pdf_page(full_path, page_number, dpi=OCR_DPI):
+    """Renders one page (1-based) of a PDF and returns its OCR text."""
+    images = convert_from_path(full_path, dpi=dpi, first_page=page_number, last_page=page_number)
+    try:
+        return "".join(ocr_image(img, dpi=dpi, source_dpi=dpi) for img in images)
+    finally:
+        for img in images:
+            img.close()
+
+
+def _timed_ocr_pdf_page(full_path, page_number, dpi):
+    started = time.perf_counter()
+    text = ocr_pdf_page(full_path, page_number, dpi)
+    return text, time.perf_counter() - started
+
+
+def count_pdf_pages(full_path):
+    # Poppler, like the renderer: it also reads the PDFs PyPDF2 fails to parse
+    return int(pdfinfo_from_path(full_path)['Pages'])
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _shared_pool(workers, tesseract_threads):
+    """
+    The process-wide OCR pool for these settings, started on first use.
+    Its processes are spawned, not forked: callers are often threads, and
+    forking a multithreaded process can copy locks held by other threads.
+    """
+    key = (workers, tesseract_threads)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker, initargs=(tesseract_threads,),
+            )
+        return _pools[key]
+
+
+def _discard_pool(pool):
+    with _pools_lock:
+        for key, existing in list(_pools.items()):
+            if existing is pool:
+                del _pools[key]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def _shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def ocr_pdf_pages(full_path, page_numbers=None, dpi=OCR_DPI, workers=OCR_WORKERS,
+                  tesseract_threads=OCR_TESSERACT_THREADS, timings=None):
+    """
+    OCRs the given 1-based pages of a PDF (all pages by default) and returns
+    {page_number: text}. Pages are submitted to the shared pool in a sliding
+    window so memory stays bounded however long the document is. If a
+    `timings` dict is passed it is filled with {page_number: seconds}
+    (render + OCR).
+    """
+    if page_numbers is None:
+        page_numbers = range(1, count_pdf_pages(full_path) + 1)
+    page_numbers = list(page_numbers)
+    timings = {} if timings is None else timings
+    if not page_numbers:
+        return {}
+
+    pool = _shared_pool(max(1, workers), tesseract_threads)
+    max_in_flight = max(1, min(workers, len(page_numbers))) * OCR_PAGES_IN_FLIGHT_PER_WORKER
+    pending_pages = iter(page_numbers)
+    results = {}
+    in_flight = {}
+    try:
+        for n in pending_pages:
+            in_flight[pool.submit(_timed_ocr_pdf_page, full_path, n, dpi)] = n
+            if len(in_flight) >= max_in_flight:
+                break
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                n = in_flight.pop(future)
+                results[n], timings[n] = future.result()
+                next_page = next(pending_pages, None)
+                if next_page is not None:
+                    in_flight[pool.submit(_timed_ocr_pdf_page, full_path, next_page, dpi)] = next_page
+    except BrokenProcessPool:
+        _discard_pool(pool) # A worker died (e.g. OOM); the next call starts a fresh pool
+        raise
+    finally:
+        for future in in_flight:
+            future.cancel()
+    return results
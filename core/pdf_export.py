@@ -0,0 +1,550 @@
+# core/pdf_export.py
+# Building blocks of the stamped document export (GeneratePDFView). Stamp
+# overlays are rendered once per (status, page size) and kept in memory;
+# each document's converted + stamped pages are written once per (content
+# hash, verification status) to EXPORT_CACHE_DIR, so a repeat export is only
+# page copies. Copies are deleted with their document (or when its status
+# changes) and pruned once unused for EXPORT_CACHE_MAX_AGE_SECONDS. Bundles are produced a document at a time and never held in
+# memory whole: PDFs are spooled to a temp file and served with Range
+# support, ZIPs are streamed as they are built.
+
+import functools
+import glob
+import io
+import os
+import re
+import tempfile
+import struct
+import time
+import zipfile
+from collections import deque
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from PIL import Image, ImageOps
+from pypdf import PdfReader, PdfWriter, Transformation
+from pypdf.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, StreamObject,
+)
+from reportlab.lib.colors import black, green, red
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+
+from .content_cache import sha256_of_file
+from .models import Document
+
+EXPORT_CACHE_DIR = getattr(settings, 'EXPORT_CACHE_DIR', os.path.join(settings.BASE_DIR, 'export_cache'))
+# Bump when the stamp or the image-page layout changes, so stale cached pages are not served.
+EXPORT_CACHE_VERSION = 2
+# Stamped copies not exported for this long are deleted by prune_export_cache()
+EXPORT_CACHE_MAX_AGE_SECONDS = getattr(settings, 'EXPORT_CACHE_MAX_AGE_SECONDS', 7 * 24 * 3600)
+# A '.part' file this old was left by a crashed writer
+PARTIAL_WRITE_MAX_AGE_SECONDS = 3600
+
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg']
+STAMP_COLORS = {'Verified': green, 'Rejected': red}
+EXPORT_CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Image documents are embedded at no more than this resolution
+EXPORT_IMAGE_DPI = getattr(settings, 'EXPORT_IMAGE_DPI', 150)
+EXPORT_IMAGE_JPEG_QUALITY = getattr(settings, 'EXPORT_IMAGE_JPEG_QUALITY', 85)
+EXIF_ORIENTATION = 0x0112
+
+
+# ==============================================================================
+# 1. STAMP OVERLAYS
+# ==============================================================================
+
+@functools.lru_cache(maxsize=64)
+def get_stamp_page(status, width, height):
+    """
+    A transparent page of the given size with "STATUS: X" at its top-left
+    corner. Cached: a bundle of N same-sized pages renders the stamp once.
+    """
+    stamp_buffer = io.BytesIO()
+    stamp_canvas = canvas.Canvas(stamp_buffer, pagesize=(width, height))
+    stamp_canvas.setFont("Helvetica-Bold", 12)
+    stamp_canvas.setFillColor(STAMP_COLORS.get(status, black)) # Pending or other
+    stamp_canvas.drawString(0.75 * inch, height - (0.75 * inch), f"STATUS: {status.upper()}")
+    stamp_canvas.save()
+    stamp_buffer.seek(0)
+    return PdfReader(stamp_buffer).pages[0]
+
+
+def stamp_page(page, status):
+    """Merges the status stamp into `page`, sized and positioned to its mediabox."""
+    box = page.mediabox
+    stamp = get_stamp_page(status, round(float(box.width), 2), round(float(box.height), 2))
+    if box.left or box.bottom:
+        page.merge_transformed_page(stamp, Transformation().translate(float(box.left), float(box.bottom)))
+    else:
+        page.merge_page(stamp)
+    return page
+
+
+# ==============================================================================
+# 2. PER-DOCUMENT STAMPED PAGES (on-disk cache)
+# ==============================================================================
+
+def _image_page_size(width_px, height_px, dpi):
+    """
+    Physical page size in points: the image at `dpi`, shrunk (never grown)
+    to fit A4, turned landscape for landscape images.
+    """
+    box_width, box_height = A4 if height_px >= width_px else (A4[1], A4[0])
+    width, height = width_px * 72 / dpi, height_px * 72 / dpi
+    scale = min(1, box_width / width, box_height / height)
+    return width * scale, height * scale
+
+
+def _png_image(data):
+    """
+    (width_px, height_px, color space, filter, decode parms, data) embedding a PNG's
+    compressed IDAT data as-is (FlateDecode with the PNG predictor), or None
+    for PNGs PDF cannot take that way (not 8-bit gray / RGB, or interlaced).
+    """
+    width_px, height_px, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', data[16:29])
+    if bit_depth != 8 or color_type not in (0, 2) or interlace:
+        return None
+    idat, position = [], 8
+    while position < len(data):
+        length, chunk_type = struct.unpack('>I4s', data[position:position + 8])
+        if chunk_type == b'IDAT':
+            idat.append(data[position + 8:position + 8 + length])
+        position += 12 + length
+    colors = 1 if color_type == 0 else 3
+    decode_parms = b"<< /Predictor 15 /Colors %d /BitsPerComponent 8 /Columns %d >>" % (colors, width_px)
+    color_space = b'DeviceGray' if colors == 1 else b'DeviceRGB'
+    return width_px, height_px, color_space, b'FlateDecode', decode_parms, b''.join(idat)
+
+
+def _image_pdf(page_width, page_height, image):
+    """
+    A one-page PDF showing `image` = (width_px, height_px, color space,
+    filter, decode parms or None, data) full-page.
+    """
+    width_px, height_px, color_space, image_filter, decode_parms, data = image
+    content = b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (page_width, page_height)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+        b"/Resources << /XObject << /Im0 5 0 R >> >> /Contents 4 0 R >>" % (page_width, page_height),
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /%s /BitsPerComponent 8 "
+        b"/Filter /%s%s /Length %d >>\nstream\n" % (
+            width_px, height_px, color_space, image_filter,
+            b" /DecodeParms " + decode_parms if decode_parms else b"", len(data),
+        )
+        + data + b"\nendstream",
+    ]
+    buffer = io.BytesIO()
+    buffer.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(buffer.tell())
+        buffer.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref_offset = buffer.tell()
+    buffer.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        buffer.write(b"%010d 00000 n \n" % offset)
+    buffer.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    buffer.seek(0)
+    return buffer
+
+
+def _image_page(file_path):
+    """
+    A single PDF page showing the image at a physical size (see
+    _image_page_size). JPEGs that need no downsampling or rotation are
+    embedded as-is (DCTDecode), as is the compressed data of such 8-bit
+    PNGs; anything else is downsampled to EXPORT_IMAGE_DPI and re-encoded,
+    as JPEG for photos, as PNG data otherwise.
+    """
+    with Image.open(file_path) as img:
+        dpi = img.info.get('dpi', (EXPORT_IMAGE_DPI,))[0] or EXPORT_IMAGE_DPI
+        orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+        width_px, height_px = img.size if orientation < 5 else img.size[::-1] # 5-8 swap the axes
+        page_width, page_height = _image_page_size(width_px, height_px, dpi)
+        target = (round(page_width / 72 * EXPORT_IMAGE_DPI), round(page_height / 72 * EXPORT_IMAGE_DPI))
+        downsample = width_px > target[0] * 1.05
+
+        if img.format in ('JPEG', 'PNG') and img.mode in ('L', 'RGB') and orientation == 1 and not downsample:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            if img.format == 'JPEG':
+                color_space = b'DeviceGray' if img.mode == 'L' else b'DeviceRGB'
+                image = (*img.size, color_space, b'DCTDecode', None, data)
+            else:
+                image = _png_image(data)
+            if image is not None:
+                return PdfReader(_image_pdf(page_width, page_height, image)).pages[0]
+
+        is_photo = img.format == 'JPEG'
+        if downsample and is_photo:
+            # Decode at a reduced scale (in the stored orientation): much faster for big photos
+            img.draft(img.mode, target if orientation < 5 else target[::-1])
+        img = ImageOps.exif_transpose(img)
+        if downsample:
+            img = img.resize(target, Image.LANCZOS)
+        if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, 'white')
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode not in ('L', 'RGB'):
+            img = img.convert('RGB')
+
+        encoded = io.BytesIO()
+        if is_photo:
+            img.save(encoded, 'JPEG', quality=EXPORT_IMAGE_JPEG_QUALITY)
+            color_space = b'DeviceGray' if img.mode == 'L' else b'DeviceRGB'
+            image = (*img.size, color_space, b'DCTDecode', None, encoded.getvalue())
+        else:
+            img.save(encoded, 'PNG')
+            image = _png_image(encoded.getvalue())
+    return PdfReader(_image_pdf(page_width, page_height, image)).pages[0]
+
+
+def _cache_path(content_hash, status):
+    status_key = re.sub(r'[^A-Za-z0-9]+', '_', status or 'none')
+    return os.path.join(EXPORT_CACHE_DIR, f"{content_hash}-{status_key}-v{EXPORT_CACHE_VERSION}.pdf")
+
+
+def stamped_document_path(document):
+    """
+    Path of a PDF holding `document`'s pages with its verification stamp,
+    built on first use. Returns None for documents without a file on disk or
+    of a type that cannot be exported.
+    """
+    if not document.uploaded_file:
+        return None
+    file_path = os.path.join(settings.MEDIA_ROOT, document.uploaded_file.name)
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if not os.path.exists(file_path) or (file_ext != '.pdf' and file_ext not in IMAGE_EXTENSIONS):
+        return None
+
+    if not document.content_hash:
+        # Uploaded before content hashing existed
+        document.content_hash = sha256_of_file(document.uploaded_file)
+        document.save(update_fields=['content_hash'])
+
+    cache_path = _cache_path(document.content_hash, document.verification_status)
+    if os.path.exists(cache_path):
+        os.utime(cache_path) # The modification time records the last use (see prune_export_cache)
+        return cache_path
+
+    writer = PdfWriter()
+    if file_ext == '.pdf':
+        for page in PdfReader(file_path).pages:
+            writer.add_page(stamp_page(page, document.verification_status))
+    else:
+        writer.add_page(stamp_page(_image_page(file_path), document.verification_status))
+
+    # Write under a temporary name and rename, so a concurrent export never
+    # reads a half-written file.
+    os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=EXPORT_CACHE_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            writer.write(f)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return cache_path
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False # Removed concurrently
+
+
+def delete_stamped_pages(content_hash):
+    """
+    Deletes the stamped copies of this content that no remaining document
+    needs: all of them once its last document is gone, and those of
+    statuses its documents no longer have.
+    """
+    statuses = Document.objects.filter(content_hash=content_hash).values_list('verification_status', flat=True)
+    keep = {_cache_path(content_hash, status) for status in statuses.distinct()}
+    for path in glob.glob(os.path.join(glob.escape(EXPORT_CACHE_DIR), f"{content_hash}-*.pdf")):
+        if path not in keep:
+            _remove(path)
+
+
+def prune_export_cache(max_age_seconds=EXPORT_CACHE_MAX_AGE_SECONDS):
+    """Deletes stamped copies unused for `max_age_seconds` and abandoned partial writes. Returns how many."""
+    now = time.time()
+    removed = 0
+    try:
+        entries = list(os.scandir(EXPORT_CACHE_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not entry.is_file():
+            continue # e.g. the export jobs directory
+        if entry.name.endswith('.pdf'):
+            max_age = max_age_seconds
+        elif entry.name.endswith('.part'):
+            max_age = PARTIAL_WRITE_MAX_AGE_SECONDS
+        else:
+            continue
+        if entry.stat().st_mtime < now - max_age and _remove(entry.path):
+            removed += 1
+    return removed
+
+
+def error_page(document_type, error):
+    """A letter page saying the document could not be exported."""
+    error_buffer = io.BytesIO()
+    error_canvas = canvas.Canvas(error_buffer, pagesize=letter)
+    error_canvas.drawString(1 * inch, 10 * inch, f"Error processing file: {document_type}")
+    error_canvas.drawString(1 * inch, 9.5 * inch, str(error))
+    error_canvas.save()
+    error_buffer.seek(0)
+    return error_buffer
+
+
+# ==============================================================================
+# 3. BUNDLES (streamed: memory is bounded by the largest single document)
+# ==============================================================================
+
+class _PdfConcatenator:
+    """
+    Writes the pages of several PDFs as one PDF, one source at a time. Each
+    source's objects are renumbered and serialized as soon as it is read, so
+    nothing but the page list and the xref offsets is kept across sources.
+    A source that fails partway leaves no trace: its pages, numbers and
+    offsets only join the bundle once all of its objects are serialized.
+    """
+    CATALOG, PAGES = 1, 2
+
+    def __init__(self):
+        self._offsets = {} # object number -> byte offset
+        self._position = 0
+        self._kids = []
+        self._next_number = 3
+
+    def _write_object(self, buffer, offsets, number, obj):
+        offsets[number] = self._position + buffer.tell()
+        buffer.write(b"%d 0 obj\n" % number)
+        obj.write_to_stream(buffer)
+        buffer.write(b"\nendobj\n")
+
+    def _finish(self, buffer):
+        data = buffer.getvalue()
+        self._position += len(data)
+        return data
+
+    def header(self):
+        # The binary comment line marks the file as binary to transfer tools
+        return self._finish(io.BytesIO(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"))
+
+    def add_pages(self, reader):
+        """Serializes every page of `reader` (and what they reference). Returns the bytes."""
+        numbers = {} # (idnum, generation) in the source -> number in the bundle
+        pending = deque()
+        page_keys = set()
+        kids, offsets = [], {}
+        next_number = self._next_number
+
+        def allocate():
+            nonlocal next_number
+            next_number += 1
+            return next_number - 1
+
+        pages_root = reader.trailer['/Root'].raw_get('/Pages')
+        if isinstance(pages_root, IndirectObject):
+            numbers[(pages_root.idnum, pages_root.generation)] = self.PAGES
+        for page in reader.pages:
+            ref = page.indirect_reference
+            key = (ref.idnum, ref.generation)
+            page_keys.add(key)
+            numbers[key] = allocate()
+            kids.append(numbers[key])
+            pending.append(ref)
+
+        def renumber(obj):
+            if isinstance(obj, IndirectObject):
+                key = (obj.idnum, obj.generation)
+                if key not in numbers:
+                    numbers[key] = allocate()
+                    pending.append(obj)
+                return IndirectObject(numbers[key], 0, None)
+            if isinstance(obj, StreamObject):
+                copy = obj.__class__()
+                copy._data = obj._data # the still-encoded stream bytes
+                copy.update({key: renumber(value) for key, value in obj.items()})
+                return copy
+            if isinstance(obj, DictionaryObject):
+                return DictionaryObject({key: renumber(value) for key, value in obj.items()})
+            if isinstance(obj, ArrayObject):
+                return ArrayObject(renumber(value) for value in obj)
+            return obj
+
+        buffer = io.BytesIO()
+        while pending:
+            ref = pending.popleft()
+            key = (ref.idnum, ref.generation)
+            obj = ref.get_object()
+            if key in page_keys:
+                # Set after renumbering: PAGES is a bundle number, not one of the source's
+                obj = renumber(DictionaryObject({k: v for k, v in obj.items() if k != '/Parent'}))
+                obj[NameObject('/Parent')] = IndirectObject(self.PAGES, 0, None)
+            else:
+                obj = renumber(obj)
+            self._write_object(buffer, offsets, numbers[key], obj)
+
+        self._kids += kids
+        self._offsets.update(offsets)
+        self._next_number = next_number
+        return self._finish(buffer)
+
+    def trailer(self):
+        buffer = io.BytesIO()
+        pages = DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): ArrayObject(IndirectObject(number, 0, None) for number in self._kids),
+            NameObject('/Count'): NumberObject(len(self._kids)),
+        })
+        catalog = DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): IndirectObject(self.PAGES, 0, None),
+        })
+        self._write_object(buffer, self._offsets, self.PAGES, pages)
+        self._write_object(buffer, self._offsets, self.CATALOG, catalog)
+
+        xref_offset = self._position + buffer.tell()
+        size = self._next_number
+        buffer.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for number in range(1, size):
+            buffer.write(b"%010d 00000 n \n" % self._offsets[number])
+        buffer.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                     % (size, self.CATALOG, xref_offset))
+        return self._finish(buffer)
+
+
+def stream_document_bundle(documents):
+    """Yields the stamped pages of `documents`, in order, as one PDF, a document at a time."""
+    bundle = _PdfConcatenator()
+    yield bundle.header()
+    for doc in documents:
+        try:
+            path = stamped_document_path(doc)
+            if path is None:
+                continue # Skip if there's no (exportable) file
+            yield bundle.add_pages(PdfReader(path))
+        except Exception as e:
+            print(f"Error processing file {doc.uploaded_file.name}: {e}")
+            yield bundle.add_pages(PdfReader(error_page(doc.document_type, e)))
+    yield bundle.trailer()
+
+
+def build_document_bundle(documents, output):
+    """Writes the stamped pages of `documents`, in order, as one PDF to `output`."""
+    for chunk in stream_document_bundle(documents):
+        output.write(chunk)
+
+
+class _ChunkSink:
+    """Write-only file object that hands what was written to a generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def stream_document_zip(documents):
+    """
+    Yields a ZIP of one stamped PDF per document. Entries are stored (the
+    PDFs are already compressed) and written with data descriptors, so the
+    first bytes go out before later documents are stamped.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+        for position, doc in enumerate(documents, 1):
+            name = f"{position:02d}_{re.sub(r'[^A-Za-z0-9.]+', '_', doc.document_type)}.pdf"
+            try:
+                path = stamped_document_path(doc)
+                if path is None:
+                    continue # Skip if there's no (exportable) file
+                source = open(path, 'rb')
+            except Exception as e:
+                print(f"Error processing file {doc.uploaded_file.name}: {e}")
+                source = error_page(doc.document_type, e)
+            with source, archive.open(name, 'w') as entry:
+                while chunk := source.read(EXPORT_CHUNK_SIZE):
+                    entry.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+# ==============================================================================
+# 4. DOWNLOADS
+# ==============================================================================
+
+class _FileRange:
+    """Read-only view of `length` bytes of an open file from its current position."""
+
+    def __init__(self, file, length):
+        self._file = file
+        self._remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def file_response(request, file, filename, content_type):
+    """
+    Serves an open binary file as an attachment, honouring a single
+    "Range: bytes=first-last" header (206, or 416 if unsatisfiable).
+    Multi-range requests get the whole file. The file is closed with the response.
+    """
+    size = os.fstat(file.fileno()).st_size
+    match = RANGE_RE.match(request.headers.get('Range', '').strip())
+    if not match or match.groups() == ('', ''):
+        response = FileResponse(file, as_attachment=True, filename=filename, content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(0, size - int(last)), size - 1 # suffix range: the last N bytes
+    if start > end:
+        file.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+        return response
+
+    file.seek(start)
+    response = FileResponse(_FileRange(file, end - start + 1), status=206, as_attachment=True,
+                            filename=filename, content_type=content_type)
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f"bytes {start}-{end}/{size}"
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,109 @@
+# core/profile_merge.py
+# Atomic StudentProfile merges for profile ETL. Parsed document fields are
+# merged by the database, not read into Python and written back, so two
+# uploads for the same student cannot lose each other's skills or degrees:
+#   highest_percentage  the larger of the stored and the new value
+#   annual_income       overwritten by the new value
+#   degrees, skills     the stored list plus the new entries it lacks, in order
+# On PostgreSQL a merge (or a whole batch of them) is one
+# INSERT ... ON CONFLICT DO UPDATE statement; other backends lock the row
+# with select_for_update() and save only the merged columns.
+
+import json
+
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+
+from .models import StudentProfile
+
+MERGED_FIELDS = ['highest_percentage', 'annual_income', 'degrees', 'verified_skills']
+
+
+def _jsonb_union(column):
+    """SQL for `column` plus the elements of EXCLUDED.`column` it does not contain, keeping their order."""
+    existing = f"(CASE WHEN jsonb_typeof(p.{column}) = 'array' THEN p.{column} ELSE '[]'::jsonb END)"
+    return (
+        f"{existing} || COALESCE((SELECT jsonb_agg(e ORDER BY i) "
+        f"FROM jsonb_array_elements(EXCLUDED.{column}) WITH ORDINALITY AS t(e, i) "
+        f"WHERE NOT {existing} @> jsonb_build_array(e)), '[]'::jsonb)"
+    )
+
+
+# GREATEST ignores NULLs, so a missing percentage on either side keeps the other.
+# (xmax = 0) is true for rows this statement inserted rather than updated.
+MERGE_SQL = f"""
+    INSERT INTO {StudentProfile._meta.db_table} AS p
+        (student_id, highest_percentage, annual_income, degrees, verified_skills)
+    VALUES {{values}}
+    ON CONFLICT (student_id) DO UPDATE SET
+        highest_percentage = GREATEST(p.highest_percentage, EXCLUDED.highest_percentage),
+        annual_income = COALESCE(EXCLUDED.annual_income, p.annual_income),
+        degrees = {_jsonb_union('degrees')},
+        verified_skills = {_jsonb_union('verified_skills')}
+    RETURNING student_id, highest_percentage, annual_income, degrees, verified_skills, (xmax = 0)
+"""
+VALUES_SQL = "(%s, %s, %s, %s::jsonb, %s::jsonb)"
+
+
+def _unique(values):
+    return list(dict.fromkeys(values or []))
+
+
+def profile_update(parsed_data):
+    """The column values one parsed-fields dict contributes (None / [] for nothing)."""
+    return {
+        'highest_percentage': float(parsed_data["percentage"]) if parsed_data.get("percentage") else None,
+        'annual_income': int(parsed_data["income"]) if parsed_data.get("income") else None,
+        'degrees': _unique(parsed_data.get("degrees")),
+        'verified_skills': _unique(parsed_data.get("skills")),
+    }
+
+
+def _merge_postgres(updates):
+    rows = sorted(updates.items()) # Rows are locked in student_id order, so concurrent batches cannot deadlock
+    params = []
+    for student_id, update in rows:
+        params += [student_id, update['highest_percentage'], update['annual_income'],
+                   json.dumps(update['degrees']), json.dumps(update['verified_skills'])]
+    with connection.cursor() as cursor:
+        cursor.execute(MERGE_SQL.format(values=', '.join([VALUES_SQL] * len(rows))), params)
+        returned = cursor.fetchall()
+
+    profiles = {}
+    for student_id, percentage, income, degrees, skills, created in returned:
+        if isinstance(degrees, str): # Drivers that leave jsonb undecoded
+            degrees, skills = json.loads(degrees), json.loads(skills)
+        profile = StudentProfile(student_id=student_id, highest_percentage=percentage, annual_income=income,
+                                 degrees=degrees, verified_skills=skills)
+        # The receivers (student summary, admin statistics) still see the change
+        post_save.send(sender=StudentProfile, instance=profile, created=created, raw=False,
+                       using=connection.alias, update_fields=frozenset(MERGED_FIELDS))
+        profiles[student_id] = profile
+    return profiles
+
+
+def _merge_locked(student_id, update):
+    with transaction.atomic():
+        StudentProfile.objects.get_or_create(student_id=student_id)
+        profile = StudentProfile.objects.select_for_update().get(student_id=student_id)
+        if update['highest_percentage'] is not None:
+            profile.highest_percentage = max(profile.highest_percentage or 0, update['highest_percentage'])
+        if update['annual_income'] is not None:
+            profile.annual_income = update['annual_income']
+        for field in ('degrees', 'verified_skills'):
+            existing = getattr(profile, field) or []
+            setattr(profile, field, existing + [v for v in update[field] if v not in existing])
+        profile.save(update_fields=MERGED_FIELDS)
+    return profile
+
+
+def merge_profiles(updates):
+    """
+    Applies {student_id: profile_update(...)} atomically, creating missing
+    profiles. Returns {student_id: StudentProfile with the merged values}.
+    """
+    if not updates:
+        return {}
+    if connection.vendor == 'postgresql':
+        return _merge_postgres(updates)
+    return {student_id: _merge_locked(student_id, update) for student_id, update in sorted(updates.items())}
@@ -0,0 +1,278 @@
+# core/recommendations.py
+# Materialized per-student recommendations. Scores jobs by skill overlap and
+# scholarships with the typed eligibility engine, stores the ranked result in
+# StudentRecommendation and keeps it fresh through the background queue.
+
+import re
+import threading
+import time
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .eligibility import (
+    SNAPSHOT_TTL_SECONDS, ScholarshipMatrix, attributes_from_values, get_student_attributes,
+    find_eligible_scholarships, invalidate_scholarship_matrix,
+)
+from .models import GovtJob, Student, StudentRecommendation
+from .tasks import register, enqueue
+
+TOP_JOBS = getattr(settings, 'RECOMMENDATIONS_TOP_JOBS', 30)
+TOP_SCHOLARSHIPS = getattr(settings, 'RECOMMENDATIONS_TOP_SCHOLARSHIPS', 30)
+REFRESH_BATCH_SIZE = 500
+# Students evaluated per (students x scholarships) mask when a sync changes rows
+MATCH_BATCH_SIZE = 1000
+
+# ==============================================================================
+# 1. SKILL PARSING
+# ==============================================================================
+
+_SKILL_SPLIT_RE = re.compile(r'[|,;/\n]')
+
+
+def normalize_skill(skill):
+    """Case-folds and collapses whitespace so 'Machine  learning' == 'machine learning'."""
+    return ' '.join(str(skill).split()).casefold()
+
+
+def parse_job_skills(eligibility_criteria):
+    """Returns the set of normalized skills a job asks for."""
+    skills = (eligibility_criteria or {}).get('skills')
+    if not skills:
+        return set()
+    if isinstance(skills, str):
+        skills = _SKILL_SPLIT_RE.split(skills)
+    return {normalize_skill(s) for s in skills if str(s).strip()}
+
+
+# ==============================================================================
+# 2. JOB INDEX (inverted skill -> jobs index, cached like the scholarship matrix)
+# ==============================================================================
+
+class JobIndex:
+    """Every job's skill set, with an inverted index for overlap counting."""
+
+    def __init__(self, jobs):
+        self.jobs = jobs # list of dicts with job_id, job_title, job_description, source_url, skills
+        self.skill_counts = np.array([len(j['skills']) for j in jobs], dtype=np.float64)
+        self.postings = {}
+        for position, job in enumerate(jobs):
+            for skill in job['skills']:
+                self.postings.setdefault(skill, []).append(position)
+        self.postings = {skill: np.array(p, dtype=np.int64) for skill, p in self.postings.items()}
+
+    def score(self, skills, top_n):
+        """
+        Ranks jobs by the fraction of their required skills the student has.
+        Returns [(position, score, matched_skills)] for jobs with any overlap.
+        """
+        hits = [self.postings[s] for s in skills if s in self.postings]
+        if not hits:
+            return []
+        overlap = np.bincount(np.concatenate(hits), minlength=len(self.jobs))
+        candidates = np.flatnonzero(overlap)
+        scores = overlap[candidates] / self.skill_counts[candidates]
+        order = np.lexsort((-overlap[candidates], -scores))[:top_n]
+        return [
+            (int(candidates[i]), float(scores[i]), sorted(skills & self.jobs[candidates[i]]['skills']))
+            for i in order
+        ]
+
+
+_job_index = None
+_job_index_built_at = 0.0
+_job_index_lock = threading.Lock()
+
+
+def get_job_index():
+    global _job_index, _job_index_built_at
+    with _job_index_lock:
+        if _job_index is None or time.monotonic() - _job_index_built_at > SNAPSHOT_TTL_SECONDS:
+            jobs = [
+                {**job, 'skills': parse_job_skills(job.pop('eligibility_criteria'))}
+                for job in GovtJob.objects.order_by('job_id').values(
+                    'job_id', 'job_title', 'job_description', 'source_url', 'eligibility_criteria'
+                )
+            ]
+            _job_index = JobIndex([j for j in jobs if j['skills']])
+            _job_index_built_at = time.monotonic()
+        return _job_index
+
+
+def invalidate_job_index():
+    global _job_index
+    with _job_index_lock:
+        _job_index = None
+
+
+# ==============================================================================
+# 3. COMPUTE & MATERIALIZE
+# ==============================================================================
+
+def compute_recommendations(student):
+    """Computes the ranked job and scholarship lists for one student."""
+    profile = getattr(student, 'studentprofile', None)
+    display_names = {normalize_skill(s): s for s in (profile.verified_skills if profile else []) or []}
+    skills = set(display_names)
+
+    index = get_job_index()
+    jobs = []
+    for position, score, matched in index.score(skills, TOP_JOBS):
+        job = index.jobs[position]
+        jobs.append({
+            'job_id': job['job_id'],
+            'score': round(score, 4),
+            'match_reason': f"Matches your skills: {', '.join(display_names[m] for m in matched)}",
+            'job_title': job['job_title'],
+            'job_description': (job['job_description'] or '')[:300],
+            'source_url': job['source_url'],
+        })
+
+    eligible = find_eligible_scholarships(get_student_attributes(student, profile), limit=TOP_SCHOLARSHIPS)
+    best = max((e['matching_criteria_rows'] for e in eligible), default=1)
+    scholarships = [
+        {
+            'scholarship_id': e['scholarship_id'],
+            'scholarship_name': e['scholarship_name'],
+            'amount': e['amount'],
+            'score': round(e['matching_criteria_rows'] / best, 4),
+        }
+        for e in eligible
+    ]
+    return jobs, scholarships
+
+
+def recompute_for_students(student_ids):
+    """
+    Recomputes and stores recommendations for the given students. A row's
+    stale flag is only cleared if it was set before this run started, so a
+    profile change that lands mid-run is picked up by the next refresh.
+    """
+    started = timezone.now()
+    rows = []
+    for student in Student.objects.filter(student_id__in=student_ids).select_related('studentprofile'):
+        jobs, scholarships = compute_recommendations(student)
+        rows.append(StudentRecommendation(
+            student=student, jobs=jobs, scholarships=scholarships, computed_at=started,
+        ))
+
+    with transaction.atomic():
+        StudentRecommendation.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=['jobs', 'scholarships', 'computed_at'],
+        )
+        StudentRecommendation.objects.filter(
+            student_id__in=student_ids, stale_since__lte=started
+        ).update(stale_since=None)
+    return rows
+
+
+def get_recommendations(student):
+    """
+    Read path: one primary-key lookup. The very first read for a student
+    computes inline; afterwards the background refresh keeps it current.
+    """
+    recommendation = StudentRecommendation.objects.filter(student=student).first()
+    if recommendation is None:
+        recompute_for_students([student.student_id])
+        recommendation = StudentRecommendation.objects.get(student=student)
+    return recommendation
+
+
+def mark_stale(student_ids):
+    """Flags students whose inputs changed and queues a background refresh."""
+    student_ids = list(student_ids)
+    if not student_ids:
+        return 0
+    # Always bump the timestamp, so a refresh already running for these
+    # students does not clear a change it has not seen.
+    marked = StudentRecommendation.objects.filter(
+        student_id__in=student_ids
+    ).update(stale_since=timezone.now())
+    transaction.on_commit(lambda: enqueue('refresh_recommendations', unique=True))
+    return marked
+
+
+@register('refresh_recommendations')
+def refresh_stale_recommendations():
+    """Background task: recompute every stale student, in batches."""
+    # The worker is a separate process from the one that synced the partner
+    # data, so start from fresh snapshots.
+    invalidate_job_index()
+    invalidate_scholarship_matrix()
+    run_started = timezone.now()
+    total = 0
+    while True:
+        # Rows marked after this run started are left for the follow-up task
+        # that mark_stale() queued for them.
+        batch = list(
+            StudentRecommendation.objects.filter(stale_since__lte=run_started)
+            .order_by('stale_since')
+            .values_list('student_id', flat=True)[:REFRESH_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        recompute_for_students(batch)
+        total += len(batch)
+    print(f"Refreshed recommendations for {total} student(s).")
+    return total
+
+
+# ==============================================================================
+# 4. AFFECTED-STUDENT DETECTION (for partner dataset refreshes)
+# ==============================================================================
+
+def students_with_any_skill(skills):
+    """Student ids whose verified skills intersect the given normalized skills."""
+    if not skills:
+        return []
+    from .skills import student_ids_with_skills
+    return list(student_ids_with_skills(skills))
+
+
+def _bounds_filter(rows, lower_field, upper_field, lookup):
+    """
+    Coarse SQL pre-filter: the student's value (or no value) lies inside the
+    envelope of the rows' bounds. The matrix still does the exact check.
+    """
+    lowers = [row[lower_field] for row in rows]
+    uppers = [row[upper_field] for row in rows]
+    bounds = Q()
+    if None not in lowers:
+        bounds &= Q(**{f'{lookup}__gte': min(lowers)})
+    if None not in uppers:
+        bounds &= Q(**{f'{lookup}__lte': max(uppers)})
+    if not bounds:
+        return Q()
+    return Q(**{f'{lookup}__isnull': True}) | bounds
+
+
+def students_matching_scholarship_rows(rows):
+    """Student ids the eligibility engine matches against any of the given rows."""
+    if not rows:
+        return []
+    matrix = ScholarshipMatrix(rows)
+    students = (
+        Student.objects
+        .filter(
+            _bounds_filter(rows, 'income_min', 'income_max', 'studentprofile__annual_income'),
+            _bounds_filter(rows, 'percentage_min', 'percentage_max', 'studentprofile__highest_percentage'),
+        )
+        .order_by()
+        .values_list(
+            'student_id', 'profile_details', 'studentprofile__annual_income',
+            'studentprofile__highest_percentage', 'studentprofile__degrees',
+        )
+        .iterator(chunk_size=MATCH_BATCH_SIZE)
+    )
+    matched = []
+    while batch := list(islice(students, MATCH_BATCH_SIZE)):
+        mask = matrix.any_match([attributes_from_values(*values) for _, *values in batch])
+        matched.extend(batch[index][0] for index in np.flatnonzero(mask))
+    return matched
@@ -0,0 +1,26 @@
+# core/renderers.py
+# Project-wide JSON renderer (REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']).
+# orjson encodes the common types natively and several times faster than the
+# stdlib json module DRF's JSONRenderer uses; anything else (datetimes, so
+# their format stays DRF's, Decimal, lazy strings, ...) goes through DRF's
+# own encoder, so responses are unchanged.
+
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None # JSON is binary-safe UTF-8; no charset parameter, as with DRF's JSONRenderer
+
+    def __init__(self):
+        self._default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=self._default, option=ORJSON_OPTIONS)
@@ -3,12 +3,14 @@
 from rest_framework import serializers
 from .models import Document, Student, GovtJob, Scholarship, StudentProfile, Skill, StudentSkill
 from django.contrib.auth.hashers import make_password
+from .content_cache import sha256_of_file
 
 class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Document
         # Specify the fields you want to include in the API response
-        fields = ['document_id', 'student', 'document_type', 'verification_status', 'issue_date', 'verified_data']
+        fields = ['document_id', 'student', 'document_type', 'verification_status', 'issue_date', 'verified_data',
+                  'processing_status', 'processing_error']
 
 class StudentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -41,11 +43,13 @@ class DocumentUploadSerializer(serializers.ModelSerializer):
             # 1. Get the authenticated student from the request context
             student = self.context['request'].user
             
-            # 2. Create the document object
+            # 2. Create the document object (hashing the bytes first, streamed
+            #    in chunks, so identical re-uploads hit the content cache)
             document = Document.objects.create(
                 student=student,
                 document_type=validated_data['document_type'],
-                uploaded_file=validated_data['uploaded_file']
+                uploaded_file=validated_data['uploaded_file'],
+                content_hash=sha256_of_file(validated_data['uploaded_file'])
             )
             
             # 3. (This part is not yet implemented, will be a part of a background task)
@@ -58,3 +62,57 @@ class GovtJobSerializer(serializers.ModelSerializer):
     class Meta:
         model = GovtJob
         fields = '__all__'
+
+
+# Field classes whose to_representation() leaves database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField, serializers.FloatField, serializers.BooleanField, serializers.CharField,
+    serializers.JSONField, serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for a ModelSerializer: rows come from .values_list()
+    and are turned into the same dicts the serializer would produce, without
+    building model instances or per-row field objects. Field sources and
+    the few conversions needed (dates, ...) are worked out once, here.
+    """
+    def __init__(self, serializer_class):
+        self.fields = list(serializer_class.Meta.fields)
+        self.sources, self.mappers = {}, {}
+        declared = serializer_class().fields
+        for name in self.fields:
+            field = declared[name]
+            if field.source == '*' or '.' in field.source or isinstance(field, serializers.SerializerMethodField):
+                raise ValueError(f"{serializer_class.__name__}.{name} has no single column to read.")
+            self.sources[name] = field.source # A relation's source reads its primary key
+            if not isinstance(field, PASSTHROUGH_FIELDS):
+                self.mappers[name] = field.to_representation
+
+    def columns(self, fields=None):
+        """The .values_list() columns for `fields` (default: all of them)."""
+        return [self.sources[name] for name in fields or self.fields]
+
+    def from_rows(self, rows, fields=None):
+        """Dicts from value tuples holding columns(fields), in that order."""
+        fields = fields or self.fields
+        mapped = [(i, self.mappers[name]) for i, name in enumerate(fields) if name in self.mappers]
+        if not mapped:
+            return [dict(zip(fields, row)) for row in rows]
+        data = []
+        for row in rows:
+            row = list(row)
+            for i, mapper in mapped:
+                if row[i] is not None:
+                    row[i] = mapper(row[i])
+            data.append(dict(zip(fields, row)))
+        return data
+
+    def serialize(self, queryset, fields=None):
+        """Equivalent to ModelSerializer(queryset, many=True).data, restricted to `fields`."""
+        return self.from_rows(queryset.values_list(*self.columns(fields)), fields)
+
+
+STUDENT_VALUES = ValuesSerializer(StudentSerializer)
+DOCUMENT_VALUES = ValuesSerializer(DocumentSerializer)
@@ -0,0 +1,147 @@
+# core/skills.py
+# Normalized student skills (Skill / StudentSkill). Profile ETL keeps each
+# student's rows equal to their StudentProfile.verified_skills, with skills
+# deduplicated by normalize_skill(), so "which students know Django" is an
+# indexed join with exact counts over every student instead of a scan over
+# all profiles (or a truncated list handed to the LLM).
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Skill, Student, StudentProfile, StudentSkill
+from .recommendations import normalize_skill
+
+MAX_SKILL_LENGTH = Skill._meta.get_field('skill_name').max_length
+SYNC_BATCH_SIZE = 2000
+# Upper bound on the students listed by skill_search() / skills listed by top_skills()
+MAX_SKILL_SEARCH_LIMIT = 500
+
+
+def skill_names(skills):
+    """{normalized name: display name} of the storable `skills`; the first spelling wins."""
+    names = {}
+    for skill in skills or []:
+        display = ' '.join(str(skill).split())
+        if display and len(display) <= MAX_SKILL_LENGTH:
+            names.setdefault(normalize_skill(display), display)
+    return names
+
+
+def get_skill_ids(names):
+    """{normalized name: skill_id} for skill_names() output, creating the missing skills."""
+    if not names:
+        return {}
+    Skill.objects.bulk_create(
+        [Skill(skill_name=display, normalized_name=key) for key, display in names.items()],
+        ignore_conflicts=True,
+    )
+    return dict(Skill.objects.filter(normalized_name__in=names).values_list('normalized_name', 'skill_id'))
+
+
+def _student_skill_rows(skills_by_student):
+    """StudentSkill rows for {student_id: skills}, creating the missing skills."""
+    names = {}
+    for skills in skills_by_student.values():
+        for key, display in skill_names(skills).items():
+            names.setdefault(key, display)
+    skill_ids = get_skill_ids(names)
+    return [
+        StudentSkill(student_id=student_id, skill_id=skill_ids[key])
+        for student_id, skills in skills_by_student.items()
+        for key in skill_names(skills)
+    ]
+
+
+def replace_student_skills(skills_by_student):
+    """Makes StudentSkill hold exactly the given skills for each student in {student_id: verified_skills}."""
+    rows = _student_skill_rows(skills_by_student)
+    with transaction.atomic():
+        StudentSkill.objects.filter(student_id__in=list(skills_by_student)).delete()
+        StudentSkill.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def add_student_skills(skills_by_student):
+    """
+    Called by profile ETL: adds the given skills to each student in
+    {student_id: skills}, keeping their other rows. Profile merges only ever
+    add skills, and insert-only syncs of concurrent merges cannot undo each other.
+    """
+    rows = _student_skill_rows(skills_by_student)
+    StudentSkill.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def sync_all_student_skills(batch_size=SYNC_BATCH_SIZE):
+    """Rebuilds StudentSkill from every profile, in batches. Returns (students, rows)."""
+    students = rows = 0
+    last_id = 0
+    while True:
+        batch = dict(
+            StudentProfile.objects.filter(student_id__gt=last_id).order_by('student_id')
+            .values_list('student_id', 'verified_skills')[:batch_size]
+        )
+        if not batch:
+            break
+        rows += replace_student_skills(batch)
+        students += len(batch)
+        last_id = max(batch)
+    return students, rows
+
+
+# ==============================================================================
+# QUERIES (index-only scans of student_skills_skill_idx)
+# ==============================================================================
+
+def student_ids_with_skills(skills, match_all=False):
+    """
+    A queryset of the ids of students having any (or, with match_all, every)
+    one of `skills`, compared after normalization.
+    """
+    keys = {normalize_skill(s) for s in skills}
+    skill_ids = list(Skill.objects.filter(normalized_name__in=keys).values_list('skill_id', flat=True))
+    rows = StudentSkill.objects.filter(skill_id__in=skill_ids)
+    if match_all:
+        if len(skill_ids) < len(keys):
+            return StudentSkill.objects.none().values_list('student_id', flat=True) # A skill nobody has
+        rows = rows.values('student_id').annotate(n=Count('skill_id')).filter(n=len(skill_ids))
+        return rows.values_list('student_id', flat=True)
+    return rows.values_list('student_id', flat=True).distinct()
+
+
+def skill_search(skills, limit=50):
+    """
+    Exact counts for a skill search: students per skill, students with any
+    and with all of them, and the first `limit` students having all of them.
+    """
+    names = skill_names(skills)
+    found = dict(Skill.objects.filter(normalized_name__in=names).values_list('skill_id', 'normalized_name'))
+    per_skill = dict.fromkeys(names.values(), 0)
+    for skill_id, n in (
+        StudentSkill.objects.filter(skill_id__in=found)
+        .values_list('skill_id').annotate(n=Count('student_id')).order_by()
+    ):
+        per_skill[names[found[skill_id]]] = n
+
+    with_all = student_ids_with_skills(names, match_all=True)
+    return {
+        'skills': list(names.values()),
+        'students_per_skill': per_skill,
+        'students_with_any': student_ids_with_skills(names).count(),
+        'students_with_all': with_all.count(),
+        'students': list(
+            Student.objects.filter(student_id__in=with_all).order_by('student_id')
+            .values('student_id', 'full_name')[:limit]
+        ),
+    }
+
+
+def top_skills(limit=20):
+    """The most common skills with their exact student counts."""
+    return [
+        {'skill': name, 'students': n}
+        for name, n in (
+            Skill.objects.annotate(n=Count('studentskill')).filter(n__gt=0)
+            .order_by('-n', 'skill_name').values_list('skill_name', 'n')[:limit]
+        )
+    ]
@@ -0,0 +1,116 @@
+# core/student_summary.py
+# Materialized student summaries (StudentSummary). Document saves / deletes
+# recount that one student's documents with a single GROUP BY, profile saves
+# copy the highlights over, and StudentSummaryView reads the row joined with
+# the student in one query. Rows are created on first read; the receivers
+# only update existing rows, so bulk-created students cost nothing until
+# someone looks at them.
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Document, Student, StudentProfile, StudentSummary
+
+# Document fields the summary depends on; saves touching only others are skipped
+SUMMARY_DOCUMENT_FIELDS = {'document_type', 'verification_status', 'student'}
+TOP_SKILLS = 10
+
+
+def _document_fields(student_id):
+    by_status, by_type = {}, {}
+    for document_type, verification_status, n in (
+        Document.objects.filter(student_id=student_id)
+        .values_list('document_type', 'verification_status')
+        .annotate(n=Count('document_id')).order_by()
+    ):
+        by_status[verification_status] = by_status.get(verification_status, 0) + n
+        by_type[document_type] = by_type.get(document_type, 0) + n
+    latest = (
+        Document.objects.filter(student_id=student_id).order_by('-document_id')
+        .values_list('document_id', 'document_type', 'verification_status').first()
+    ) or (None, None, None)
+    return {
+        'documents_total': sum(by_status.values()),
+        'documents_by_status': by_status,
+        'documents_by_type': by_type,
+        'latest_document_id': latest[0],
+        'latest_document_type': latest[1],
+        'latest_document_status': latest[2],
+    }
+
+
+def _profile_fields(profile):
+    skills = (profile.verified_skills if profile else None) or []
+    return {
+        'highest_percentage': profile.highest_percentage if profile else None,
+        'annual_income': profile.annual_income if profile else None,
+        'degrees': (profile.degrees if profile else None) or [],
+        'skills_count': len(skills),
+        'top_skills': skills[:TOP_SKILLS],
+    }
+
+
+def refresh_document_counts(student_id):
+    """Recounts one student's documents into their summary, if it exists."""
+    StudentSummary.objects.filter(student_id=student_id).update(
+        **_document_fields(student_id), updated_at=timezone.now()
+    )
+
+
+def refresh_profile_highlights(profile):
+    """Copies a saved profile's highlights into the student's summary, if it exists."""
+    StudentSummary.objects.filter(student_id=profile.student_id).update(
+        **_profile_fields(profile), updated_at=timezone.now()
+    )
+
+
+def build_student_summary(student_id):
+    """Computes and stores the whole summary row for one student."""
+    profile = StudentProfile.objects.filter(student_id=student_id).first()
+    StudentSummary.objects.update_or_create(
+        student_id=student_id,
+        defaults={**_document_fields(student_id), **_profile_fields(profile)},
+    )
+
+
+def get_student_summary(student_id):
+    """
+    Read path: the summary joined with its student, in one query. The first
+    read for a student builds the row. Raises Student.DoesNotExist.
+    """
+    summary = StudentSummary.objects.select_related('student').filter(student_id=student_id).first()
+    if summary is None:
+        if not Student.objects.filter(student_id=student_id).exists():
+            raise Student.DoesNotExist
+        build_student_summary(student_id)
+        summary = StudentSummary.objects.select_related('student').get(student_id=student_id)
+    return summary
+
+
+def summary_text(summary):
+    """The one-line summary StudentSummaryView returns."""
+    student = summary.student
+    text = f"Student {student.full_name} (ID: {student.student_id}) has {summary.documents_total} document(s). "
+    text += "Verification status: "
+    text += ", ".join(f"{n} {status}" for status, n in sorted(summary.documents_by_status.items()))
+    return text
+
+
+def summary_data(summary):
+    """The JSON-able view of a summary row."""
+    return {
+        'documents_total': summary.documents_total,
+        'documents_by_status': summary.documents_by_status,
+        'documents_by_type': summary.documents_by_type,
+        'latest_document': {
+            'document_id': summary.latest_document_id,
+            'document_type': summary.latest_document_type,
+            'verification_status': summary.latest_document_status,
+        } if summary.latest_document_id else None,
+        'highest_percentage': summary.highest_percentage,
+        'annual_income': summary.annual_income,
+        'degrees': summary.degrees,
+        'skills_count': summary.skills_count,
+        'top_skills': summary.top_skills,
+        'updated_at': summary.updated_at,
+    }
@@ -0,0 +1,139 @@
+# core/tasks.py
+# A small persistent task queue backed by the background_tasks table.
+# Producers call enqueue(); `python manage.py run_tasks` consumes the queue
+# with a pool of worker processes. Failed tasks are retried with exponential
+# backoff up to their max_attempts.
+
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BackgroundTask
+
+RETRY_BACKOFF_SECONDS = getattr(settings, 'TASK_RETRY_BACKOFF_SECONDS', 10)
+# A 'running' task not touched for this long is assumed to belong to a
+# crashed worker and counts as a failed attempt (see requeue_stale_tasks).
+STALE_RUNNING_SECONDS = getattr(settings, 'TASK_STALE_RUNNING_SECONDS', 15 * 60)
+
+# name -> callable(**payload)
+REGISTRY = {}
+# name -> callable(payload, error, will_retry)
+FAILURE_HOOKS = {}
+
+
+class PermanentTaskError(Exception):
+    """Raised by a task for failures that retrying cannot fix."""
+
+
+def register(name, on_failure=None):
+    """
+    Decorator that makes a function runnable as a background task.
+    `on_failure(payload, error, will_retry)` is called whenever a run fails.
+    """
+    def decorator(func):
+        REGISTRY[name] = func
+        if on_failure is not None:
+            FAILURE_HOOKS[name] = on_failure
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, unique=False, max_attempts=3):
+    """
+    Adds a task to the queue. With unique=True the task is skipped if an
+    identical one is already waiting (used for "drain everything" tasks).
+    The row is only visible to workers once the caller's transaction commits.
+    """
+    payload = payload or {}
+    if unique and BackgroundTask.objects.filter(name=name, payload=payload, status='queued').exists():
+        return None
+    return BackgroundTask.objects.create(name=name, payload=payload, max_attempts=max_attempts)
+
+
+def claim_next():
+    """Atomically moves the oldest due task to 'running' and returns it."""
+    with transaction.atomic():
+        task = (
+            BackgroundTask.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='queued', run_after__lte=timezone.now())
+            .order_by('run_after', 'task_id')
+            .first()
+        )
+        if task is None:
+            return None
+        task.status = 'running'
+        task.attempts += 1
+        task.save(update_fields=['status', 'attempts', 'updated_at'])
+    return task
+
+
+def run_task(task):
+    """Runs a claimed task and records the outcome (done / retry / failed)."""
+    func = REGISTRY.get(task.name)
+    try:
+        if func is None:
+            raise PermanentTaskError(f"No task registered under '{task.name}'")
+        func(**task.payload)
+        task.status = 'done'
+        task.last_error = None
+    except Exception as e:
+        will_retry = not isinstance(e, PermanentTaskError) and task.attempts < task.max_attempts
+        print(f"ERROR: Background task {task} failed (attempt {task.attempts}/{task.max_attempts}): {e}")
+        task.last_error = traceback.format_exc()
+        if will_retry:
+            task.status = 'queued'
+            task.run_after = timezone.now() + timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** (task.attempts - 1))
+        else:
+            task.status = 'failed'
+        hook = FAILURE_HOOKS.get(task.name)
+        if hook is not None:
+            try:
+                hook(task.payload, e, will_retry)
+            except Exception as hook_error:
+                print(f"ERROR: Failure hook for {task} raised: {hook_error}")
+    task.save(update_fields=['status', 'last_error', 'run_after', 'updated_at'])
+    return task
+
+
+def run_pending(limit=None):
+    """Drains the due tasks (or up to `limit`). Returns the number run."""
+    processed = 0
+    while limit is None or processed < limit:
+        task = claim_next()
+        if task is None:
+            break
+        run_task(task)
+        processed += 1
+    return processed
+
+
+def requeue_stale_tasks():
+    """
+    Handles tasks orphaned by a crashed worker like a failed attempt: they go
+    back on the queue (or fail once out of attempts) and their failure hook
+    runs, so e.g. their documents leave 'processing'. Returns how many.
+    """
+    cutoff = timezone.now() - timedelta(seconds=STALE_RUNNING_SECONDS)
+    error = RuntimeError("The worker running this task stopped before it finished")
+    handled = 0
+    for task in BackgroundTask.objects.filter(status='running', updated_at__lt=cutoff):
+        will_retry = task.attempts < task.max_attempts
+        # Conditional, so two run_tasks processes never handle the same task
+        updated = BackgroundTask.objects.filter(task_id=task.task_id, status='running', updated_at__lt=cutoff).update(
+            status='queued' if will_retry else 'failed', run_after=timezone.now(),
+            last_error=str(error), updated_at=timezone.now(),
+        )
+        if not updated:
+            continue
+        handled += 1
+        hook = FAILURE_HOOKS.get(task.name)
+        if hook is not None:
+            try:
+                hook(task.payload, error, will_retry)
+            except Exception as hook_error:
+                print(f"ERROR: Failure hook for stale {task} raised: {hook_error}")
+    return handled
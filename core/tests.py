@@ -1,3 +1,340 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+import numpy as np
+import scipy.sparse as sp
+from django.db import connection
+from django.db.models.functions import Lower
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from pypdf import PdfReader
+from rest_framework.test import APIClient
+
+from . import pdf_export
+from .batch_matching import match_matrices
+from .eligibility import BOOL_FIELDS, ScholarshipMatrix, attributes_from_values
+from .eligibility_query import indexes_used
+from .field_extraction import MIN_CONFIDENCE, extract_income
+from .models import BackgroundTask, Document, Student, StudentProfile
+from .tasks import STALE_RUNNING_SECONDS, requeue_stale_tasks
 
 # Create your tests here.
+
+PLAN_STUDENTS = 50000
+
+# Rows are generated in SQL so seeding takes seconds. Rust (1 in 200 students)
+# and M.Tech (1 in 100) are rare enough that an index beats a scan.
+PLAN_SEED_SQL = [
+    """
+    INSERT INTO students (full_name, email, password)
+    SELECT 'Plan Student ' || g, 'Plan' || g || '@EduVerify.test', '!'
+    FROM generate_series(1, %(students)s) AS g
+    """,
+    """
+    INSERT INTO core_studentprofile (student_id, highest_percentage, annual_income, degrees, verified_skills)
+    SELECT student_id, 40 + student_id %% 60, 50000 + (student_id %% 40) * 25000,
+           CASE WHEN student_id %% 100 = 0 THEN '["10th", "12th", "B.Tech", "M.Tech"]'
+                ELSE '["10th", "12th", "B.Tech"]' END::jsonb,
+           CASE WHEN student_id %% 200 = 0 THEN '["Python", "Rust"]'
+                ELSE '["Python", "SQL", "Git"]' END::jsonb
+    FROM students WHERE email LIKE '%%@EduVerify.test'
+    """,
+    """
+    INSERT INTO documents (student_id, document_type, verification_status, processing_status)
+    SELECT s.student_id,
+           (ARRAY['Resume', '10th Marksheet', '12th Marksheet', 'B.Tech Marksheet',
+                  'Income Certificate', 'Aadhar Card', 'PAN Card'])[1 + (s.student_id + k) %% 7],
+           (ARRAY['Verified', 'Verified', 'Verified', 'Verified', 'Verified', 'Verified',
+                  'Pending', 'Pending', 'Pending', 'Rejected'])[1 + (s.student_id * 3 + k) %% 10],
+           'skipped'
+    FROM students s CROSS JOIN generate_series(0, 2) AS k
+    WHERE s.email LIKE '%%@EduVerify.test'
+    """,
+]
+
+
+def plan_indexes(queryset):
+    """Names of the indexes PostgreSQL's plan for `queryset` scans."""
+    return indexes_used(json.loads(queryset.explain(format='json'))[0]['Plan'])
+
+
+@skipUnless(connection.vendor == 'postgresql', "Query plans are checked on PostgreSQL only.")
+class HotQueryIndexTests(TestCase):
+    """The hot query patterns use the indexes from migration 0013 on a large table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            for statement in PLAN_SEED_SQL:
+                cursor.execute(statement, {'students': PLAN_STUDENTS})
+            # What autovacuum does for a live table: move the rows just inserted
+            # out of the GIN pending lists, and refresh the planner statistics.
+            for index in ('studentprofile_skills_gin_idx', 'studentprofile_degrees_gin_idx'):
+                cursor.execute('SELECT gin_clean_pending_list(%s::regclass)', [index])
+            for table in ('students', 'core_studentprofile', 'documents'):
+                cursor.execute(f'ANALYZE {table}')
+        cls.student_id = Student.objects.get(email='Plan12345@EduVerify.test').student_id
+
+    def test_login_lookup_uses_lower_email_index(self):
+        # The lookup LoginView runs
+        students = Student.objects.alias(email_lower=Lower('email')).filter(email_lower='plan12345@eduverify.test')
+        self.assertIn('students_email_lower_idx', plan_indexes(students))
+        self.assertEqual(students.get().student_id, self.student_id)
+
+    def test_student_documents_by_status_use_composite_index(self):
+        documents = Document.objects.filter(student_id=self.student_id, verification_status='Verified')
+        self.assertIn('documents_student_status_idx', plan_indexes(documents))
+
+    def test_student_documents_use_composite_index_prefix(self):
+        self.assertIn('documents_student_status_idx', plan_indexes(Document.objects.filter(student_id=self.student_id)))
+
+    def test_type_and_status_filter_uses_composite_index(self):
+        documents = Document.objects.filter(document_type='PAN Card', verification_status='Rejected')
+        self.assertIn('documents_type_status_idx', plan_indexes(documents))
+
+    def test_skill_containment_uses_gin_index(self):
+        profiles = StudentProfile.objects.filter(verified_skills__contains=['Rust'])
+        self.assertIn('studentprofile_skills_gin_idx', plan_indexes(profiles))
+        self.assertEqual(profiles.count(), PLAN_STUDENTS // 200)
+
+    def test_degree_containment_uses_gin_index(self):
+        profiles = StudentProfile.objects.filter(degrees__contains=['M.Tech'])
+        self.assertIn('studentprofile_degrees_gin_idx', plan_indexes(profiles))
+        self.assertEqual(profiles.count(), PLAN_STUDENTS // 100)
+
+
+class LoginEmailTests(TestCase):
+
+    def test_login_email_is_case_insensitive(self):
+        Student.objects.create(full_name='Case Test', email='Case.Test@EduVerify.test', password='secret')
+        response = APIClient().post('/api/login/', {'email': 'case.test@eduverify.TEST', 'password': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+
+
+class ProfileMergeTests(TestCase):
+
+    def test_parsed_fields_merge_into_profile(self):
+        from query_analyzer import apply_parsed_fields, apply_parsed_fields_batch
+        student = Student.objects.create(full_name='Merge Test', email='merge@EduVerify.test', password='!')
+        other = Student.objects.create(full_name='Merge Other', email='other@EduVerify.test', password='!')
+        apply_parsed_fields(student, {'percentage': '71.5', 'degrees': ['10th'], 'skills': ['Python', 'SQL']})
+        apply_parsed_fields_batch([
+            (student, {'percentage': 60, 'income': 120000, 'degrees': ['10th', '12th'], 'skills': ['SQL', 'Git']}),
+            (other, {'skills': ['Rust']}),
+        ])
+        profile = StudentProfile.objects.get(student=student)
+        self.assertEqual(profile.highest_percentage, 71.5)
+        self.assertEqual(profile.annual_income, 120000)
+        self.assertEqual(profile.degrees, ['10th', '12th'])
+        self.assertEqual(profile.verified_skills, ['Python', 'SQL', 'Git'])
+        self.assertEqual(student.studentskill_set.count(), 3)
+        self.assertEqual(StudentProfile.objects.get(student=other).verified_skills, ['Rust'])
+
+
+class IncomeExtractionTests(SimpleTestCase):
+
+    def test_years_after_the_label_are_not_the_income(self):
+        cases = {
+            'Annual Income of the family for the financial year 2023-24 is Rs. 1,20,000 per annum': 120000,
+            'This is to certify that the annual income of Shri X for 2022 is Rs 2,50,000/-': 250000,
+            'Annual Family Income (FY 2022-2023): Rs. 3.5 Lakhs': 350000,
+        }
+        for text, income in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(extract_income(text), (income, 0.9))
+
+    def test_unmarked_amount_is_left_to_the_llm(self):
+        value, confidence = extract_income('Annual income for 2021: 85000')
+        self.assertEqual(value, 85000)
+        self.assertLess(confidence, MIN_CONFIDENCE)
+
+
+class ScholarshipMatchTests(SimpleTestCase):
+
+    def test_batched_match_agrees_with_mask_for(self):
+        base = {'scholarship_name': 'Merit', 'amount': None, 'income_min': None, 'income_max': None,
+                'percentage_min': None, 'percentage_max': None, 'education_level': None, 'gender': None,
+                'community': None, 'religion': None, **{field: None for field in BOOL_FIELDS}}
+        matrix = ScholarshipMatrix([
+            {**base, 'scholarship_id': 1, 'gender': 'Female', 'income_max': 250000},
+            {**base, 'scholarship_id': 2, 'community': 'SC/ST', 'percentage_min': 60.0, 'disability': True},
+        ])
+        students = [
+            attributes_from_values({'gender': 'f', 'community': 'obc'}, 300000, 70.0, []),
+            attributes_from_values({'gender': 'F'}, 200000, None, []),
+            attributes_from_values({'community': 'sc', 'disability': 'Yes'}, None, 65.0, ['B.Tech']),
+            attributes_from_values({'gender': 'm', 'community': 'sc', 'disability': 'No'}, None, 65.0, ['B.Tech']),
+            attributes_from_values(None, None, None, None),
+        ]
+        expected = [bool(matrix.mask_for(attributes).any()) for attributes in students]
+        self.assertEqual(expected, [False, True, True, False, True])
+        self.assertEqual(matrix.any_match(students).tolist(), expected)
+
+
+class EligibleScholarshipsLimitTests(TestCase):
+
+    def test_limit_outside_the_allowed_range_is_rejected(self):
+        client = APIClient()
+        client.force_authenticate(Student.objects.create(full_name='Limit Test', email='limit@EduVerify.test', password='!'))
+        for limit in ('0', '-5', '501', 'abc'):
+            with self.subTest(limit=limit):
+                self.assertEqual(client.get(f'/api/scholarships/eligible/?limit={limit}').status_code, 400)
+        self.assertEqual(client.get('/api/scholarships/eligible/?limit=5').status_code, 200)
+
+
+class StaleTaskTests(TestCase):
+    """Tasks of a crashed worker release their documents from 'processing'."""
+
+    def setUp(self):
+        student = Student.objects.create(full_name='Stale Test', email='stale@EduVerify.test', password='!')
+        self.document = Document.objects.create(student=student, document_type='Resume', processing_status='processing')
+
+    def _orphan(self, name, payload, max_attempts):
+        task = BackgroundTask.objects.create(name=name, payload=payload, status='running', attempts=1,
+                                             max_attempts=max_attempts)
+        stale = timezone.now() - timedelta(seconds=STALE_RUNNING_SECONDS + 60)
+        BackgroundTask.objects.filter(task_id=task.task_id).update(updated_at=stale)
+        self.assertEqual(requeue_stale_tasks(), 1)
+        self.document.refresh_from_db()
+        task.refresh_from_db()
+        return task
+
+    def test_stale_document_task_is_retried(self):
+        task = self._orphan('process_document', {'document_id': self.document.document_id}, 3)
+        self.assertEqual(task.status, 'queued')
+        self.assertEqual(self.document.processing_status, 'queued')
+
+    def test_stale_batch_falls_back_to_single_document_tasks(self):
+        task = self._orphan('process_document_batch', {'document_ids': [self.document.document_id]}, 1)
+        self.assertEqual(task.status, 'failed')
+        self.assertEqual(self.document.processing_status, 'queued')
+        self.assertTrue(BackgroundTask.objects.filter(
+            name='process_document', payload={'document_id': self.document.document_id}, status='queued'
+        ).exists())
+
+
+class JobMatchingAnalyticsTests(TestCase):
+    """The analytics views serve the stored report and never run the matcher in the request."""
+
+    def test_missing_report_is_queued_not_computed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().get('/api/analytics/job-matching/')
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(BackgroundTask.objects.filter(name='build_match_report', status='queued').exists())
+
+    def test_bad_parameters_are_rejected(self):
+        for url in ('/api/analytics/job-matching/?min_coverage=0.33', '/api/analytics/job-matching/?min_jobs=-1',
+                    '/api/analytics/skill-gaps/?limit=-1'):
+            with self.subTest(url=url):
+                self.assertEqual(APIClient().get(url).status_code, 400)
+
+
+    def test_students_lacking_a_one_skill_job_are_near_misses(self):
+        S = sp.csr_matrix(np.array([[1, 0], [0, 1], [0, 0]], dtype=np.int32)) # python / sql / nothing
+        J = sp.csr_matrix(np.array([[1, 0]], dtype=np.int32)) # one job asking for python
+        report = match_matrices(np.arange(3), np.arange(1), ['python', 'sql'], S, J, workers=1)
+        self.assertEqual(report['top_jobs'], [{'job_id': 0, 'qualified_students': 1}])
+        self.assertEqual(report['skill_gaps'], [{'skill': 'python', 'students_blocked': 2, 'near_miss_pairs': 2}])
+
+
+class DashboardParameterTests(TestCase):
+
+    def test_bad_filters_and_cursors_are_rejected(self):
+        bad_cursor = base64.urlsafe_b64encode(json.dumps(['2024-13-45', 1]).encode()).decode()
+        for url in ('/portal/dashboard/counts/?student_id=abc', '/portal/dashboard/?student_id=99999999999',
+                    f'/portal/dashboard/?documents_cursor={bad_cursor}', '/portal/dashboard/?students_cursor=e30='):
+            with self.subTest(url=url):
+                self.assertEqual(APIClient().get(url).status_code, 400)
+
+    def test_cursor_pages_cover_every_student(self):
+        for i in range(5):
+            Student.objects.create(full_name=f'Page {i}', email=f'page{i}@EduVerify.test', password='!')
+        seen, cursor = [], None
+        while True:
+            url = '/portal/dashboard/?include=students&limit=2' + (f'&students_cursor={cursor}' if cursor else '')
+            response = APIClient().get(url).json()
+            seen += [student['student_id'] for student in response['students']]
+            cursor = response['next']['students']
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(APIClient().get('/portal/dashboard/counts/').json()['students'], 5)
+
+
+class ExportCacheTests(TestCase):
+    """Stamped export copies do not outlive their documents."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        patcher = mock.patch('core.pdf_export.EXPORT_CACHE_DIR', self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _cached(self, content_hash, status):
+        path = pdf_export._cache_path(content_hash, status)
+        open(path, 'wb').close()
+        return path
+
+    def test_copies_are_deleted_with_the_document_and_its_old_status(self):
+        student = Student.objects.create(full_name='Export Test', email='export@EduVerify.test', password='!')
+        document = Document.objects.create(student=student, document_type='PAN Card', content_hash='ab' * 32)
+        pending = self._cached(document.content_hash, 'Pending')
+        with self.captureOnCommitCallbacks(execute=True):
+            document.verification_status = 'Verified'
+            document.save(update_fields=['verification_status'])
+        self.assertFalse(os.path.exists(pending))
+
+        verified = self._cached(document.content_hash, 'Verified')
+        with self.captureOnCommitCallbacks(execute=True):
+            student.delete()
+        self.assertFalse(os.path.exists(verified))
+
+    def test_unused_copies_are_pruned(self):
+        old, recent = self._cached('cd' * 32, 'Pending'), self._cached('ef' * 32, 'Pending')
+        os.utime(old, (0, 0))
+        self.assertEqual(pdf_export.prune_export_cache(), 1)
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(recent)])
+
+
+class BundleTests(SimpleTestCase):
+
+    def test_source_failing_mid_serialization_leaves_a_valid_pdf(self):
+        def reader_for(source):
+            if source != 'broken':
+                return PdfReader(source)
+            reader = PdfReader(pdf_export.error_page('Broken', 'never exported'))
+            readable = {page.indirect_reference.idnum for page in reader.pages}
+            readable.add(reader.trailer.raw_get('/Root').idnum)
+            get_object = reader.get_object
+
+            def failing_get_object(ref):
+                # The page itself is written, then one of the objects it references fails
+                if ref.idnum not in readable:
+                    raise ValueError('corrupt object')
+                return get_object(ref)
+            reader.get_object = failing_get_object
+            return reader
+
+        documents = [SimpleNamespace(document_type=name, uploaded_file=SimpleNamespace(name=name))
+                     for name in ('good', 'broken')]
+        with mock.patch('core.pdf_export.stamped_document_path', lambda doc: doc.uploaded_file.name), \
+             mock.patch('core.pdf_export.PdfReader', reader_for):
+            # 'good' is read from an error page too, so no file on disk is needed
+            documents[0].uploaded_file.name = pdf_export.error_page('Good', 'exported')
+            output = io.BytesIO()
+            pdf_export.build_document_bundle(documents, output)
+
+        bundle = PdfReader(io.BytesIO(output.getvalue()), strict=True)
+        texts = [page.extract_text() for page in bundle.pages]
+        self.assertEqual(len(texts), 2)
+        self.assertIn('Good', texts[0])
+        self.assertIn('Error processing file: broken', texts[1])
@@ -2,13 +2,22 @@
 
 from django.urls import path
 from .views import DocumentListView
-from .views import FederatedQueryView , StudentListView , RegisterView , LoginView , DocumentUploadView , GeneratePDFView , AdminDashboardView , StudentSummaryView , AdminChatView , RecommendedJobsView
+from .views import FederatedQueryView , StudentListView , RegisterView , LoginView , DocumentUploadView , GeneratePDFView , AdminDashboardView , StudentSummaryView , AdminChatView , RecommendedJobsView , EligibleScholarshipsView
+from .views import JobMatchingAnalyticsView , SkillGapAnalyticsView , VerifiedEligibilityView , StudentEligibilityView , DocumentStatusView , ExtractionStatsView , BulkDocumentUploadView
+from .views import ExportJobStatusView , ExportJobDownloadView , AdminDashboardCountsView , AdminStatsView , SkillSearchView
 
 urlpatterns = [
 
     path('dashboard/', AdminDashboardView.as_view(), name='admin-dashboard'),
+    path('dashboard/counts/', AdminDashboardCountsView.as_view(), name='admin-dashboard-counts'),
     path('summary/<int:student_id>/', StudentSummaryView.as_view(), name='admin-student-summary'),
+    path('eligibility/<int:student_id>/', StudentEligibilityView.as_view(), name='admin-student-eligibility'),
     path('chat/', AdminChatView.as_view(), name='admin-chat'),
+    path('analytics/job-matching/', JobMatchingAnalyticsView.as_view(), name='admin-job-matching'),
+    path('analytics/skill-gaps/', SkillGapAnalyticsView.as_view(), name='admin-skill-gaps'),
+    path('analytics/skills/', SkillSearchView.as_view(), name='admin-skill-search'),
+    path('analytics/stats/', AdminStatsView.as_view(), name='admin-stats'),
+    path('analytics/extraction/', ExtractionStatsView.as_view(), name='admin-extraction-stats'),
 
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
@@ -19,7 +28,13 @@ urlpatterns = [
     path('federated-query/', FederatedQueryView.as_view(), name='federated-query'),
 
     path('documents/upload/', DocumentUploadView.as_view(), name='document-upload'),
+    path('documents/bulk-upload/', BulkDocumentUploadView.as_view(), name='document-bulk-upload'),
+    path('documents/<int:document_id>/status/', DocumentStatusView.as_view(), name='document-status'),
 
     path('generate-pdf/', GeneratePDFView.as_view(), name='generate-pdf'),
+    path('exports/<uuid:job_id>/', ExportJobStatusView.as_view(), name='export-status'),
+    path('exports/<uuid:job_id>/download/', ExportJobDownloadView.as_view(), name='export-download'),
     path('jobs/recommended/', RecommendedJobsView.as_view(), name='recommended-jobs'),
+    path('scholarships/eligible/', EligibleScholarshipsView.as_view(), name='eligible-scholarships'),
+    path('eligibility/', VerifiedEligibilityView.as_view(), name='verified-eligibility'),
 ]
@@ -1,4 +1,5 @@
 import os
+import time
 import PyPDF2
 import pytesseract
 from PIL import Image
@@ -8,7 +9,7 @@ import json
 import os
 import shutil
 # --- NEW IMPORT ---
-from pdf2image import convert_from_path
+from .ocr import ocr_image, ocr_pdf_pages, page_needs_ocr
 
 PARTNER_IP = "192.168.52.109" # Ensure this matches your settings
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -22,48 +23,73 @@ if not shutil.which("tesseract"):
     print("="*50)
 
 # --- REPLACED FUNCTION ---
-def extract_text_from_file(file_path):
+def extract_text_from_file(file_path, report=None):
     """
     Extracts text from an uploaded PDF (digital or scanned) or Image file.
+    If a `report` dict is passed it is filled with the path taken per page
+    and its timing (used by `manage.py benchmark_extraction`).
     """
     print(f"--- Extracting text from: {file_path} ---")
     full_path = os.path.join(settings.MEDIA_ROOT, file_path)
     file_extension = os.path.splitext(full_path)[1].lower()
     
     text = ""
+    report = {} if report is None else report
+    report['pages'] = []
     try:
         if file_extension == '.pdf':
             # --- UPDATED PDF LOGIC ---
-            
-            # 1. First, try to extract digital text
+            # Decided page by page: digital text where the page has a usable
+            # text layer, OCR only for the pages that don't (scans, junk).
+
+            # 1. First, try to extract digital text from every page
+            page_texts, page_seconds, ocr_seconds = {}, {}, {}
             try:
                 with open(full_path, 'rb') as f:
                     pdf_reader = PyPDF2.PdfReader(f)
-                    for page in pdf_reader.pages:
-                        text += page.extract_text()
-                print("Successfully extracted digital text from PDF.")
+                    for number, page in enumerate(pdf_reader.pages, start=1):
+                        started = time.perf_counter()
+                        try:
+                            page_texts[number] = page.extract_text() or ""
+                        except Exception as e:
+                            print(f"PyPDF2 error on page {number}: {e}. Will OCR it.")
+                            page_texts[number] = ""
+                        page_seconds[number] = time.perf_counter() - started
             except Exception as e:
                 print(f"PyPDF2 error: {e}. Assuming scanned PDF.")
-                text = "" # Ensure text is empty if PyPDF2 fails
+                page_texts, page_seconds = {}, {} # OCR the whole document below
+
+            # 2. OCR the pages without a usable text layer (all of them if
+            #    the PDF could not be parsed at all)
+            ocr_pages = [n for n, page_text in page_texts.items() if page_needs_ocr(page_text)]
+            digital_pages = len(page_texts) - len(ocr_pages)
+            if ocr_pages or not page_texts:
+                print(f"{len(ocr_pages) or 'All'} page(s) without digital text. Attempting OCR...")
+                # Render + OCR pages in parallel, a bounded window at a time
+                # (see core/ocr.py for the DPI / worker settings)
+                page_texts.update(ocr_pdf_pages(full_path, page_numbers=ocr_pages or None, timings=ocr_seconds))
+            print(f"Extracted text from {len(page_texts)} page(s), {digital_pages} digital.")
+
+            for n in sorted(page_texts):
+                ocr = n in ocr_seconds
+                report['pages'].append({
+                    'page': n,
+                    'path': 'ocr' if ocr else 'digital',
+                    # An OCR'd page also paid for the text-layer attempt
+                    'seconds': round(page_seconds.get(n, 0.0) + ocr_seconds.get(n, 0.0), 4),
+                    'characters': len(page_texts[n]),
+                })
 
-            # 2. If no digital text was found, use OCR
-            if not text.strip():
-                print("No digital text found. Attempting OCR on PDF...")
-                
-                # Convert PDF pages to a list of PIL Images
-                # You may need to provide the poppler_path if not in PATH
-                # images = convert_from_path(full_path, poppler_path=r'C:\path\to\poppler\bin')
-                images = convert_from_path(full_path)
-                
-                # Run Tesseract OCR on each image
-                for img in images:
-                    text += pytesseract.image_to_string(img)
-                print("Successfully extracted text from scanned PDF using OCR.")
+            # 3. Merge the page texts in page order
+            text = "\n".join(page_texts[n] for n in sorted(page_texts))
             
         elif file_extension in ['.png', '.jpg', '.jpeg', '.tiff']:
-            # --- (This image logic is unchanged) ---
-            image = Image.open(full_path)
-            text = pytesseract.image_to_string(image)
+            # Photos are downsampled / binarized / deskewed first (core/ocr.py)
+            started = time.perf_counter()
+            with Image.open(full_path) as image:
+                text = ocr_image(image)
+            report['pages'].append({'page': 1, 'path': 'ocr', 'seconds': round(time.perf_counter() - started, 4),
+                                    'characters': len(text)})
             print("Successfully extracted text from Image (OCR).")
         
         else:
@@ -2,31 +2,40 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated # Import permissions
-from .models import Document, Student, GovtJob
+from .models import Document, Student, GovtJob, ExportJob
 from rest_framework.permissions import AllowAny, IsAuthenticated 
 from rest_framework.parsers import MultiPartParser, FormParser
 from .serializers import DocumentSerializer, StudentSerializer , DocumentUploadSerializer, StudentRegistrationSerializer
-from .utils import extract_text_from_file , get_recommended_jobs_from_llm
+from .serializers import DOCUMENT_VALUES, STUDENT_VALUES
+from .document_processing import queue_document, queue_documents
+from .eligibility import MAX_ELIGIBLE_LIMIT, get_student_attributes, find_eligible_scholarships
+from .recommendations import get_recommendations
+from .batch_matching import get_match_report, students_with_at_least, DEFAULT_MIN_COVERAGE, MIN_COVERAGE_CHOICES
+from .eligibility_query import get_verified_eligibility
+from .field_extraction import extraction_bypass_stats
+from .admin_stats import get_admin_stats
+from .skills import MAX_SKILL_SEARCH_LIMIT, skill_search, top_skills
+from .student_summary import get_student_summary, summary_data, summary_text
+from .pdf_export import build_document_bundle, file_response, stream_document_zip
+from .export_jobs import EXPORT_CONTENT_TYPES, export_job_status, request_export
+from .dashboard import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, dashboard_counts, document_page, parse_fields, student_page
 import os
 from .models import StudentProfile
 
 from django.conf import settings
-from PIL import Image # <-- ADD THIS
-from pypdf import PdfWriter, PdfReader # <-- ADD THIS
-from reportlab.lib.utils import ImageReader as ReportLabImageReader # <-- ADD THIS
-from reportlab.lib.colors import green, red, black # <-- ADD THIS
 
 # Import the correct function from your query_analyzer
 from query_analyzer import analyze_query_for_tools, execute_tool_plan, get_synthesized_answer
 
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import tokens_for_student
 from django.db.models import Q # Import for complex lookups
+from django.db.models.functions import Lower
+from django.db import transaction
+from django.utils import timezone
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
 
-import io
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
+import tempfile
+from django.http import StreamingHttpResponse
 
 
 class RegisterView(APIView):
@@ -37,7 +46,7 @@ class RegisterView(APIView):
         if serializer.is_valid():
             user = serializer.save()
             # Manually create tokens for the new user
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_student(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -56,9 +65,10 @@ class LoginView(APIView):
         if not email or not password:
             return Response({'error': 'Email and password are required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Find the student by email (case-insensitive)
+        # Find the student by email (case-insensitive). Lower() rather than
+        # __iexact (UPPER() on PostgreSQL) so students_email_lower_idx applies.
         try:
-            student = Student.objects.get(Q(email__iexact=email))
+            student = Student.objects.alias(email_lower=Lower('email')).get(email_lower=email.lower())
         except Student.DoesNotExist:
             return Response({'error': 'Invalid credentials.'}, status=status.HTTP_401_UNAUTHORIZED)
         
@@ -67,7 +77,7 @@ class LoginView(APIView):
             return Response({'error': 'Invalid credentials.'}, status=status.HTTP_401_UNAUTHORIZED)
 
         # Generate tokens
-        refresh = RefreshToken.for_user(student)
+        refresh = tokens_for_student(student)
         return Response({
             'refresh': str(refresh),
             'access': str(refresh.access_token),
@@ -84,8 +94,7 @@ class StudentListView(APIView):
     
     def get(self, request, format=None):
         students = Student.objects.all().order_by('full_name')
-        serializer = StudentSerializer(students, many=True)
-        return Response(serializer.data)
+        return Response(STUDENT_VALUES.serialize(students))
 
 
 class DocumentListView(APIView):
@@ -95,8 +104,7 @@ class DocumentListView(APIView):
     def get(self, request, format=None):
         # --- NEW: Only get documents for the logged-in user ---
         documents = Document.objects.filter(student=request.user)
-        serializer = DocumentSerializer(documents, many=True)
-        return Response(serializer.data)
+        return Response(DOCUMENT_VALUES.serialize(documents))
     
 class DocumentUploadView(APIView):
     permission_classes = [IsAuthenticated] # This now works
@@ -109,43 +117,80 @@ class DocumentUploadView(APIView):
         serializer = DocumentUploadSerializer(data=request.data, context={'request': request})
         
         if serializer.is_valid():
-            document = serializer.save()
-            
-            if document.uploaded_file:
-                # --- NEW LOGIC ---
-                HIGH_VALUE_DOCS = [
-                    'Resume', '10th Marksheet', '12th Marksheet', 
-                    'B.Tech Marksheet', 'Income Certificate'
-                ]
-        
-                if document.document_type in HIGH_VALUE_DOCS:
-                    print(f"High-value document '{document.document_type}' detected. Running extraction...")
-        
-                    # 1. Extract raw text (uses your existing utils.py)
-                    extracted_text = extract_text_from_file(document.uploaded_file.name)
-        
-                    if not extracted_text or extracted_text.startswith("Error"):
-                        document.extracted_text = extracted_text or "No text found."
-                    else:
-                        document.extracted_text = extracted_text
-        
-                        # 2. Parse text AND update the profile (ETL)
-                        from query_analyzer import update_profile_from_text # We will create this
-                        update_profile_from_text(request.user, document.document_type, extracted_text)
-        
-                else:
-                    # This is a low-value doc like Aadhar. We don't extract text.
-                    print(f"Low-value document '{document.document_type}'. Skipping text extraction.")
-                    document.extracted_text = "Text extraction not required for this document type."
-        
-                document.save()
-                # --- END OF REPLACEMENT ---
-        
-            return Response(DocumentSerializer(document).data, status=status.HTTP_201_CREATED)
+            with transaction.atomic():
+                document = serializer.save()
+                # Extraction + profile ETL run in the background worker
+                # (python manage.py run_tasks); poll documents/<id>/status/.
+                queue_document(document)
+
+            return Response(DocumentSerializer(document).data, status=status.HTTP_202_ACCEPTED)
         print(f"Serializer errors: {serializer.errors}")
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkDocumentUploadView(APIView):
+    """
+    Uploads several documents in one multipart request: repeated `files`
+    parts with a matching, same-order list of `document_types`. The
+    high-value ones are processed together in the background, in parallel,
+    with a single profile update at the end.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+    MAX_FILES = 10
+
+    def post(self, request, format=None):
+        # Stream every part straight to a temp file instead of buffering small ones in memory
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+
+        files = request.FILES.getlist('files')
+        document_types = request.data.getlist('document_types')
+        if not files:
+            return Response({"error": "No files provided."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(files) != len(document_types):
+            return Response({"error": "Provide one document_types entry per file, in the same order."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(files) > self.MAX_FILES:
+            return Response({"error": f"At most {self.MAX_FILES} files per request."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        upload_serializers = [
+            DocumentUploadSerializer(data={'document_type': document_type, 'uploaded_file': uploaded_file},
+                                     context={'request': request})
+            for uploaded_file, document_type in zip(files, document_types)
+        ]
+        errors = {index: s.errors for index, s in enumerate(upload_serializers) if not s.is_valid()}
+        if errors:
+            return Response({"error": "Invalid files.", "files": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        print(f"Bulk upload of {len(files)} document(s) for user: {request.user.full_name}")
+        with transaction.atomic():
+            documents = queue_documents([s.save() for s in upload_serializers])
+
+        return Response(DocumentSerializer(documents, many=True).data, status=status.HTTP_202_ACCEPTED)
+
+
+class DocumentStatusView(APIView):
+    """
+    Lets a student poll the background processing of one of their uploads.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, document_id, format=None):
+        try:
+            document = Document.objects.only(
+                'document_id', 'document_type', 'processing_status', 'processing_error'
+            ).get(document_id=document_id, student=request.user)
+        except Document.DoesNotExist:
+            return Response({"error": "Document not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'document_id': document.document_id,
+            'document_type': document.document_type,
+            'processing_status': document.processing_status,
+            'processing_error': document.processing_error,
+        })
+
 
 class FederatedQueryView(APIView):
     permission_classes = [IsAuthenticated]
@@ -172,35 +217,25 @@ class GeneratePDFView(APIView):
     """
     Generates a combined PDF from a list of a student's documents.
     This new version merges actual PDFs and Images, stamping them
-    with their verification status.
+    with their verification status. Stamped pages are cached per file
+    content and status (see core/pdf_export.py).
+
+    "format": "pdf" (default) is spooled to a temp file and served with
+    Range support; "zip" (one PDF per document) is streamed as it is built.
+    With "async": true the bundle is built in the background instead and a
+    job handle is returned (see ExportJobStatusView).
     """
     permission_classes = [IsAuthenticated]
-
-    def _create_stamp_page(self, text, status):
-        """Helper function to create an in-memory PDF page with a stamp."""
-        stamp_buffer = io.BytesIO()
-        stamp_canvas = canvas.Canvas(stamp_buffer, pagesize=letter)
-        
-        # Set font and color
-        stamp_canvas.setFont("Helvetica-Bold", 12)
-        if status == 'Verified':
-            stamp_canvas.setFillColor(green)
-        elif status == 'Rejected':
-            stamp_canvas.setFillColor(red)
-        else:
-            stamp_canvas.setFillColor(black) # Pending or other
-
-        # Draw the text at the top-left corner
-        stamp_canvas.drawString(0.75 * inch, letter[1] - (0.75 * inch), f"STATUS: {text.upper()}")
-        stamp_canvas.save()
-        stamp_buffer.seek(0)
-        return PdfReader(stamp_buffer).pages[0]
+    EXPORT_FORMATS = ['pdf', 'zip']
 
     def post(self, request, format=None):
         document_ids = request.data.get('document_ids')
+        export_format = request.data.get('format', 'pdf')
 
         if not document_ids or not isinstance(document_ids, list):
             return Response({"error": "A list of 'document_ids' is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if export_format not in self.EXPORT_FORMATS:
+            return Response({"error": f"'format' must be one of {self.EXPORT_FORMATS}."}, status=status.HTTP_400_BAD_REQUEST)
 
         # 1. Fetch only documents that belong to the authenticated user
         docs_to_export = Document.objects.filter(
@@ -211,161 +246,226 @@ class GeneratePDFView(APIView):
         if not docs_to_export.exists():
             return Response({"error": "No valid documents found for this user."}, status=status.HTTP_404_NOT_FOUND)
 
-        # 2. Create the output PDF in memory
-        output_pdf_writer = PdfWriter()
-        
-        for doc in docs_to_export:
-            # 3. Create the appropriate stamp for this document
-            stamp_page = self._create_stamp_page(doc.verification_status, doc.verification_status)
-            
-            # 4. Get the full path to the uploaded file
-            if not doc.uploaded_file:
-                continue # Skip if there's no file
-                
-            file_path = os.path.join(settings.MEDIA_ROOT, doc.uploaded_file.name)
-            if not os.path.exists(file_path):
-                continue # Skip if file is missing
-
-            file_ext = os.path.splitext(file_path)[1].lower()
-
-            try:
-                # --- 5A. If the file is a PDF ---
-                if file_ext == '.pdf':
-                    pdf_reader = PdfReader(file_path)
-                    for page in pdf_reader.pages:
-                        # Add the stamp to the original page
-                        page.merge_page(stamp_page) 
-                        output_pdf_writer.add_page(page)
-                
-                # --- 5B. If the file is an Image ---
-                elif file_ext in ['.png', '.jpg', '.jpeg']:
-                    # Open the image to get its dimensions
-                    img = Image.open(file_path)
-                    img_width, img_height = img.size
-                    img.close()
-                    
-                    # Create a new PDF page with the image's dimensions
-                    page_buffer = io.BytesIO()
-                    img_canvas = canvas.Canvas(page_buffer, pagesize=(img_width, img_height))
-                    
-                    # Draw the image on the page
-                    img_canvas.drawImage(ReportLabImageReader(file_path), 0, 0, width=img_width, height=img_height)
-                    img_canvas.save()
-                    page_buffer.seek(0)
-                    
-                    # Merge the stamp with the new image-page
-                    image_pdf_page = PdfReader(page_buffer).pages[0]
-                    image_pdf_page.merge_page(stamp_page)
-                    output_pdf_writer.add_page(image_pdf_page)
-
-            except Exception as e:
-                print(f"Error processing file {file_path}: {e}")
-                # Create a simple error page and add it to the PDF
-                error_buffer = io.BytesIO()
-                error_canvas = canvas.Canvas(error_buffer, pagesize=letter)
-                error_canvas.drawString(1 * inch, 10 * inch, f"Error processing file: {doc.document_type}")
-                error_canvas.drawString(1 * inch, 9.5 * inch, str(e))
-                error_canvas.save()
-                error_buffer.seek(0)
-                output_pdf_writer.add_page(PdfReader(error_buffer).pages[0])
-
-        # 6. Save the final merged PDF to a buffer
-        final_buffer = io.BytesIO()
-        output_pdf_writer.write(final_buffer)
-        final_buffer.seek(0)
-
-        # 7. Create and return the HTTP response
-        response = HttpResponse(
-            final_buffer,
-            content_type='application/pdf'
-        )
-        response['Content-Disposition'] = 'attachment; filename="EduVerify_Documents.pdf"'
-        return response
+        if request.data.get('async'):
+            job, reused = request_export(request.user, document_ids, export_format)
+            return Response({**export_job_status(job), 'reused': reused}, status=status.HTTP_202_ACCEPTED)
+
+        # 2. ZIP: stream each stamped document as soon as it is ready
+        if export_format == 'zip':
+            response = StreamingHttpResponse(stream_document_zip(docs_to_export), content_type='application/zip')
+            response['Content-Disposition'] = 'attachment; filename="EduVerify_Documents.zip"'
+            return response
+
+        # 3. PDF: stamp (or reuse the cached stamped pages of) each document into a
+        # temp file, deleted when the response is closed
+        spool = tempfile.TemporaryFile()
+        try:
+            build_document_bundle(docs_to_export, spool)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return file_response(request, spool, 'EduVerify_Documents.pdf', 'application/pdf')
     
 
+class ExportJobStatusView(APIView):
+    """
+    Lets a student poll an asynchronous export (GeneratePDFView with "async").
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id, format=None):
+        try:
+            job = ExportJob.objects.get(job_id=job_id, student=request.user)
+        except ExportJob.DoesNotExist:
+            return Response({"error": "Export not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(export_job_status(job))
+
+
+class ExportJobDownloadView(APIView):
+    """Serves the finished file of an asynchronous export, with Range support."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id, format=None):
+        try:
+            job = ExportJob.objects.get(job_id=job_id, student=request.user)
+        except ExportJob.DoesNotExist:
+            return Response({"error": "Export not found."}, status=status.HTTP_404_NOT_FOUND)
+        if job.status != 'done':
+            return Response({"error": f"Export is {job.status}."}, status=status.HTTP_409_CONFLICT)
+        if job.expires_at <= timezone.now() or not os.path.exists(job.file_path):
+            return Response({"error": "Export has expired."}, status=status.HTTP_410_GONE)
+
+        return file_response(request, open(job.file_path, 'rb'), f"EduVerify_Documents.{job.export_format}",
+                             EXPORT_CONTENT_TYPES[job.export_format])
+
+
 class RecommendedJobsView(APIView):
+    """
+    Serves the student's materialized job recommendations.
+    The ranking is kept fresh in the background (core/recommendations.py),
+    so this is a single primary-key lookup.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        recommendation = get_recommendations(request.user)
+        return Response(recommendation.jobs, status=status.HTTP_200_OK)
+
+
+class EligibleScholarshipsView(APIView):
+    """
+    Returns every scholarship the logged-in student is eligible for,
+    filtered by the typed eligibility engine (no LLM involved).
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, format=None):
         student = request.user
-        
-        # 1. Get the Student's Profile
+        profile = StudentProfile.objects.filter(student=student).first()
+        attributes = get_student_attributes(student, profile)
+
+        limit = request.query_params.get('limit')
         try:
-            profile = StudentProfile.objects.get(student=student)
-            student_data = {
-                "degrees": profile.degrees,
-                "highest_percentage": profile.highest_percentage,
-                "skills": profile.verified_skills
-            }
-        except StudentProfile.DoesNotExist:
-            return Response(
-                {"error": "Profile not found. Please upload documents first."}, 
-                status=status.HTTP_404_NOT_FOUND
-            )
-
-        # 2. Call the LLM to fetch and filter jobs
-        # This function will handle fetching from Partner API + LLM Filtering
-        recommended_jobs = get_recommended_jobs_from_llm(student_data)
-        
-        if "error" in recommended_jobs:
-             return Response(recommended_jobs, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            limit = int(limit) if limit else None
+        except ValueError:
+            return Response({"error": "Invalid limit."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit is not None and not 1 <= limit <= MAX_ELIGIBLE_LIMIT:
+            return Response({"error": f"'limit' must be between 1 and {MAX_ELIGIBLE_LIMIT}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        scholarships = find_eligible_scholarships(attributes, limit=limit)
+        return Response({
+            "criteria_used": attributes,
+            "count": len(scholarships),
+            "scholarships": scholarships
+        }, status=status.HTTP_200_OK)
+
+
+def _eligibility_response(request, student_id):
+    """Shared body of the verified-eligibility views (paged with ?limit=&offset=)."""
+    try:
+        limit = int(request.query_params.get('limit', 200))
+        offset = int(request.query_params.get('offset', 0))
+    except ValueError:
+        return Response({"error": "Invalid limit/offset."}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1 or offset < 0:
+        return Response({"error": "Invalid limit/offset."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        result = get_verified_eligibility(student_id, limit=limit, offset=offset)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    if result is None:
+        return Response(
+            {"error": "No verified document data found for this student."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(result, status=status.HTTP_200_OK)
+
+
+class VerifiedEligibilityView(APIView):
+    """
+    Jobs and scholarships the logged-in student is eligible for, based only
+    on data from their *verified* documents (core/eligibility_query.py).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        return _eligibility_response(request, request.user.student_id)
 
-        return Response(recommended_jobs, status=status.HTTP_200_OK)
+
+class StudentEligibilityView(APIView):
+    """
+    Public admin view of the verified-eligibility query for any student.
+    """
+    permission_classes = [AllowAny] # Publicly accessible
+
+    def get(self, request, student_id, format=None):
+        return _eligibility_response(request, student_id)
     
     
 class AdminDashboardView(APIView):
     """
     Public view for the admin dashboard.
-    Fetches all students and all documents.
+    Returns one keyset page of students and of documents (see core/dashboard.py):
+    ?limit=, ?students_cursor= / ?documents_cursor= (the 'next' values of the
+    previous page), filters ?status=, ?document_type=, ?search=, ?student_id=,
+    projection ?fields=, and ?include=students|documents. Totals are served
+    by AdminDashboardCountsView.
     """
     permission_classes = [AllowAny] # Publicly accessible
+    RESOURCES = ['students', 'documents']
 
     def get(self, request, format=None):
+        params = request.query_params
         try:
-            students = Student.objects.all().order_by('full_name')
-            documents = Document.objects.all().order_by('-issue_date')
-
-            student_serializer = StudentSerializer(students, many=True)
-            document_serializer = DocumentSerializer(documents, many=True)
+            limit = int(params.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "Invalid limit."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return Response({"error": f"'limit' must be between 1 and {MAX_PAGE_SIZE}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        include = [name for name in params.get('include', ','.join(self.RESOURCES)).split(',') if name]
+        if set(include) - set(self.RESOURCES):
+            return Response({"error": f"'include' must be a subset of {self.RESOURCES}."},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-            return Response({
-                'students': student_serializer.data,
-                'documents': document_serializer.data
-            }, status=status.HTTP_200_OK)
-        
+        try:
+            student_fields, document_fields = parse_fields(params.get('fields'))
+            response, next_cursors = {}, {}
+            if 'students' in include:
+                response['students'], next_cursors['students'] = student_page(params, student_fields, limit)
+            if 'documents' in include:
+                response['documents'], next_cursors['documents'] = document_page(params, document_fields, limit)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        response['next'] = next_cursors
+        return Response(response, status=status.HTTP_200_OK)
+
+
+class AdminDashboardCountsView(APIView):
+    """Student and document totals for the dashboard, with the same filters."""
+    permission_classes = [AllowAny] # Publicly accessible
+
+    def get(self, request, format=None):
+        try:
+            counts = dashboard_counts(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(counts, status=status.HTTP_200_OK)
+
 
 class StudentSummaryView(APIView):
     """
     Public view to get an AI-generated summary for a specific student.
+    Reads the materialized StudentSummary (see core/student_summary.py);
+    the raw document list is only included with ?include=documents.
     """
     permission_classes = [AllowAny] # Publicly accessible
 
     def get(self, request, student_id, format=None):
         try:
-            student = Student.objects.get(student_id=student_id)
-            documents = Document.objects.filter(student=student)
-            
+            summary = get_student_summary(student_id)
+
             # --- We will build this LLM function in a later step ---
             # For now, let's return the raw data.
             # In Phase 3, we'll replace this with:
             # summary = get_student_summary_with_llm(student, documents)
-            
-            student_data = StudentSerializer(student).data
-            documents_data = DocumentSerializer(documents, many=True).data
-
-            # Placeholder summary
-            summary = f"Student {student.full_name} (ID: {student.student_id}) has {documents.count()} document(s). "
-            summary += "Verification status: "
-            summary += ", ".join([doc.verification_status for doc in documents])
 
-            return Response({
-                "summary_text": summary,
-                "raw_student": student_data,
-                "raw_documents": documents_data
-            }, status=status.HTTP_200_OK)
+            response = {
+                "summary_text": summary_text(summary),
+                "summary": summary_data(summary),
+                "raw_student": StudentSerializer(summary.student).data,
+            }
+            if 'documents' in request.query_params.get('include', '').split(','):
+                documents = Document.objects.filter(student_id=student_id).order_by('document_id')
+                response["raw_documents"] = DocumentSerializer(documents, many=True).data
+            return Response(response, status=status.HTTP_200_OK)
 
         except Student.DoesNotExist:
             return Response({"error": "Student not found."}, status=status.HTTP_404_NOT_FOUND)
@@ -399,4 +499,129 @@ class AdminChatView(APIView):
         # 3. Give the data to the "Synthesizer" AI to answer
         final_response = get_synthesized_answer(context_data, query)
     
-        return Response(final_response)
\ No newline at end of file
+        return Response(final_response)
+
+
+def _parse_coverage(request):
+    """Reads ?min_coverage= (one of MIN_COVERAGE_CHOICES), defaulting to the configured value."""
+    value = float(request.query_params.get('min_coverage', DEFAULT_MIN_COVERAGE))
+    if value not in MIN_COVERAGE_CHOICES:
+        raise ValueError(f"min_coverage must be one of {', '.join(map(str, MIN_COVERAGE_CHOICES))}.")
+    return value
+
+
+def _report_pending(min_coverage):
+    return Response({
+        "status": "computing",
+        "min_coverage": min_coverage,
+        "detail": "The match report is being computed. Try again shortly.",
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+class JobMatchingAnalyticsView(APIView):
+    """
+    Public view for admin analytics over the full students x jobs match
+    (see core/batch_matching.py). e.g. ?min_jobs=10 answers
+    "how many students qualify for at least 10 jobs". Serves the stored
+    report; ?refresh=1 queues a rebuild instead of running it in the request.
+    """
+    permission_classes = [AllowAny] # Publicly accessible
+
+    def get(self, request, format=None):
+        try:
+            min_coverage = _parse_coverage(request)
+            min_jobs = int(request.query_params.get('min_jobs', 1))
+            if min_jobs < 0:
+                raise ValueError("min_jobs must be at least 0.")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        report, computed_at = get_match_report(min_coverage=min_coverage, refresh=request.query_params.get('refresh') == '1')
+        if report is None:
+            return _report_pending(min_coverage)
+        return Response({
+            "students": report['students'],
+            "jobs": report['jobs'],
+            "min_coverage": report['min_coverage'],
+            "min_jobs": min_jobs,
+            "students_with_at_least_min_jobs": students_with_at_least(report, min_jobs),
+            "students_with_no_job": report['students_with_no_job'],
+            "qualifying_jobs_histogram": report['qualifying_jobs_histogram'],
+            "top_jobs": report['top_jobs'],
+            "elapsed_seconds": report['elapsed_seconds'],
+            "computed_at": computed_at,
+        }, status=status.HTTP_200_OK)
+
+
+class SkillGapAnalyticsView(APIView):
+    """
+    Public view listing the skills that block the most students: skills
+    missing from jobs a student is exactly one skill short of.
+    """
+    permission_classes = [AllowAny] # Publicly accessible
+
+    def get(self, request, format=None):
+        try:
+            min_coverage = _parse_coverage(request)
+            limit = int(request.query_params.get('limit', 20))
+            if limit < 0:
+                raise ValueError("limit must be at least 0.")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        report, computed_at = get_match_report(min_coverage=min_coverage, refresh=request.query_params.get('refresh') == '1')
+        if report is None:
+            return _report_pending(min_coverage)
+        return Response({
+            "students": report['students'],
+            "min_coverage": report['min_coverage'],
+            "skill_gaps": report['skill_gaps'][:limit],
+            "computed_at": computed_at,
+        }, status=status.HTTP_200_OK)
+
+
+class ExtractionStatsView(APIView):
+    """
+    Public view showing how often profile ETL skipped the LLM (rule-based
+    extraction or content cache) versus calling Gemini.
+    """
+    permission_classes = [AllowAny] # Publicly accessible
+
+    def get(self, request, format=None):
+        return Response(extraction_bypass_stats(), status=status.HTTP_200_OK)
+
+
+class AdminStatsView(APIView):
+    """
+    Public view with the admin homepage statistics: document counts by
+    status and type, verified students, and income / percentage
+    distributions (see core/admin_stats.py). ?refresh=1 recomputes them.
+    """
+    permission_classes = [AllowAny] # Publicly accessible
+
+    def get(self, request, format=None):
+        return Response(get_admin_stats(refresh=request.query_params.get('refresh') == '1'),
+                        status=status.HTTP_200_OK)
+
+
+class SkillSearchView(APIView):
+    """
+    Public view answering "which students know X" from the normalized skill
+    tables (see core/skills.py): ?skills=Django,React gives exact counts and
+    the first ?limit= students having all of them. Without ?skills= it lists
+    the most common skills.
+    """
+    permission_classes = [AllowAny] # Publicly accessible
+
+    def get(self, request, format=None):
+        try:
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            return Response({"error": "Invalid limit."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= limit <= MAX_SKILL_SEARCH_LIMIT:
+            return Response({"error": f"'limit' must be between 1 and {MAX_SKILL_SEARCH_LIMIT}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        skills = [s for s in request.query_params.get('skills', '').split(',') if s.strip()]
+        if not skills:
+            return Response({"top_skills": top_skills(limit)}, status=status.HTTP_200_OK)
+        return Response(skill_search(skills, limit=limit), status=status.HTTP_200_OK)
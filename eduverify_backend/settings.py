@@ -70,6 +70,11 @@ REST_FRAMEWORK = {
         # We will manually set Register to be public.
         'rest_framework.permissions.IsAuthenticated', 
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        # orjson-backed, same output as rest_framework.renderers.JSONRenderer
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 ROOT_URLCONF = 'eduverify_backend.urls'
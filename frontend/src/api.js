@@ -32,4 +32,36 @@ export const apiFetch = async (url, options = {}) => {
     }
 
     return response;
-};
\ No newline at end of file
+};
+// The admin dashboard returns keyset ("cursor") pages: follow `next` until it is null.
+export const fetchDashboardPage = async (resource, { cursor = null, limit = 50, fields = null } = {}) => {
+    const params = new URLSearchParams({ include: resource, limit: String(limit) });
+    if (fields) params.set('fields', fields);
+    if (cursor) params.set(`${resource}_cursor`, cursor);
+
+    const response = await apiFetch(`/portal/dashboard/?${params}`);
+    if (!response.ok) {
+        throw new Error(`Failed to fetch ${resource}`);
+    }
+    const data = await response.json();
+    return { rows: data[resource], next: data.next[resource] };
+};
+
+export const fetchAllDashboardRows = async (resource, fields = null) => {
+    const rows = [];
+    let cursor = null;
+    do {
+        const page = await fetchDashboardPage(resource, { cursor, limit: 500, fields });
+        rows.push(...page.rows);
+        cursor = page.next;
+    } while (cursor);
+    return rows;
+};
+
+export const fetchDashboardCounts = async () => {
+    const response = await apiFetch('/portal/dashboard/counts/');
+    if (!response.ok) {
+        throw new Error('Failed to fetch dashboard totals');
+    }
+    return response.json(); // { students, documents }
+};
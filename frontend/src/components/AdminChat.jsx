@@ -1,6 +1,6 @@
 // frontend/src/components/AdminChat.jsx
 import React, { useState, useEffect } from 'react';
-import { apiFetch } from '../api'; 
+import { apiFetch, fetchAllDashboardRows } from '../api'; 
 import styles from '../App.module.css'; 
 
 const SendIcon = () => (
@@ -25,14 +25,11 @@ const AdminChat = () => {
         return localStorage.getItem('admin_chat_context') || 'all';
     });
 
-    // 2. Fetch students
+    // 2. Fetch every student (the dashboard is paginated, so follow its cursors)
     useEffect(() => {
         const fetchStudents = async () => {
             try {
-                const response = await apiFetch('/portal/dashboard/');
-                if (!response.ok) throw new Error('Failed to fetch students');
-                const data = await response.json();
-                setStudents(data.students);
+                setStudents(await fetchAllDashboardRows('students', 'student_id,full_name'));
             } catch (err) {
                 console.error("Error fetching students:", err);
             }
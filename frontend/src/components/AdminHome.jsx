@@ -1,23 +1,29 @@
 import React, { useState, useEffect } from 'react';
-import { apiFetch } from '../api'; // Import our new apiFetch function
+import { apiFetch, fetchDashboardCounts, fetchDashboardPage } from '../api'; // Import our new apiFetch function
 import styles from '../App.module.css'; // Re-use the same styles
 
 const AdminHome = () => {
     const [dashboardData, setDashboardData] = useState({ students: [], documents: [] });
+    // Cursor of the next page per resource (null when everything is loaded)
+    const [nextCursors, setNextCursors] = useState({ students: null, documents: null });
+    const [counts, setCounts] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState(null);
 
-    // Fetch the dashboard data from our new backend endpoint
+    // Fetch the first page of each list, and the totals, from the backend
     useEffect(() => {
         const fetchData = async () => {
             setLoading(true);
             try {
-                const response = await apiFetch('/portal/dashboard/');
-                if (!response.ok) {
-                    throw new Error('Failed to fetch admin dashboard data');
-                }
-                const data = await response.json();
-                setDashboardData(data);
+                const [students, documents, totals] = await Promise.all([
+                    fetchDashboardPage('students'),
+                    fetchDashboardPage('documents'),
+                    fetchDashboardCounts(),
+                ]);
+                setDashboardData({ students: students.rows, documents: documents.rows });
+                setNextCursors({ students: students.next, documents: documents.next });
+                setCounts(totals);
             } catch (err) {
                 setError(err.message);
             } finally {
@@ -27,6 +33,31 @@ const AdminHome = () => {
         fetchData();
     }, []);
 
+    // Append the next page of 'students' or 'documents'
+    const loadMore = async (resource) => {
+        setLoadingMore(true);
+        try {
+            const page = await fetchDashboardPage(resource, { cursor: nextCursors[resource] });
+            setDashboardData(prev => ({ ...prev, [resource]: [...prev[resource], ...page.rows] }));
+            setNextCursors(prev => ({ ...prev, [resource]: page.next }));
+        } catch (err) {
+            alert(`Error: ${err.message}`);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
+    const loadMoreButton = (resource) => nextCursors[resource] && (
+        <button
+            className={styles.authButton}
+            onClick={() => loadMore(resource)}
+            disabled={loadingMore}
+            style={{width: 'auto', padding: '0.5rem 1rem', marginTop: '1rem'}}
+        >
+            {loadingMore ? 'Loading...' : 'Load More'}
+        </button>
+    );
+
     // Handle the "Summary" button click
     const handleGetSummary = async (studentId) => {
         alert(`Requesting summary for student ${studentId}...`);
@@ -58,7 +89,7 @@ const AdminHome = () => {
             <h1 className={styles.mainTitle}>Admin Dashboard</h1>
             
             {/* Students Section */}
-            <h2 className={styles.formTitle}>All Students ({dashboardData.students.length})</h2>
+            <h2 className={styles.formTitle}>All Students ({counts ? counts.students : dashboardData.students.length})</h2>
             <div className={styles.grid}>
                 {dashboardData.students.map(student => (
                     <div key={student.student_id} className={styles.card}>
@@ -75,11 +106,12 @@ const AdminHome = () => {
                     </div>
                 ))}
             </div>
+            {loadMoreButton('students')}
 
             <hr className={styles.divider} />
 
             {/* Documents Section */}
-            <h2 className={styles.formTitle}>All Documents ({dashboardData.documents.length})</h2>
+            <h2 className={styles.formTitle}>All Documents ({counts ? counts.documents : dashboardData.documents.length})</h2>
             <div className={styles.grid}>
                 {dashboardData.documents.map(doc => (
                     <div key={doc.document_id} className={styles.card}>
@@ -94,6 +126,7 @@ const AdminHome = () => {
                     </div>
                 ))}
             </div>
+            {loadMoreButton('documents')}
         </div>
     );
 };
@@ -5,6 +5,13 @@ import os
 import json
 from dotenv import load_dotenv
 from core.models import Student, Document, StudentProfile
+from core.eligibility import get_student_attributes, find_eligible_scholarships
+from core.batch_matching import get_match_report, summarize_report
+from core.admin_stats import get_admin_stats
+from core.skills import skill_search, add_student_skills
+from core.profile_merge import merge_profiles, profile_update
+from core.content_cache import cached_fields, store_fields
+from core.field_extraction import extract_fields, get_skill_matcher, is_confident
 from django.db.models import Avg, Count
 from django.db import connection
 
@@ -40,28 +47,32 @@ def get_db_schema():
 # 2. ETL & PROFILE MANAGEMENT (Extract, Transform, Load)
 # ==============================================================================
 
-def update_profile_from_text(student, doc_type, text):
-    """
-    Parses raw text from a document AND updates the student's
-    structured StudentProfile in the database. (Called by views.py on upload)
-    """
-    print(f"--- Updating Profile for {student.full_name} from {doc_type} ---")
-    if not GEMINI_API_KEY: 
-        return
-
-    # 1. Define the extraction goal based on document type
-    if "marksheet" in doc_type.lower():
-        extraction_prompt = "Extract the final 'percentage' (float) and 'degrees' (list of strings)."
-        json_format = "{\"percentage\": 85.2, \"degrees\": [\"B.Tech\"]}"
-    elif "income" in doc_type.lower():
-        extraction_prompt = "Extract the final 'income' (integer) value."
-        json_format = "{\"income\": 500000}"
-    elif "resume" in doc_type.lower():
-        extraction_prompt = "Extract all 'skills' (list of strings)."
-        json_format = "{\"skills\": [\"Python\", \"React\", \"Data Analysis\"]}"
-    else:
-        return # Not a type we parse
-
+# What to extract per document kind: (instruction, example JSON)
+EXTRACTION_PROMPTS = {
+    'marksheet': ("Extract the final 'percentage' (float) and 'degrees' (list of strings).",
+                  "{\"percentage\": 85.2, \"degrees\": [\"B.Tech\"]}"),
+    'income': ("Extract the final 'income' (integer) value.",
+               "{\"income\": 500000}"),
+    'resume': ("Extract all 'skills' (list of strings).",
+               "{\"skills\": [\"Python\", \"React\", \"Data Analysis\"]}"),
+}
+
+
+def extraction_kind(doc_type):
+    """Maps a document type to the EXTRACTION_PROMPTS kind we parse it as (or None)."""
+    doc_type = doc_type.lower()
+    if "marksheet" in doc_type:
+        return 'marksheet'
+    if "income" in doc_type:
+        return 'income'
+    if "resume" in doc_type:
+        return 'resume'
+    return None
+
+
+def parse_fields_with_llm(doc_type, text):
+    """Asks Gemini for the structured fields of one document. Raises on failure."""
+    extraction_prompt, json_format = EXTRACTION_PROMPTS[extraction_kind(doc_type)]
     prompt = f"""
     You are a data extraction tool. From the following raw text from a {doc_type},
     perform the task: {extraction_prompt}
@@ -71,46 +82,134 @@ def update_profile_from_text(student, doc_type, text):
     Output:
     """
     
-    # 2. Call LLM to get structured JSON
     api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-lite:generateContent?key={GEMINI_API_KEY}"
     payload = {
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": {"responseMimeType": "application/json"}
     }
     
+    response = requests.post(api_url, json=payload, timeout=20)
+    response.raise_for_status()
+    result = response.json()
+    text_response = result['candidates'][0]['content']['parts'][0]['text']
+    
+    # Clean and parse the JSON (Fix for None vs null)
+    text_response = text_response.replace("None", "null")
+    start = text_response.find('{')
+    end = text_response.rfind('}') + 1
+    if start == -1 or end == 0: 
+        raise ValueError("No JSON object found in response")
+    cleaned_json_text = text_response[start:end]
+    return json.loads(cleaned_json_text)
+
+
+def apply_parsed_fields(student, parsed_data):
+    """Merges parsed document fields into the student's StudentProfile."""
+    apply_parsed_fields_batch([(student, parsed_data)])
+
+
+def apply_parsed_fields_batch(results):
+    """
+    Merges many (student, parsed_data) document results into the profiles in
+    one atomic statement (core/profile_merge.py): best percentage, latest
+    income, union of degrees and skills. Concurrent uploads for the same
+    student cannot lose each other's fields.
+    """
+    by_student, students = {}, {}
+    for student, parsed_data in results:
+        by_student.setdefault(student.student_id, []).append(parsed_data)
+        students[student.student_id] = student
+    updates = {student_id: profile_update(merge_parsed_fields(parsed_list)) for student_id, parsed_list in by_student.items()}
+    merge_profiles(updates)
+    for student_id, update in updates.items():
+        print(f"Profile for {students[student_id].full_name} updated successfully: {update}")
+
+    # Keep the normalized skill tables in step with verified_skills
+    new_skills = {student_id: update['verified_skills'] for student_id, update in updates.items() if update['verified_skills']}
+    if new_skills:
+        add_student_skills(new_skills)
+
+    # Queue a refresh of these students' materialized recommendations
+    from core.recommendations import mark_stale
+    mark_stale(list(updates))
+
+
+def merge_parsed_fields(parsed_list):
+    """
+    Combines the parsed fields of several documents into one update with the
+    same semantics as applying them one by one: best percentage, latest
+    income, union of degrees and skills.
+    """
+    merged = {}
+    for parsed_data in parsed_list:
+        if parsed_data.get("percentage"):
+            merged["percentage"] = max(merged.get("percentage", 0), float(parsed_data["percentage"]))
+        if parsed_data.get("income"):
+            merged["income"] = parsed_data["income"]
+        for key in ("degrees", "skills"):
+            if parsed_data.get(key):
+                merged[key] = merged.get(key, []) + list(parsed_data[key])
+    return merged
+
+
+def parse_profile_fields(doc_type, text, content_hash=None):
+    """
+    Extracts the profile fields of one document without saving them.
+    Tries the content cache, then the local rules, and only calls the LLM
+    when the rules are not confident. Returns (parsed_data, method) where
+    method is 'cache', 'rules' or 'llm', or (None, None) if there is nothing
+    to parse. Raises on LLM failure.
+    """
+    # 1. Define the extraction goal based on document type
+    kind = extraction_kind(doc_type)
+    if kind is None:
+        return None, None # Not a type we parse
+
+    # 2. Reuse the fields parsed from identical content, else try the
+    #    local rules, and only call the LLM when they are not confident
+    parsed_data = cached_fields(content_hash, kind)
+    if parsed_data is not None:
+        print(f"Content cache hit for {content_hash[:12]}. Skipping LLM extraction.")
+        return parsed_data, 'cache'
+
+    parsed_data, confidence = extract_fields(kind, text)
+    if is_confident(confidence):
+        method = 'rules'
+        print(f"Rule-based extraction confident ({confidence:.2f}). Skipping LLM extraction.")
+    else:
+        if not GEMINI_API_KEY: 
+            return None, None
+        method = 'llm'
+        parsed_data = parse_fields_with_llm(doc_type, text)
+    store_fields(content_hash, kind, parsed_data)
+    return parsed_data, method
+
+
+def update_profile_from_text(student, doc_type, text, raise_errors=False, content_hash=None):
+    """
+    Parses raw text from a document AND updates the student's
+    structured StudentProfile in the database. (Called by the
+    'process_document' background task after an upload.)
+    With raise_errors=True failures are re-raised so the task can retry.
+    With a content_hash, parsed fields are reused from / saved to the
+    content cache (core/content_cache.py), skipping Gemini for known files.
+    Returns how the fields were obtained: 'cache', 'rules', 'llm' or None.
+    """
+    print(f"--- Updating Profile for {student.full_name} from {doc_type} ---")
     try:
-        response = requests.post(api_url, json=payload, timeout=20)
-        response.raise_for_status()
-        result = response.json()
-        text_response = result['candidates'][0]['content']['parts'][0]['text']
-        
-        # Clean and parse the JSON (Fix for None vs null)
-        text_response = text_response.replace("None", "null")
-        start = text_response.find('{')
-        end = text_response.rfind('}') + 1
-        if start == -1 or end == 0: 
-            raise ValueError("No JSON object found in response")
-        cleaned_json_text = text_response[start:end]
-        parsed_data = json.loads(cleaned_json_text)
-        
-        # 3. Get or Create the profile
-        profile, created = StudentProfile.objects.get_or_create(student=student)
-        
-        # 4. Save the structured data to the StudentProfile model
-        if "percentage" in parsed_data and parsed_data.get("percentage"):
-            profile.highest_percentage = max(profile.highest_percentage or 0, float(parsed_data["percentage"]))
-        if "income" in parsed_data and parsed_data.get("income"):
-            profile.annual_income = int(parsed_data["income"])
-        if "degrees" in parsed_data and parsed_data.get("degrees"):
-            profile.degrees = list(set((profile.degrees or []) + parsed_data["degrees"])) # Merge lists
-        if "skills" in parsed_data and parsed_data.get("skills"):
-            profile.verified_skills = list(set((profile.verified_skills or []) + parsed_data["skills"])) # Merge lists
-            
-        profile.save()
-        print(f"Profile for {student.full_name} updated successfully: {parsed_data}")
+        parsed_data, method = parse_profile_fields(doc_type, text, content_hash=content_hash)
+        if parsed_data is None:
+            return None
+
+        # 3. Save to the StudentProfile and queue a recommendations refresh
+        apply_parsed_fields(student, parsed_data)
+        return method
         
     except Exception as e:
         print(f"ERROR: LLM Profile update failed: {e}")
+        if raise_errors:
+            raise
+        return None
 
 # ==============================================================================
 # 3. TOOLKIT (The functions our "Executor" can run)
@@ -204,6 +303,87 @@ def get_all_scholarships_from_api():
     except Exception as e:
         return {"error": f"Failed to fetch scholarships: {e}"}
 
+def get_eligible_scholarships_for_student(student_id):
+    """
+    Tool: [GET_ELIGIBLE_SCHOLARSHIPS]
+    Runs the typed eligibility engine for one student, so the synthesizer
+    only sees the scholarships that actually match instead of raw rows.
+    """
+    print("Running tool: GET_ELIGIBLE_SCHOLARSHIPS")
+    if not student_id: return {"error": "No student_id provided"}
+    try:
+        student = Student.objects.select_related('studentprofile').get(student_id=student_id)
+        attributes = get_student_attributes(student)
+        eligible = find_eligible_scholarships(attributes)
+        return {
+            "criteria_used": attributes,
+            "eligible_count": len(eligible),
+            "eligible_scholarships": eligible[:50]
+        }
+    except Student.DoesNotExist:
+        return {"error": f"Student {student_id} not found"}
+    except Exception as e:
+        return {"error": f"Failed to compute eligible scholarships: {e}"}
+
+def get_job_match_summary():
+    """
+    Tool: [GET_JOB_MATCH_SUMMARY]
+    Aggregates from the batch students x jobs matcher: how many students
+    qualify for at least N jobs, and the jobs most students qualify for.
+    """
+    print("Running tool: GET_JOB_MATCH_SUMMARY")
+    try:
+        report, _ = get_match_report()
+        if report is None:
+            return {"error": "The job match report is still being computed. Try again shortly."}
+        summary = summarize_report(report)
+        summary.pop('top_skill_gaps')
+        return summary
+    except Exception as e:
+        return {"error": f"Failed to compute job matching summary: {e}"}
+
+def get_skill_gaps():
+    """
+    Tool: [GET_SKILL_GAPS]
+    The skills that block the most students from qualifying for jobs.
+    """
+    print("Running tool: GET_SKILL_GAPS")
+    try:
+        report, _ = get_match_report()
+        if report is None:
+            return {"error": "The job match report is still being computed. Try again shortly."}
+        return {"students": report['students'], "skill_gaps": report['skill_gaps'][:20]}
+    except Exception as e:
+        return {"error": f"Failed to compute skill gaps: {e}"}
+
+def search_students_by_skill(query_text):
+    """
+    Tool: [SEARCH_STUDENTS_BY_SKILL]
+    Finds the skills named in the query (with the resume skill matcher) and
+    answers from the normalized skill tables: exact counts over every
+    student, plus the first 50 students having all of them.
+    """
+    print("Running tool: SEARCH_STUDENTS_BY_SKILL")
+    try:
+        skills = get_skill_matcher().find(query_text or "")
+        if not skills:
+            return {"error": "No known skill was named in the query."}
+        return skill_search(skills)
+    except Exception as e:
+        return {"error": f"Failed to search students by skill: {e}"}
+
+def get_platform_statistics():
+    """
+    Tool: [GET_PLATFORM_STATS]
+    Cached database aggregates: document counts by status and type, verified
+    students, and income / percentage distributions (core/admin_stats.py).
+    """
+    print("Running tool: GET_PLATFORM_STATS")
+    try:
+        return get_admin_stats()
+    except Exception as e:
+        return {"error": f"Failed to compute platform statistics: {e}"}
+
 # ==============================================================================
 # 4. AI "BRAIN" - STEP 1: DECOMPOSER (Decides which tools to use)
 # ==============================================================================
@@ -230,12 +410,17 @@ def analyze_query_for_tools(query_text, student_id=None):
     - "GET_STUDENT_DOCUMENTS": Use for "my verified documents", "my aadhar", "my resume status".
 
     2. ADMIN AGGREGATE TOOLS (For queries about "students", "all", "how many"):
-    - "GET_ALL_STUDENT_PROFILES": Use ONLY for skills, income, or degrees. (e.g., "avg income", "students who know Python").
-    - "GET_ALL_DOCUMENTS": Use for ANY check regarding verification status or document types. (e.g., "how many verified", "students with Aadhar", "pending documents").
+    - "SEARCH_STUDENTS_BY_SKILL": Use for students with particular skills (e.g., "students who know Python", "how many students know Django and React").
+    - "GET_ALL_STUDENT_PROFILES": Use ONLY for income or degrees of individual students, or skills not tied to a named skill (e.g., "avg income", "list students with B.Tech").
+    - "GET_PLATFORM_STATS": Use for counts and distributions across all students (e.g., "how many documents are verified", "how many students have a verified document", "income distribution", "median percentage").
+    - "GET_ALL_DOCUMENTS": Use for verification status or document types when individual documents or students must be listed (e.g., "students with Aadhar", "list pending documents").
+    - "GET_JOB_MATCH_SUMMARY": Use for how many students qualify for jobs (e.g., "students who qualify for at least 10 jobs", "most reachable jobs").
+    - "GET_SKILL_GAPS": Use for skill gaps across students (e.g., "which skill gap blocks most students", "what should students learn").
 
     3. EXTERNAL DATA TOOLS:
     - "GET_ALL_JOBS": Use for "jobs", "vacancies".
-    - "GET_ALL_SCHOLARSHIPS": Use for "scholarships".
+    - "GET_ALL_SCHOLARSHIPS": Use for "scholarships" in general (listing, browsing).
+    - "GET_ELIGIBLE_SCHOLARSHIPS": Use for "which scholarships am I eligible for", "scholarships for me".
 
     4. GENERAL:
     - "CREATIVE_COACH": Use for generic advice ("roadmap", "what should I do", "hello").
@@ -248,11 +433,20 @@ def analyze_query_for_tools(query_text, student_id=None):
     Query: "how many students have aadhar verified"
     Output: ["GET_ALL_DOCUMENTS"]  <-- Corrects the previous error
 
+    Query: "how many documents are pending"
+    Output: ["GET_PLATFORM_STATS"]
+
     Query: "show me verified students"
     Output: ["GET_ALL_DOCUMENTS"]
 
     Query: "which students know Django"
-    Output: ["GET_ALL_STUDENT_PROFILES"]
+    Output: ["SEARCH_STUDENTS_BY_SKILL"]
+
+    Query: "how many students qualify for at least 10 jobs"
+    Output: ["GET_JOB_MATCH_SUMMARY"]
+
+    Query: "what scholarships can I apply for"
+    Output: ["GET_ELIGIBLE_SCHOLARSHIPS"]
 
     --- USER QUERY ---
     Query: "{query_text}"
@@ -285,7 +479,8 @@ def analyze_query_for_tools(query_text, student_id=None):
         cleaned_json_text = text_response[start:end]
         tool_list = json.loads(cleaned_json_text)
         
-        return {"tools": tool_list}
+        # The query goes along for tools that read their arguments from it
+        return {"tools": tool_list, "query": query_text}
 
     except Exception as e:
         print(f"ERROR: LLM Tool generation failed: {e}")
@@ -332,6 +527,16 @@ def execute_tool_plan(plan, student_id=None):
                 context_data["jobs_list"] = get_all_jobs_from_api()
             elif tool == "GET_ALL_SCHOLARSHIPS":
                 context_data["scholarships_list"] = get_all_scholarships_from_api()
+            elif tool == "GET_JOB_MATCH_SUMMARY":
+                context_data["job_match_summary"] = get_job_match_summary()
+            elif tool == "GET_SKILL_GAPS":
+                context_data["skill_gaps"] = get_skill_gaps()
+            elif tool == "SEARCH_STUDENTS_BY_SKILL":
+                context_data["skill_search"] = search_students_by_skill(plan.get("query"))
+            elif tool == "GET_PLATFORM_STATS":
+                context_data["platform_stats"] = get_platform_statistics()
+            elif tool == "GET_ELIGIBLE_SCHOLARSHIPS":
+                context_data["eligible_scholarships"] = get_eligible_scholarships_for_student(student_id)
         
         # This is the "Data Context" we will send to the final AI
         return context_data